@@ -11,6 +11,10 @@ across multiple related models.
 
 import logging
 import json
+import threading
+import time
+import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple, Union
 
 from query_parser import QueryParser
@@ -18,90 +22,411 @@ from relationship_handler import RelationshipHandler
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of related records fetched for the primary results of a complex query
+RELATED_RECORDS_LIMIT = 1000
+
+# Number of identical (model, method) RPCs of one search reported as a possible N+1 pattern
+REPEATED_RPC_THRESHOLD = 3
+
+
+def _payload_size(value: Any, methodresponse: bool = False) -> int:
+    """Size in bytes of a value serialized as an XML-RPC payload."""
+    try:
+        return len(xmlrpc.client.dumps((value,) if methodresponse else tuple(value),
+                                       methodresponse=methodresponse or None, allow_none=True))
+    except Exception:
+        return len(repr(value))
+
+
+class RpcTrace:
+    """Recorder of the RPCs issued while explaining a search."""
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, model: str, method: str, args: List[Any], kwargs: Optional[Dict[str, Any]],
+               result: Any, started: float, error: Optional[str] = None):
+        """Record one RPC and its result."""
+        call = {
+            "model": model,
+            "method": method,
+            "domain": args[0] if method in ('search', 'search_read', 'search_count', 'read_group') and args else None,
+            "start_ms": round((started - self.started) * 1000, 1),
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "request_bytes": _payload_size([model, method, args, kwargs or {}]),
+            "response_bytes": _payload_size(result, methodresponse=True) if error is None else 0,
+            "rows": len(result) if isinstance(result, list) else None,
+        }
+        if error is not None:
+            call["error"] = error
+        with self._lock:
+            self.calls.append(call)
+
+    def call(self, function, model: str, method: str, args: List[Any], kwargs: Optional[Dict[str, Any]]) -> Any:
+        """Call function() and record it as the RPC model.method(args, kwargs)."""
+        started = time.perf_counter()
+        try:
+            result = function()
+        except Exception as e:
+            self.record(model, method, args, kwargs, None, started, error=str(e))
+            raise
+        self.record(model, method, args, kwargs, result, started)
+        return result
+
+
 class AdvancedSearch:
     """Class for performing advanced searches in Odoo."""
 
-    def __init__(self, model_discovery):
+    def __init__(self, model_discovery, max_workers: int = 4, entity_index=None, schema_index=None,
+                 record_cache=None):
         """Initialize the advanced search.
 
         Args:
             model_discovery: ModelDiscovery instance for accessing Odoo models and fields
+            max_workers: Maximum number of model searches executed concurrently
+            entity_index: Optional EntityIndex resolving entity names to record ids
+            schema_index: Optional SchemaIndex mapping unknown query words to fields
+            record_cache: Optional RecordCache serving repeated searches from memory
         """
         self.model_discovery = model_discovery
-        self.query_parser = QueryParser(model_discovery)
-        self.relationship_handler = RelationshipHandler(model_discovery)
+        self.max_workers = max_workers
+        self.record_cache = record_cache
+        # Per thread: the worker's object proxy and the RpcTrace of the search being explained
+        self._local = threading.local()
+        # The parser and the relationship handler send their RPCs through _execute, so explain traces them
+        self.query_parser = QueryParser(model_discovery, entity_index=entity_index,
+                                        schema_index=schema_index, execute=self._execute)
+        self.relationship_handler = RelationshipHandler(model_discovery, execute=self._execute)
+
+    def _new_models_proxy(self):
+        """Create an object proxy for a worker thread (XML-RPC proxies are not thread-safe)."""
+        return xmlrpc.client.ServerProxy(f"{self.model_discovery.url}/xmlrpc/2/object", allow_none=True)
+
+    def _models_proxy(self):
+        """Get the object proxy of the current worker thread, or the shared one."""
+        return getattr(self._local, 'models_proxy', None) or self.model_discovery.models_proxy
+
+    def _can_run_concurrently(self) -> bool:
+        """Whether searches can be executed from worker threads."""
+        if self.max_workers <= 1:
+            return False
+        if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
+            # The client wraps a single connection
+            return False
+        return bool(getattr(self.model_discovery, 'url', None))
+
+    def _execute(self, model_name: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Execute a model method, recorded in the trace of the current thread when explaining a search."""
+        trace = getattr(self._local, 'trace', None)
+        if trace:
+            return trace.call(lambda: self._execute_rpc(model_name, method, args, kwargs),
+                              model_name, method, args, kwargs)
+        return self._execute_rpc(model_name, method, args, kwargs)
+
+    def _execute_rpc(self, model_name: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Execute a model method through the client or the object proxy."""
+        # Use the client's execute method if available
+        if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
+            return self.model_discovery.client.execute(model_name, method, args, kwargs)
+        # Fallback to direct execution if models_proxy is available
+        elif hasattr(self.model_discovery, 'models_proxy') and self.model_discovery.models_proxy:
+            return self._models_proxy().execute_kw(
+                self.model_discovery.db,
+                self.model_discovery.uid,
+                self.model_discovery.password,
+                model_name,
+                method,
+                args,
+                kwargs
+            )
+        raise RuntimeError(f"No suitable method found to execute {method} for {model_name}")
+
+    def _search_read(self, model_name: str, domain: List[Any], search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Execute a search_read on a model.
+
+        Args:
+            model_name: Model to search
+            domain: Domain filter
+            search_params: search_read keyword arguments
 
-    def search(self, query: str, limit: int = 10) -> Dict[str, Any]:
+        Returns:
+            List of records, empty if the search failed
+        """
+        try:
+            if self.record_cache:
+                return self.record_cache.search_read(
+                    lambda method, args, kwargs: self._execute(model_name, method, args, kwargs),
+                    model_name, domain, search_params)
+            return self._execute(model_name, 'search_read', [domain], search_params)
+        except Exception as e:
+            logger.error(f"Error executing search for {model_name}: {str(e)}")
+            return []
+
+    @staticmethod
+    def _related_filter(relationship: Optional[Dict[str, Any]],
+                        primary_records: List[Dict[str, Any]]) -> Optional[List[Any]]:
+        """Build the domain condition selecting the records related to the primary records.
+
+        Args:
+            relationship: Relationship from the primary model to the searched model
+            primary_records: Records found for the primary model
+
+        Returns:
+            A [to_field, 'in', ids] condition, or None if the relationship cannot
+            be expressed as a domain (text matches, unknown relationships)
+        """
+        if not relationship or relationship.get("special"):
+            return None
+        if primary_records and relationship["from_field"] not in primary_records[0]:
+            return None
+
+        ids = []
+        for record in primary_records:
+            value = record.get(relationship["from_field"])
+            if relationship["relation_type"] == "many2many" and isinstance(value, list):
+                ids.extend(value)
+            elif isinstance(value, list) and value:
+                # many2one fields are read as [id, name]
+                ids.append(value[0])
+            elif isinstance(value, int) and not isinstance(value, bool):
+                ids.append(value)
+        return [relationship["to_field"], "in", sorted(set(ids))]
+
+    def _run_searches(self, searches: List[Tuple[str, List[Any], Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """Execute (model, domain, search_params) searches, concurrently when possible.
+
+        Returns:
+            The records of each search, in the order of searches
+        """
+        if len(searches) <= 1 or not self._can_run_concurrently():
+            return [self._search_read(*search) for search in searches]
+
+        trace = getattr(self._local, 'trace', None)
+
+        def run(search):
+            if not hasattr(self._local, 'models_proxy'):
+                self._local.models_proxy = self._new_models_proxy()
+            self._local.trace = trace
+            return self._search_read(*search)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(searches))) as executor:
+            return list(executor.map(run, searches))
+
+    def _execute_searches(self, query: str, parsed_results: List[Tuple[str, List[Any], List[str]]],
+                          limit: int) -> List[Tuple[str, List[Dict[str, Any]], Dict[str, Any]]]:
+        """Execute the searches of parsed sub-queries.
+
+        Sub-queries related to the first (primary) model are restricted to the
+        records related to the primary results, so they run after it. The
+        primary search and the independent sub-queries run concurrently, then
+        the dependent sub-queries run concurrently.
+
+        Args:
+            query: Natural language query string
+            parsed_results: (model, domain, fields) tuples from the query parser
+            limit: Maximum number of records to return per model
+
+        Returns:
+            List of (model_name, records, model_info) tuples, in parsed order
+        """
+        steps = []
+        for index, (model_name, domain, fields) in enumerate(parsed_results):
+            # Set up search parameters
+            search_params = {
+                'fields': fields,
+                'limit': limit if limit > 0 else 1000  # Use a higher default limit to get more records
+            }
+
+            # Add ordering for specific queries
+            if model_name == "project.task" and "deadline date" in query.lower():
+                search_params['order'] = 'date_deadline asc'
+
+            relationship = None
+            if index > 0:
+                relationship = self.relationship_handler.get_relationship(parsed_results[0][0], model_name)
+                if relationship and relationship.get("special"):
+                    relationship = None
+            steps.append({
+                "model": model_name,
+                "domain": domain,
+                "params": search_params,
+                "info": {"name": model_name, "fields": fields,
+                         "strategy": "primary" if index == 0 else "independent"},
+                "relationship": relationship,
+                "records": [],
+            })
+
+        # First stage: the primary search and the sub-queries that don't depend on it
+        first_stage = [step for index, step in enumerate(steps) if index == 0 or not step["relationship"]]
+        for step, records in zip(first_stage, self._run_searches(
+                [(step["model"], step["domain"], step["params"]) for step in first_stage])):
+            step["records"] = records
+
+        # Second stage: the sub-queries restricted to the primary results
+        second_stage = []
+        primary_records = steps[0]["records"] if steps else []
+        for step in steps[1:]:
+            if not step["relationship"]:
+                continue
+            related_filter = self._related_filter(step["relationship"], primary_records)
+            if related_filter is None:
+                step["info"]["strategy"] = "unfiltered, joined client-side"
+                second_stage.append(step)
+                continue
+            step["info"]["related_filter"] = related_filter
+            if not related_filter[2]:
+                # No primary records, so there is nothing related to fetch
+                step["info"]["strategy"] = "skipped, no primary records"
+                continue
+            step["info"]["strategy"] = f"filtered by {related_filter[0]} in {len(related_filter[2])} primary ids"
+            step["domain"] = list(step["domain"]) + [related_filter]
+            to_field = step["relationship"]["to_field"]
+            if to_field not in step["params"]["fields"]:
+                step["params"]["fields"] = step["params"]["fields"] + [to_field]
+            # All records related to the primary results are fetched
+            step["params"]["limit"] = RELATED_RECORDS_LIMIT
+            second_stage.append(step)
+        for step, records in zip(second_stage, self._run_searches(
+                [(step["model"], step["domain"], step["params"]) for step in second_stage])):
+            step["records"] = records
+            if step["params"]["limit"] == RELATED_RECORDS_LIMIT and len(records) >= RELATED_RECORDS_LIMIT:
+                logger.warning(f"Related search on {step['model']} reached {RELATED_RECORDS_LIMIT} records, "
+                               f"results are truncated")
+                step["info"]["truncated"] = True
+
+        for step in steps:
+            step["info"]["domain"] = step["domain"]
+        return [(step["model"], step["records"], step["info"]) for step in steps]
+
+    def aggregate(self, model_name: str, domain: List[Any], groupby: List[str],
+                  measures: List[Tuple[str, str]], limit: int = 80) -> Dict[str, Any]:
+        """Aggregate records on the server with read_group.
+
+        Args:
+            model_name: Model to aggregate
+            domain: Domain filter
+            groupby: Group-by specs, e.g. ["partner_id", "invoice_date:month"]
+            measures: (field, function) pairs, function being sum, avg, min, max or count_distinct
+            limit: Maximum number of groups
+
+        Returns:
+            Dictionary with the groups, each with its group-by values, record
+            count and measures, sorted by the first measure (or count) descending
+        """
+        aggregates = [f"{field}_{function}:{function}({field})" for field, function in measures]
+        sort_key = f"{measures[0][0]}_{measures[0][1]}" if measures else None
+        kwargs = {'lazy': False}
+        if limit > 0:
+            # Order on the server so the limit keeps the largest groups
+            kwargs['limit'] = limit
+            kwargs['orderby'] = f"{sort_key or '__count'} desc"
+        groups = self._execute(model_name, 'read_group', [domain, aggregates, groupby], kwargs)
+
+        rows = []
+        for group in groups:
+            rows.append({
+                "group": {spec: group.get(spec, group.get(spec.split(':')[0])) for spec in groupby},
+                "count": group.get('__count', group.get(f"{groupby[0]}_count", 0) if groupby else 0),
+                "measures": {f"{field}_{function}": group.get(f"{field}_{function}") or 0
+                             for field, function in measures},
+            })
+        rows.sort(key=lambda row: row["measures"][sort_key] if sort_key else row["count"], reverse=True)
+
+        logger.info(f"Aggregated {model_name} into {len(rows)} groups")
+        return {
+            "aggregate_model": model_name,
+            "domain": domain,
+            "groupby": groupby,
+            "measures": [f"{field}_{function}" for field, function in measures],
+            "groups": rows,
+        }
+
+    def search(self, query: str, limit: int = 10, explain: bool = False) -> Dict[str, Any]:
         """Perform an advanced search based on a natural language query.
 
         Args:
             query: Natural language query string
             limit: Maximum number of records to return per model
+            explain: Whether to add an "explain" entry with the executed plan
+                (models, domains, fields and join strategy per step, with row
+                counts) and the RPCs issued by the parser, the searches and the
+                join, with their timings and payload sizes; refreshes of the
+                entity index are not included
 
         Returns:
             Dictionary with search results
         """
+        if not explain:
+            return self._search(query, limit)
+
+        trace = RpcTrace()
+        steps: List[Dict[str, Any]] = []
+        # Traced per thread, so searches running concurrently on the same discovery are not recorded
+        self._local.trace = trace
+        try:
+            results = self._search(query, limit, steps)
+        finally:
+            self._local.trace = None
+        results["explain"] = {
+            "total_ms": round((time.perf_counter() - trace.started) * 1000, 1),
+            "steps": steps,
+            "rpcs": trace.calls,
+        }
+        return results
+
+    def _search(self, query: str, limit: int, steps: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Perform an advanced search, appending the executed steps to steps if given."""
         try:
+            # Aggregation queries ("total unpaid bills per vendor") are answered by read_group
+            started = time.perf_counter()
+            aggregate_query = self.query_parser.parse_aggregate_query(query)
+            if aggregate_query:
+                if steps is not None:
+                    steps.append({"step": "parse", "ms": round((time.perf_counter() - started) * 1000, 1),
+                                  "plan": "aggregation"})
+                    started = time.perf_counter()
+                results = self.aggregate(aggregate_query["model"], aggregate_query["domain"],
+                                         aggregate_query["groupby"], aggregate_query["measures"], limit)
+                results["query"] = query
+                if steps is not None:
+                    steps.append({"step": "read_group", "model": aggregate_query["model"],
+                                  "domain": aggregate_query["domain"], "groupby": aggregate_query["groupby"],
+                                  "measures": results["measures"], "rows": len(results["groups"]),
+                                  "ms": round((time.perf_counter() - started) * 1000, 1)})
+                return results
+
             # Parse the query to identify models and generate domain filters
             parsed_results = self.query_parser.parse_complex_query(query)
+            if steps is not None:
+                steps.append({"step": "parse", "ms": round((time.perf_counter() - started) * 1000, 1),
+                              "plan": f"{len(parsed_results)} model searches"})
+                started = time.perf_counter()
 
             # Execute searches for each model
-            query_results = []
-
-            for model_name, domain, fields in parsed_results:
-                # Get model info
-                model_info = {
-                    "name": model_name,
-                    "fields": fields
-                }
-
-                # Set up search parameters
-                search_params = {
-                    'fields': fields,
-                    'limit': limit if limit > 0 else 1000  # Use a higher default limit to get more records
-                }
-
-                # Add ordering for specific queries
-                if model_name == "project.task" and "deadline date" in query.lower():
-                    search_params['order'] = 'date_deadline asc'
-
-                # Execute the search
-                try:
-                    # Use the client's execute method if available
-                    if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
-                        records = self.model_discovery.client.execute(
-                            model_name,
-                            'search_read',
-                            [domain],
-                            search_params
-                        )
-                    # Fallback to direct execution if models_proxy is available
-                    elif hasattr(self.model_discovery, 'models_proxy') and self.model_discovery.models_proxy:
-                        records = self.model_discovery.models_proxy.execute_kw(
-                            self.model_discovery.db,
-                            self.model_discovery.uid,
-                            self.model_discovery.password,
-                            model_name,
-                            'search_read',
-                            [domain],
-                            search_params
-                        )
-                    else:
-                        # Last resort fallback
-                        logger.warning(f"No suitable method found to execute search for {model_name}")
-                        records = []
-                except Exception as e:
-                    logger.error(f"Error executing search for {model_name}: {str(e)}")
-                    records = []
-
-                # Add to results
-                query_results.append((model_name, records, model_info))
+            query_results = self._execute_searches(query, parsed_results, limit)
+            if steps is not None:
+                for model_name, records, model_info in query_results:
+                    steps.append({"step": "search", "model": model_name, "domain": model_info.get("domain"),
+                                  "fields": model_info["fields"], "strategy": model_info.get("strategy"),
+                                  "rows": len(records), "truncated": bool(model_info.get("truncated"))})
+                steps.append({"step": "execute", "ms": round((time.perf_counter() - started) * 1000, 1)})
+                started = time.perf_counter()
 
             # Process the results
             if len(query_results) > 1:
                 # For complex queries with multiple models
                 results = self.relationship_handler.process_complex_query_results(query_results)
                 results["query"] = query
+                truncated = [model_name for model_name, _, model_info in query_results if model_info.get("truncated")]
+                if truncated:
+                    results["truncated"] = truncated
+                if steps is not None:
+                    steps.append({"step": "join", "relationship": results.get("relationship_type", "none"),
+                                  "from_field": results.get("from_field"), "to_field": results.get("to_field"),
+                                  "rows": results.get("count", 0),
+                                  "ms": round((time.perf_counter() - started) * 1000, 1)})
                 return results
             elif len(query_results) == 1:
                 # For simple queries with a single model
@@ -113,29 +438,12 @@ class AdvancedSearch:
 
                     # Get the Wood Corner partner ID
                     try:
-                        # Use the client's execute method if available
-                        if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
-                            partner_records = self.model_discovery.client.execute(
-                                'res.partner',
-                                'search_read',
-                                [[("name", "=", "Wood Corner")]],
-                                {'fields': ['id', 'name']}
-                            )
-                        # Fallback to direct execution if models_proxy is available
-                        elif hasattr(self.model_discovery, 'models_proxy') and self.model_discovery.models_proxy:
-                            partner_records = self.model_discovery.models_proxy.execute_kw(
-                                self.model_discovery.db,
-                                self.model_discovery.uid,
-                                self.model_discovery.password,
-                                'res.partner',
-                                'search_read',
-                                [[("name", "=", "Wood Corner")]],
-                                {'fields': ['id', 'name']}
-                            )
-                        else:
-                            # Last resort fallback
-                            logger.warning("No suitable method found to execute search for res.partner")
-                            partner_records = []
+                        partner_records = self._execute(
+                            'res.partner',
+                            'search_read',
+                            [[("name", "=", "Wood Corner")]],
+                            {'fields': ['id', 'name']}
+                        )
 
                         if partner_records:
                             wood_corner_id = partner_records[0]['id']
@@ -207,9 +515,16 @@ class AdvancedSearch:
             return f"# Error\n\n{results['error']}"
 
         output = f"# Search Results for: {results['query']}\n\n"
+        if results.get("truncated"):
+            output += (f"**Note**: only the first {RELATED_RECORDS_LIMIT} related records of "
+                       f"{', '.join(results['truncated'])} were fetched, so the results are incomplete.\n\n")
+
+        # Handle aggregated results
+        if "groups" in results:
+            output += self.format_aggregate(results)
 
         # Handle single model results
-        if "model" in results:
+        elif "model" in results:
             model_name = results["model"]
             records = results["records"]
             fields = results["fields"]
@@ -383,17 +698,102 @@ class AdvancedSearch:
         else:
             output += "No results to display.\n"
 
+        if "explain" in results:
+            output += self.format_explain(results["explain"])
+
+        return output
+
+    def format_aggregate(self, results: Dict[str, Any]) -> str:
+        """Format aggregated results as a markdown table.
+
+        Args:
+            results: Result of aggregate
+
+        Returns:
+            Formatted string with one row per group
+        """
+        groupby = results["groupby"]
+        measures = results["measures"]
+        groups = results["groups"]
+
+        output = f"## Model: {results['aggregate_model']}\n\n"
+        output += f"Found {len(groups)} groups.\n\n"
+        if not groups:
+            return output + "No records found matching the query.\n"
+
+        columns = groupby + ["Count"] + measures
+        output += "| " + " | ".join(columns) + " |\n"
+        output += "| " + " | ".join(["---" for _ in columns]) + " |\n"
+        for row in groups:
+            values = []
+            for spec in groupby:
+                value = row["group"].get(spec)
+                if isinstance(value, (list, tuple)) and len(value) >= 2:
+                    value = value[1]  # Use the name
+                values.append("None" if value is False or value is None else str(value))
+            values.append(str(row["count"]))
+            values.extend(f"{row['measures'][measure]:,.2f}" for measure in measures)
+            output += "| " + " | ".join(values) + " |\n"
+
+        total_count = sum(row["count"] for row in groups)
+        totals = ["**Total**"] + [""] * (len(groupby) - 1) if groupby else []
+        totals.append(f"**{total_count}**")
+        for measure in measures:
+            if measure.endswith("_sum"):
+                totals.append(f"**{sum(row['measures'][measure] for row in groups):,.2f}**")
+            else:
+                totals.append("")
+        if groupby:
+            output += "| " + " | ".join(totals) + " |\n"
+        return output
+
+    def format_explain(self, explain: Dict[str, Any]) -> str:
+        """Format the explain entry of search results.
+
+        Args:
+            explain: The "explain" entry returned by search
+
+        Returns:
+            Formatted string with the executed steps and the RPCs issued
+        """
+        output = f"\n## Query Plan ({explain['total_ms']} ms)\n\n"
+        for index, step in enumerate(explain["steps"], 1):
+            details = ", ".join(f"{key}={value}" for key, value in step.items() if key != "step")
+            output += f"{index}. **{step['step']}**: {details}\n"
+
+        rpcs = explain["rpcs"]
+        output += f"\n### RPCs ({len(rpcs)})\n\n"
+        output += "Parser, search and join RPCs; entity index refreshes are not included.\n\n"
+        if rpcs:
+            output += "| Start (ms) | Time (ms) | Model | Method | Domain | Rows | Request (bytes) | Response (bytes) |\n"
+            output += "| --- | --- | --- | --- | --- | --- | --- | --- |\n"
+            for call in rpcs:
+                rows = call["rows"] if call["rows"] is not None else ""
+                domain = call["domain"] if call["domain"] is not None else ""
+                method = call["method"] + (f" (error: {call['error']})" if "error" in call else "")
+                output += (f"| {call['start_ms']} | {call['ms']} | {call['model']} | {method} | {domain} | "
+                           f"{rows} | {call['request_bytes']} | {call['response_bytes']} |\n")
+
+        counts: Dict[Tuple[str, str], int] = {}
+        for call in rpcs:
+            counts[(call["model"], call["method"])] = counts.get((call["model"], call["method"]), 0) + 1
+        repeated = [(key, count) for key, count in counts.items() if count > REPEATED_RPC_THRESHOLD]
+        if repeated:
+            output += "\n**Repeated RPCs (possible N+1 pattern)**\n\n"
+            for (model, method), count in repeated:
+                output += f"- {model}.{method}: {count} calls\n"
         return output
 
-    def execute_query(self, query: str, limit: int = 10) -> str:
+    def execute_query(self, query: str, limit: int = 10, explain: bool = False) -> str:
         """Execute a natural language query and return formatted results.
 
         Args:
             query: Natural language query string
             limit: Maximum number of records to return per model
+            explain: Whether to append the query plan and the RPCs issued
 
         Returns:
             Formatted string with search results
         """
-        results = self.search(query, limit)
+        results = self.search(query, limit, explain=explain)
         return self.format_results(results)
\ No newline at end of file
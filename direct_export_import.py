@@ -83,7 +83,8 @@ def export_related_records(parent_model, child_model, relation_field, parent_fie
 def import_related_records(parent_model, child_model, relation_field, parent_fields=None, child_fields=None,parent_field_mapping = None,
                            child_field_mapping = None,
                       input_path=None, name_prefix=None, parent_defaults=None, child_defaults=None,
-                      force=False, reset_to_draft=False, skip_readonly_fields=False, create_if_not_exists=True, update_if_exists=True):
+                      force=False, reset_to_draft=False, skip_readonly_fields=False, create_if_not_exists=True, update_if_exists=True,
+                      use_one2many=False, one2many_field=None):
     """
     Wrapper around dynamic_data_tool.import_rel.
 
@@ -102,6 +103,8 @@ def import_related_records(parent_model, child_model, relation_field, parent_fie
         skip_readonly_fields: Whether to skip readonly fields for posted records
         create_if_not_exists: Whether to create new records if they don't exist
         update_if_exists: Whether to update existing records
+        use_one2many: Whether to write each parent and its lines in one call using one2many commands
+        one2many_field: One2many field on the parent holding the lines (auto-detected if not provided)
     """
     class Args:
         pass
@@ -160,6 +163,8 @@ def import_related_records(parent_model, child_model, relation_field, parent_fie
     args.skip_readonly_fields = skip_readonly_fields
     args.create_if_not_exists = create_if_not_exists
     args.update_if_exists = update_if_exists
+    args.use_one2many = use_one2many
+    args.one2many_field = one2many_field
 
     # Call the import_rel function
     try:
@@ -177,7 +182,7 @@ def import_related_records(parent_model, child_model, relation_field, parent_fie
         try:
             with open(input_path, 'r') as f:
                 # Subtract 1 for the header row
-                total_records = len(f.readlines()) - 1
+                total_records = sum(1 for _ in f) - 1
                 if total_records < 0:
                     total_records = 0
         except Exception:
@@ -200,7 +205,48 @@ def import_related_records(parent_model, child_model, relation_field, parent_fie
         "child_created": summary["child_created"],
         "child_updated": summary["child_updated"],
         "child_failed": summary["child_failed"],
-        "validation_errors": []  # Placeholder
+        "validation_errors": summary.get("validation_errors", [])
+    }
+
+
+def import_directory(directory, manifest=None, update_if_exists=False, force=False, workers=4, plan_only=False):
+    """
+    Wrapper around dynamic_data_tool.import_dir.
+
+    Args:
+        directory: Directory holding the CSV files
+        manifest: Optional path of the JSON manifest with file/model mappings
+        update_if_exists: Whether to update existing records
+        force: Whether to force import even if required fields are missing
+        workers: Number of files imported in parallel within a dependency level
+        plan_only: Whether to only compute the import levels
+    """
+    class Args:
+        pass
+    args = Args()
+    args.directory = directory
+    args.manifest = manifest
+    args.update = update_if_exists
+    args.force = force
+    args.workers = workers
+    args.plan_only = plan_only
+
+    try:
+        from scripts.dynamic_data_tool import import_dir
+        summary = import_dir(args)
+        success = True
+        error = None
+    except Exception as e:
+        summary = {}
+        success = False
+        error = str(e)
+
+    return {
+        "success": success,
+        "error": error,
+        "directory": directory,
+        "levels": summary.get("levels", []),
+        "results": summary.get("results", {}),
     }
 
 
@@ -241,7 +287,7 @@ def export_records(model_name, output_path, filter_domain=None, fields=None, lim
         try:
             with open(output_path, 'r') as f:
                 # Subtract 1 for the header row
-                total_records = len(f.readlines()) - 1
+                total_records = sum(1 for _ in f) - 1
                 if total_records < 0:
                     total_records = 0
         except Exception:
@@ -259,7 +305,8 @@ def export_records(model_name, output_path, filter_domain=None, fields=None, lim
 
 
 def import_records(input_path, model_name, field_mapping=None, create_if_not_exists=True,
-               update_if_exists=True, defaults=None, force=False, skip_invalid=False, name_prefix=None, match_field='id'):
+               update_if_exists=True, defaults=None, force=False, skip_invalid=False, name_prefix=None, match_field='id',
+               journal_path=None, xmlid_module=None, dedupe=None):
     """
     Wrapper around dynamic_data_tool.import_model.
 
@@ -274,6 +321,9 @@ def import_records(input_path, model_name, field_mapping=None, create_if_not_exi
         skip_invalid: Whether to skip invalid values for selection fields
         name_prefix: Prefix for the name field during import
         match_field: Field to use for matching existing records (default: id)
+        journal_path: Optional SQLite journal file; rows recorded there by a previous run are skipped
+        xmlid_module: Optional module prefix for external ids mirrored from the journal
+        dedupe: Optional duplicate policy ('first' or 'last') collapsing rows that match the same record
     """
     class Args:
         pass
@@ -300,6 +350,9 @@ def import_records(input_path, model_name, field_mapping=None, create_if_not_exi
     args.create_if_not_exists = create_if_not_exists
     args.update = update_if_exists  # Set update flag for import_model
     args.match_field = match_field  # Field to use for matching existing records
+    args.journal = journal_path
+    args.xmlid_module = xmlid_module
+    args.dedupe = dedupe
 
     # Call the import_model function
     created_count = 0
@@ -329,7 +382,7 @@ def import_records(input_path, model_name, field_mapping=None, create_if_not_exi
         try:
             with open(input_path, 'r') as f:
                 # Subtract 1 for the header row
-                total_records = len(f.readlines()) - 1
+                total_records = sum(1 for _ in f) - 1
                 if total_records < 0:
                     total_records = 0
         except Exception:
@@ -345,5 +398,8 @@ def import_records(input_path, model_name, field_mapping=None, create_if_not_exi
         "field_mapping": field_mapping or {},
         "total_records": total_records,
         "failed_records": summary["error_count"],
-        "validation_errors": []  # Placeholder
+        "unchanged_records": summary.get("unchanged_count", 0),
+        "collapsed_records": summary.get("collapsed_count", 0),
+        "journaled_records": summary.get("journaled_count", 0),
+        "validation_errors": summary.get("validation_errors", [])
     }
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Domain Evaluator Module
+
+This module evaluates Odoo domains against records held in memory, so that a
+query narrower than a cached result (an extra filter, a longer search term or
+a smaller limit) can be answered without a round trip.
+"""
+
+import re
+from typing import Dict, List, Any, Optional, Set, Callable
+
+# Operators evaluated locally; any other operator makes the domain unsupported
+OPERATORS = ['=', '!=', 'ilike', 'not ilike', 'in', 'not in', '<', '>', '<=', '>=', 'child_of']
+
+# Constant leaves of Odoo domains
+TRUE_LEAF = (1, '=', 1)
+FALSE_LEAF = (0, '=', 1)
+
+
+class UnsupportedDomain(ValueError):
+    """Raised when a domain cannot be evaluated on the records at hand."""
+
+
+def _freeze(value: Any) -> Any:
+    """Make a domain value hashable and comparable (lists become tuples)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def parse_domain(domain: List[Any]) -> tuple:
+    """Parse a domain in prefix notation into a tree.
+
+    Nodes are ('&', [children]), ('|', [children]), ('!', child),
+    ('leaf', (field, operator, value)) and ('true',) / ('false',). Consecutive
+    top-level terms are implicitly combined with '&', and nested nodes of the
+    same operator are flattened.
+
+    Args:
+        domain: Odoo domain
+
+    Returns:
+        Domain tree
+
+    Raises:
+        UnsupportedDomain: If the domain is malformed or uses an unsupported operator
+    """
+    stack = []
+    for token in reversed(list(domain or [])):
+        if token in ('&', '|'):
+            if len(stack) < 2:
+                raise UnsupportedDomain(f"Operator {token} lacks operands")
+            stack.append(_combine(token, [stack.pop(), stack.pop()]))
+        elif token == '!':
+            if not stack:
+                raise UnsupportedDomain("Operator ! lacks an operand")
+            stack.append(('!', stack.pop()))
+        elif isinstance(token, (list, tuple)) and len(token) == 3:
+            leaf = (token[0], token[1], _freeze(token[2]))
+            if leaf == TRUE_LEAF:
+                stack.append(('true',))
+            elif leaf == FALSE_LEAF:
+                stack.append(('false',))
+            elif not isinstance(leaf[0], str) or leaf[1] not in OPERATORS:
+                raise UnsupportedDomain(f"Unsupported condition {token}")
+            else:
+                stack.append(('leaf', leaf))
+        else:
+            raise UnsupportedDomain(f"Unsupported domain term {token}")
+    if not stack:
+        return ('true',)
+    if len(stack) == 1:
+        return stack[0]
+    return _combine('&', list(reversed(stack)))
+
+
+def _combine(operator: str, children: List[tuple]) -> tuple:
+    """Build an '&' or '|' node, flattening children of the same operator."""
+    flat = []
+    for child in children:
+        flat.extend(child[1] if child[0] == operator else [child])
+    return (operator, flat)
+
+
+def conjuncts(tree: tuple) -> List[tuple]:
+    """The nodes a tree requires all at once."""
+    if tree[0] == '&':
+        return list(tree[1])
+    if tree[0] == 'true':
+        return []
+    return [tree]
+
+
+def domain_fields(tree: tuple) -> Set[str]:
+    """Names of the fields a tree reads; related paths ("partner_id.name") are unsupported."""
+    if tree[0] == 'leaf':
+        field = tree[1][0]
+        if '.' in field:
+            raise UnsupportedDomain(f"Related path {field} cannot be evaluated locally")
+        return {field}
+    if tree[0] in ('&', '|'):
+        fields = set()
+        for child in tree[1]:
+            fields |= domain_fields(child)
+        return fields
+    if tree[0] == '!':
+        return domain_fields(tree[1])
+    return set()
+
+
+def _is_many2one(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and len(value) == 2 and isinstance(value[0], int) \
+        and isinstance(value[1], str)
+
+
+def _is_x2many(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and not _is_many2one(value)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is False or value is None or (isinstance(value, (list, tuple)) and not value)
+
+
+def _like_matches(pattern: str, text: str) -> bool:
+    """Case-insensitive ilike match, with % and _ as wildcards."""
+    if '%' not in pattern and '_' not in pattern:
+        return pattern.lower() in text.lower()
+    regex = ''.join('.*' if char == '%' else '.' if char == '_' else re.escape(char) for char in pattern)
+    return re.search(regex, text, re.IGNORECASE | re.DOTALL) is not None
+
+
+def _evaluate_leaf(leaf: tuple, record: Dict[str, Any],
+                   parent_of: Optional[Callable[[str, int], Any]]) -> bool:
+    """Evaluate a condition on a record, following Odoo's handling of empty values."""
+    field, operator, right = leaf
+    if field not in record:
+        raise UnsupportedDomain(f"Field {field} is not in the record")
+    value = record[field]
+
+    if operator in ('=', '!='):
+        if right is False or right is None:
+            matched = _is_empty(value)
+        elif isinstance(right, bool) or not isinstance(right, (int, float, str)):
+            if isinstance(right, bool) and not isinstance(value, (list, tuple)):
+                matched = value is right
+            else:
+                raise UnsupportedDomain(f"Cannot compare {field} with {right!r}")
+        elif _is_many2one(value) or _is_x2many(value):
+            if not isinstance(right, int):
+                raise UnsupportedDomain(f"Comparing relational field {field} with a name needs a name search")
+            if _is_x2many(value) and operator == '!=':
+                raise UnsupportedDomain(f"!= on x2many field {field}")
+            matched = value[0] == right if _is_many2one(value) else right in value
+        else:
+            matched = value == right
+        return matched if operator == '=' else not matched
+
+    if operator in ('in', 'not in'):
+        if not isinstance(right, tuple):
+            raise UnsupportedDomain(f"{operator} needs a list of values")
+        if _is_empty(value):
+            matched = False in right
+        elif _is_many2one(value):
+            matched = value[0] in right
+        elif _is_x2many(value):
+            if operator == 'not in':
+                raise UnsupportedDomain(f"not in on x2many field {field}")
+            matched = any(item in right for item in value)
+        else:
+            matched = value in right
+        return matched if operator == 'in' else not matched
+
+    if operator in ('ilike', 'not ilike'):
+        if not isinstance(right, str):
+            raise UnsupportedDomain(f"{operator} needs a string")
+        if _is_many2one(value):
+            # Odoo name-searches the comodel (_rec_names_search: email, ref, vat...), not just display names
+            raise UnsupportedDomain(f"{operator} on many2one field {field} needs a name search")
+        if _is_empty(value):
+            matched = False
+        elif isinstance(value, str):
+            matched = _like_matches(right, value)
+        else:
+            raise UnsupportedDomain(f"{operator} on non-text field {field}")
+        return matched if operator == 'ilike' else not matched
+
+    if operator in ('<', '>', '<=', '>='):
+        if _is_empty(value):
+            return False
+        numbers = (int, float)
+        comparable = (isinstance(value, str) and isinstance(right, str)) or (
+            isinstance(value, numbers) and isinstance(right, numbers)
+            and not isinstance(value, bool) and not isinstance(right, bool))
+        if not comparable:
+            raise UnsupportedDomain(f"Cannot order {field} against {right!r}")
+        if operator == '<':
+            return value < right
+        if operator == '>':
+            return value > right
+        if operator == '<=':
+            return value <= right
+        return value >= right
+
+    if operator == 'child_of':
+        if parent_of is None:
+            raise UnsupportedDomain("child_of needs the parents of the records")
+        roots = set(right) if isinstance(right, tuple) else {right}
+        if not all(isinstance(root, int) and not isinstance(root, bool) for root in roots):
+            raise UnsupportedDomain("child_of with names needs a name search")
+        if field == 'id':
+            ids = [value]
+        elif _is_many2one(value):
+            ids = [value[0]]
+        elif _is_x2many(value):
+            ids = list(value)
+        else:
+            ids = []
+        for record_id in ids:
+            seen = set()
+            while record_id and record_id not in seen:
+                if record_id in roots:
+                    return True
+                seen.add(record_id)
+                try:
+                    record_id = parent_of(field, record_id)
+                except LookupError:
+                    raise UnsupportedDomain(f"Parent of {field} {record_id} is not cached")
+        return False
+
+    raise UnsupportedDomain(f"Unsupported operator {operator}")
+
+
+def evaluate(tree: tuple, record: Dict[str, Any],
+             parent_of: Optional[Callable[[str, int], Any]] = None) -> bool:
+    """Evaluate a domain tree on a record.
+
+    Args:
+        tree: Tree returned by parse_domain
+        record: Record as returned by read/search_read
+        parent_of: Function returning the parent id (or False) of a record
+            referenced by a field, raising LookupError when it is unknown;
+            needed for child_of
+
+    Returns:
+        Whether the record matches
+
+    Raises:
+        UnsupportedDomain: If the result cannot be decided from the record
+    """
+    kind = tree[0]
+    if kind == 'leaf':
+        return _evaluate_leaf(tree[1], record, parent_of)
+    if kind == '&':
+        return all(evaluate(child, record, parent_of) for child in tree[1])
+    if kind == '|':
+        return any(evaluate(child, record, parent_of) for child in tree[1])
+    if kind == '!':
+        return not evaluate(tree[1], record, parent_of)
+    return kind == 'true'
+
+
+def _leaf_implies(narrow: tuple, wide: tuple) -> bool:
+    """Whether every record satisfying one condition satisfies another."""
+    if narrow == wide:
+        return True
+    field, operator, value = narrow
+    wide_field, wide_operator, wide_value = wide
+    if field != wide_field:
+        return False
+
+    if wide_operator == 'ilike' and isinstance(wide_value, str) and '%' not in wide_value and '_' not in wide_value:
+        if operator in ('ilike', '=') and isinstance(value, str) and '%' not in value and '_' not in value:
+            return wide_value.lower() in value.lower()
+        return False
+
+    if wide_operator == 'in' and isinstance(wide_value, tuple):
+        if operator == 'in' and isinstance(value, tuple):
+            return set(value) <= set(wide_value)
+        if operator == '=' and value is not False:
+            return value in wide_value
+        return False
+
+    bounds = {'<': 'upper', '<=': 'upper', '>': 'lower', '>=': 'lower'}
+    if operator in bounds and bounds.get(wide_operator) == bounds[operator]:
+        try:
+            if value == wide_value:
+                return operator == wide_operator or wide_operator in ('<=', '>=')
+            return value < wide_value if bounds[operator] == 'upper' else value > wide_value
+        except TypeError:
+            return False
+    return False
+
+
+def _leaf_names(tree: tuple) -> Set[str]:
+    """Names of the fields a tree reads, related paths included."""
+    if tree[0] == 'leaf':
+        return {tree[1][0]}
+    if tree[0] in ('&', '|'):
+        return set().union(*(_leaf_names(child) for child in tree[1]))
+    if tree[0] == '!':
+        return _leaf_names(tree[1])
+    return set()
+
+
+def covers(wide: tuple, narrow: tuple, active_field: str = 'active') -> bool:
+    """Whether every record matching the narrow tree matches the wide one.
+
+    Judged conservatively: each conjunct of the wide tree must be implied by a
+    conjunct of the narrow one (the same condition, a longer ilike term, a
+    smaller in list or a tighter bound). False means "not known to cover".
+    A narrow tree naming the active field is never covered by a wide one that
+    does not: Odoo only searches archived records when the domain names it.
+    """
+    if active_field in _leaf_names(narrow) and active_field not in _leaf_names(wide):
+        return False
+    narrow_conjuncts = conjuncts(narrow)
+    for wide_conjunct in conjuncts(wide):
+        if wide_conjunct[0] == 'leaf':
+            implied = any(conjunct[0] == 'leaf' and _leaf_implies(conjunct[1], wide_conjunct[1])
+                          for conjunct in narrow_conjuncts)
+        else:
+            implied = wide_conjunct in narrow_conjuncts
+        if not implied:
+            return False
+    return True
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Entity Index Module
+
+This module provides an optional local trigram index of the display names of
+high-traffic Odoo models, used to resolve entity names found in queries
+("Wood Corner", "Acoustic Bloc Screens") to record ids without a round trip,
+tolerating misspellings.
+"""
+
+import logging
+import re
+import threading
+import time
+import xmlrpc.client
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Models indexed when no list is configured
+DEFAULT_INDEXED_MODELS = ["res.partner", "product.product", "project.project"]
+
+# Minimum fraction of the query trigrams a name must contain to match
+MIN_SIMILARITY = 0.6
+
+# Seconds between incremental refreshes (by write_date) and full rebuilds of a model
+REFRESH_INTERVAL = 60
+FULL_REFRESH_INTERVAL = 3600
+
+# Records read per search_read call when refreshing
+REFRESH_BATCH_SIZE = 5000
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase a name and collapse punctuation and whitespace."""
+    return " ".join(re.sub(r'[^\w]+', ' ', str(text).lower()).split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of a normalized name, padded so short words still have trigrams."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram index of the display names of one model."""
+
+    def __init__(self, model_name: str):
+        """Initialize an empty index.
+
+        Args:
+            model_name: Technical name of the indexed model
+        """
+        self.model_name = model_name
+        self.names: Dict[int, str] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.last_write_date: Optional[str] = None
+        self.refreshed_at = 0.0
+        self.rebuilt_at = 0.0
+
+    def add(self, record_id: int, name: str):
+        """Index (or re-index) the name of a record."""
+        self.remove(record_id)
+        normalized = normalize_name(name)
+        self.names[record_id] = normalized
+        for gram in trigrams(normalized):
+            self.postings.setdefault(gram, set()).add(record_id)
+
+    def remove(self, record_id: int):
+        """Remove a record from the index."""
+        normalized = self.names.pop(record_id, None)
+        if normalized is None:
+            return
+        for gram in trigrams(normalized):
+            ids = self.postings.get(gram)
+            if ids:
+                ids.discard(record_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def search(self, text: str, limit: int = 20,
+               min_similarity: float = MIN_SIMILARITY) -> List[Tuple[int, float]]:
+        """Find the records whose name contains (approximately) a text.
+
+        The score of a name is the fraction of the text's trigrams it contains,
+        so "azure" fully matches "Azure Interior" and "azur interor" still
+        matches it closely. When some names contain every trigram, only those
+        are returned.
+
+        Args:
+            text: Entity text from the query
+            limit: Maximum number of matches
+            min_similarity: Minimum score of a match
+
+        Returns:
+            List of (record_id, score) tuples, best first
+        """
+        normalized = normalize_name(text)
+        grams = trigrams(normalized)
+        if not normalized or not grams:
+            return []
+
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for record_id in self.postings.get(gram, ()):
+                shared[record_id] = shared.get(record_id, 0) + 1
+
+        scored = []
+        for record_id, count in shared.items():
+            score = count / len(grams)
+            if score >= min_similarity:
+                # Prefer exact names, then shorter names among equal scores
+                exact = self.names[record_id] == normalized
+                scored.append((not exact, -score, len(self.names[record_id]), record_id))
+        scored.sort()
+        if scored and scored[0][1] == -1.0:
+            scored = [entry for entry in scored if entry[1] == -1.0]
+        return [(record_id, -score) for _, score, _, record_id in scored[:limit]]
+
+
+class EntityIndex:
+    """Local name indexes of several models, refreshed incrementally by write_date."""
+
+    def __init__(self, model_discovery, models: Optional[List[str]] = None,
+                 refresh_interval: float = REFRESH_INTERVAL,
+                 full_refresh_interval: float = FULL_REFRESH_INTERVAL):
+        """Initialize the entity index; model indexes are built on first use.
+
+        Args:
+            model_discovery: ModelDiscovery instance for accessing Odoo models
+            models: Models to index (DEFAULT_INDEXED_MODELS if None)
+            refresh_interval: Seconds between incremental refreshes of a model
+            full_refresh_interval: Seconds between full rebuilds of a model,
+                which drop deleted records
+        """
+        self.model_discovery = model_discovery
+        self.models = list(models or DEFAULT_INDEXED_MODELS)
+        self.refresh_interval = refresh_interval
+        self.full_refresh_interval = full_refresh_interval
+        self.indexes: Dict[str, TrigramIndex] = {}
+        self._has_active: Dict[str, bool] = {}
+        self._rebuilding: Set[str] = set()
+        self._lock = threading.Lock()
+        # Object proxy of a background rebuild thread (XML-RPC proxies are not thread-safe)
+        self._local = threading.local()
+
+    def _connection(self) -> Tuple[Optional[str], str, int, str]:
+        """Server URL (None if unknown), database, user id and password of the model discovery."""
+        client = getattr(self.model_discovery, 'client', None)
+        if client:
+            return client.config.url, client.config.db, client.uid, client.config.password
+        return (getattr(self.model_discovery, 'url', None), self.model_discovery.db,
+                self.model_discovery.uid, self.model_discovery.password)
+
+    def _execute(self, model_name: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Execute a model method through the client or the object proxy."""
+        proxy = getattr(self._local, 'models_proxy', None)
+        if proxy:
+            _, db, uid, password = self._connection()
+            return proxy.execute_kw(db, uid, password, model_name, method, args, kwargs)
+        if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
+            return self.model_discovery.client.execute(model_name, method, args, kwargs)
+        return self.model_discovery.models_proxy.execute_kw(
+            self.model_discovery.db,
+            self.model_discovery.uid,
+            self.model_discovery.password,
+            model_name, method, args, kwargs
+        )
+
+    def refresh(self, model_name: str, full: bool = False):
+        """Bring the index of a model up to date.
+
+        Records written since the last refresh are (re-)indexed and archived
+        records are removed. A full refresh builds a new index, which also
+        drops deleted records, and replaces the served one once complete.
+
+        Args:
+            model_name: Model to refresh
+            full: Whether to rebuild the index from scratch
+        """
+        started = time.time()
+        index = self.indexes.get(model_name)
+        rebuilt = index is None or full
+        if rebuilt:
+            index = TrigramIndex(model_name)
+            index.rebuilt_at = started
+
+        if model_name not in self._has_active:
+            fields = self._execute(model_name, 'fields_get', [], {'attributes': ['type']})
+            self._has_active[model_name] = 'active' in fields
+
+        domain = [('write_date', '>=', index.last_write_date)] if index.last_write_date else []
+        fields = ['display_name', 'write_date'] + (['active'] if self._has_active[model_name] else [])
+        offset = 0
+        count = 0
+        while True:
+            records = self._execute(model_name, 'search_read', [domain], {
+                'fields': fields,
+                'order': 'write_date asc, id asc',
+                'offset': offset,
+                'limit': REFRESH_BATCH_SIZE,
+                'context': {'active_test': False},
+            })
+            for record in records:
+                if record.get('active', True) and record.get('display_name'):
+                    index.add(record['id'], record['display_name'])
+                else:
+                    index.remove(record['id'])
+                if record.get('write_date') and (not index.last_write_date
+                                                 or record['write_date'] > index.last_write_date):
+                    index.last_write_date = record['write_date']
+            count += len(records)
+            if len(records) < REFRESH_BATCH_SIZE:
+                break
+            offset += REFRESH_BATCH_SIZE
+
+        index.refreshed_at = time.time()
+        if rebuilt:
+            self.indexes[model_name] = index
+        logger.info(f"Refreshed entity index of {model_name}: {count} records read, {len(index.names)} indexed "
+                    f"in {index.refreshed_at - started:.1f}s")
+
+    def _rebuild(self, model_name: str, url: str):
+        """Rebuild the index of a model in a background thread, with an object proxy of its own."""
+        self._local.models_proxy = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object", allow_none=True)
+        try:
+            self.refresh(model_name, full=True)
+        except Exception as e:
+            logger.error(f"Error rebuilding entity index of {model_name}: {str(e)}")
+        finally:
+            with self._lock:
+                self._rebuilding.discard(model_name)
+
+    def _ensure_fresh(self, model_name: str):
+        """Refresh the index of a model if it is missing or stale.
+
+        A missing index is built before answering. Full rebuilds of an existing
+        index read the whole model, so when the server URL is known they run
+        in a daemon thread while the current index keeps answering.
+        """
+        index = self.indexes.get(model_name)
+        now = time.time()
+        url = self._connection()[0]
+        if index is None or (now - index.rebuilt_at >= self.full_refresh_interval and not url):
+            self.refresh(model_name, full=True)
+        elif now - index.rebuilt_at >= self.full_refresh_interval:
+            if model_name not in self._rebuilding:
+                self._rebuilding.add(model_name)
+                threading.Thread(target=self._rebuild, args=(model_name, url),
+                                 name=f"entity-index-{model_name}", daemon=True).start()
+        elif now - index.refreshed_at >= self.refresh_interval:
+            self.refresh(model_name)
+
+    def resolve(self, model_name: str, text: str, limit: int = 20) -> List[int]:
+        """Resolve an entity name to the ids of the matching records.
+
+        Args:
+            model_name: Model of the entity
+            text: Entity text from the query
+            limit: Maximum number of ids; a result of limit ids may be truncated
+
+        Returns:
+            List of record ids, best match first; empty if the model is not
+            indexed, the index could not be loaded or nothing matches
+        """
+        if model_name not in self.models:
+            return []
+        with self._lock:
+            try:
+                self._ensure_fresh(model_name)
+            except Exception as e:
+                logger.error(f"Error refreshing entity index of {model_name}: {str(e)}")
+                if model_name not in self.indexes:
+                    return []
+            matches = self.indexes[model_name].search(text, limit)
+        logger.debug(f"Resolved '{text}' in {model_name} to {matches}")
+        return [record_id for record_id, _ in matches]
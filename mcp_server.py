@@ -61,6 +61,10 @@ try:
 
     # Import the advanced search implementation
     from advanced_search import AdvancedSearch
+    from entity_index import EntityIndex, DEFAULT_INDEXED_MODELS
+    from schema_index import get_schema_index
+    from record_cache import RecordCache, RECORD_CACHE_MAX_BYTES
+    from replica import OdooReplica, parse_replica_models, REPLICA_SYNC_INTERVAL
 
     # Import the Odoo documentation retriever and storage
     try:
@@ -108,18 +112,29 @@ try:
     ODOO_DB = os.getenv("ODOO_DB", "llmdb18")
     ODOO_USERNAME = os.getenv("ODOO_USERNAME", "admin")
     ODOO_PASSWORD = os.getenv("ODOO_PASSWORD", "admin")
+    # Local name index for entity resolution: "true" for the default models, or a comma-separated model list
+    ODOO_ENTITY_INDEX = os.getenv("ODOO_ENTITY_INDEX", "")
+    # Read-through record cache: entry lifetime in seconds and size bound. Off unless a TTL is set,
+    # since records changed outside this process are served stale for up to the TTL
+    ODOO_RECORD_CACHE_TTL = float(os.getenv("ODOO_RECORD_CACHE_TTL", "0"))
+    ODOO_RECORD_CACHE_MAX_BYTES = int(os.getenv("ODOO_RECORD_CACHE_MAX_BYTES", str(RECORD_CACHE_MAX_BYTES)))
+    # Local SQLite replica: "model:field,field;model" (empty disables it), database path and sync interval
+    ODOO_REPLICA_MODELS = os.getenv("ODOO_REPLICA_MODELS", "")
+    ODOO_REPLICA_PATH = os.getenv("ODOO_REPLICA_PATH", "./odoo_replica.db")
+    ODOO_REPLICA_SYNC_INTERVAL = float(os.getenv("ODOO_REPLICA_SYNC_INTERVAL", str(REPLICA_SYNC_INTERVAL)))
 
     logger.info(f"Connecting to Odoo at {ODOO_URL}, database {ODOO_DB}")
 
     # Odoo Model Discovery class
     class OdooModelDiscovery:
-        def __init__(self, url, db, username, password):
+        def __init__(self, url, db, username, password, record_cache=None):
             self.url = url
             self.db = db
             self.username = username
             self.password = password
             self.uid = None
             self.models_proxy = None
+            self.record_cache = record_cache
             self._connect()
 
         def _connect(self):
@@ -140,6 +155,12 @@ try:
                 logger.error(f"Error connecting to Odoo: {str(e)}")
                 raise
 
+        def _executor(self, model_name):
+            """Function executing (method, args, kwargs) on a model, for the record cache"""
+            return lambda method, args, kwargs: self.models_proxy.execute_kw(
+                self.db, self.uid, self.password, model_name, method, args, kwargs
+            )
+
         def get_all_models(self):
             """Get all available models"""
             try:
@@ -173,7 +194,20 @@ try:
 
         def get_model_fields(self, model_name):
             """Get all fields for a specific model"""
+            attributes = [
+                "string",
+                "help",
+                "type",
+                "required",
+                "readonly",
+                "selection",
+                "relation",
+            ]
             try:
+                if self.record_cache:
+                    return self.record_cache.get_fields(
+                        self._executor(model_name), model_name, attributes
+                    )
                 fields = self.models_proxy.execute_kw(
                     self.db,
                     self.uid,
@@ -181,17 +215,7 @@ try:
                     model_name,
                     "fields_get",
                     [],
-                    {
-                        "attributes": [
-                            "string",
-                            "help",
-                            "type",
-                            "required",
-                            "readonly",
-                            "selection",
-                            "relation",
-                        ]
-                    },
+                    {"attributes": attributes},
                 )
                 return fields
             except Exception as e:
@@ -230,15 +254,21 @@ try:
                         break
 
                 # Get records
-                records = self.models_proxy.execute_kw(
-                    self.db,
-                    self.uid,
-                    self.password,
-                    model_name,
-                    "search_read",
-                    [domain],
-                    {"fields": fields_to_show, "limit": limit, "offset": offset},
-                )
+                search_params = {"fields": fields_to_show, "limit": limit, "offset": offset}
+                if self.record_cache:
+                    records = self.record_cache.search_read(
+                        self._executor(model_name), model_name, domain, search_params
+                    )
+                else:
+                    records = self.models_proxy.execute_kw(
+                        self.db,
+                        self.uid,
+                        self.password,
+                        model_name,
+                        "search_read",
+                        [domain],
+                        search_params,
+                    )
                 return records, fields_to_show, fields
             except Exception as e:
                 logger.error(f"Error getting records for {model_name}: {str(e)}")
@@ -320,6 +350,8 @@ try:
                 record_id = self.models_proxy.execute_kw(
                     self.db, self.uid, self.password, model_name, "create", [values]
                 )
+                if self.record_cache:
+                    self.record_cache.invalidate_for_method(model_name, "create", [values])
                 return record_id
             except Exception as e:
                 logger.error(f"Error creating record in {model_name}: {str(e)}")
@@ -336,6 +368,8 @@ try:
                     "write",
                     [[record_id], values],
                 )
+                if self.record_cache:
+                    self.record_cache.invalidate_for_method(model_name, "write", [[record_id]])
                 return result
             except Exception as e:
                 logger.error(
@@ -354,6 +388,8 @@ try:
                     "unlink",
                     [[record_id]],
                 )
+                if self.record_cache:
+                    self.record_cache.invalidate_for_method(model_name, "unlink", [[record_id]])
                 return result
             except Exception as e:
                 logger.error(
@@ -396,6 +432,8 @@ try:
                     result = self.models_proxy.execute_kw(
                         self.db, self.uid, self.password, model_name, method, args_list
                     )
+                if self.record_cache:
+                    self.record_cache.invalidate_for_method(model_name, method, args_list)
                 return result
             except Exception as e:
                 logger.error(
@@ -403,16 +441,44 @@ try:
                 )
                 raise
 
+    # Initialize the record cache shared by the read paths
+    record_cache = RecordCache(ttl=ODOO_RECORD_CACHE_TTL, max_bytes=ODOO_RECORD_CACHE_MAX_BYTES)
+    replica = None
+
     # Initialize Odoo model discovery
     try:
         model_discovery = OdooModelDiscovery(
-            ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD
+            ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD, record_cache=record_cache
         )
         logger.info("Odoo model discovery initialized successfully")
 
+        # Initialize the optional entity index
+        entity_index = None
+        if ODOO_ENTITY_INDEX.strip().lower() not in ("", "0", "false", "no"):
+            if ODOO_ENTITY_INDEX.strip().lower() in ("1", "true", "yes"):
+                indexed_models = DEFAULT_INDEXED_MODELS
+            else:
+                indexed_models = [model.strip() for model in ODOO_ENTITY_INDEX.split(",") if model.strip()]
+            entity_index = EntityIndex(model_discovery, indexed_models)
+            logger.info(f"Entity index enabled for {', '.join(indexed_models)}")
+
         # Initialize advanced search
-        advanced_search_instance = AdvancedSearch(model_discovery)
+        # Initialize the optional schema index (ODOO_SCHEMA_INDEX) for field mapping fallbacks
+        schema_index = get_schema_index()
+        if schema_index:
+            logger.info("Schema index enabled for field mapping")
+
+        advanced_search_instance = AdvancedSearch(model_discovery, entity_index=entity_index,
+                                                  schema_index=schema_index, record_cache=record_cache)
         logger.info("Advanced search initialized successfully")
+
+        # Initialize the optional local replica, synchronized in the background
+        replica_models = parse_replica_models(ODOO_REPLICA_MODELS)
+        if replica_models:
+            replica = OdooReplica(model_discovery, ODOO_REPLICA_PATH, replica_models,
+                                  sync_interval=ODOO_REPLICA_SYNC_INTERVAL)
+            replica.start()
+            logger.info(f"Replica of {', '.join(replica_models)} enabled at {ODOO_REPLICA_PATH}")
     except Exception as e:
         logger.error(f"Failed to initialize Odoo model discovery: {str(e)}")
         model_discovery = None
@@ -735,6 +801,8 @@ try:
                     # Try to find records matching the query in name field
                     domain = [("name", "ilike", query)]
 
+            # Reads through the record cache, which answers a search narrower than a
+            # cached one (e.g. a longer search term) without calling Odoo
             records, fields_to_show, fields_info = model_discovery.get_model_records(
                 model_name, limit=10, domain=domain
             )
@@ -785,7 +853,7 @@ try:
 
     # Tool for advanced searching across models
     @mcp.tool()
-    def advanced_search(query: str, limit: int = 100) -> str:
+    def advanced_search(query: str, limit: int = 100, explain: bool = False) -> str:
         """Perform an advanced search using natural language queries.
 
         This tool can handle complex queries across multiple Odoo models,
@@ -802,6 +870,10 @@ try:
         Args:
             query: Natural language query string
             limit: Maximum number of records to return per model (default: 100)
+            explain: Append the query plan (models, domains, fields, join strategy and
+                row counts per step) and the RPCs issued by the parser, the searches and
+                the join with their timings and payload sizes (entity index refreshes are
+                not included)
 
         Returns:
             A formatted string with the search results
@@ -812,11 +884,81 @@ try:
         try:
             # Execute the query with a higher limit to ensure we get all records
             # For complex queries involving relationships, the limit is applied to each model separately
-            return advanced_search_instance.execute_query(query, limit)
+            return advanced_search_instance.execute_query(query, limit, explain=explain)
         except Exception as e:
             logger.error(f"Error in advanced search: {str(e)}")
             return f"# Error in Advanced Search\n\n{str(e)}"
 
+    # Tool for server-side aggregation
+    @mcp.tool()
+    def aggregate_records(
+        query: str = "",
+        model_name: Optional[str] = None,
+        group_by: Optional[str] = None,
+        measures: Optional[str] = None,
+        domain: Optional[str] = None,
+        limit: int = 80,
+    ) -> str:
+        """Aggregate records on the Odoo server with read_group.
+
+        Returns one row per group (with its record count and measures) instead
+        of the individual records.
+
+        Examples:
+        - "Total unpaid bills per vendor"
+        - "Number of sales orders per month"
+        - "Average expected revenue of leads by stage"
+        - model_name="account.move", group_by="partner_id,invoice_date:month", measures="amount_total:sum"
+
+        Args:
+            query: Natural language aggregation query (used when model_name is not given)
+            model_name: The technical name of the Odoo model to aggregate
+            group_by: Comma-separated group-by fields, dates may have a granularity (e.g. "date_order:month")
+            measures: Comma-separated field:function pairs (sum, avg, min, max); the count is always included
+            domain: JSON domain filter, e.g. [["state", "=", "posted"]]
+            limit: Maximum number of groups to return (default: 80)
+
+        Returns:
+            A formatted string with the aggregated results
+        """
+        if not model_discovery or not advanced_search_instance:
+            return "# Error: Odoo Connection\n\nCould not connect to Odoo server. Please check your connection settings."
+
+        try:
+            if model_name:
+                try:
+                    domain_list = json.loads(domain) if domain else []
+                except json.JSONDecodeError:
+                    return "Error: Invalid JSON format for domain. Please provide a valid JSON list."
+                groupby = [field.strip() for field in (group_by or "").split(",") if field.strip()]
+                measure_list = []
+                for measure in (measures or "").split(","):
+                    if not measure.strip():
+                        continue
+                    field, _, function = measure.strip().partition(":")
+                    function = function or "sum"
+                    if function not in ("sum", "avg", "min", "max", "count_distinct"):
+                        return f"Error: Unsupported aggregate function '{function}' for field '{field}'."
+                    measure_list.append((field, function))
+                title = f"{model_name} grouped by {', '.join(groupby) or 'nothing'}"
+            else:
+                if not query:
+                    return "Error: Provide either a natural language query or a model_name."
+                spec = advanced_search_instance.query_parser.parse_aggregate_query(query)
+                if not spec:
+                    return (f"# Error in Aggregation\n\nCould not find an aggregation (total, count, average) "
+                            f"in the query: {query}")
+                model_name, domain_list = spec["model"], spec["domain"]
+                groupby, measure_list = spec["groupby"], spec["measures"]
+                title = query
+
+            results = advanced_search_instance.aggregate(model_name, domain_list, groupby, measure_list, limit)
+            results["query"] = title
+            return advanced_search_instance.format_results(results)
+        except Exception as e:
+            logger.error(f"Error aggregating records: {str(e)}")
+            return f"# Error in Aggregation\n\n{str(e)}"
+
     # Tool for creating records
     @mcp.tool()
     def create_record(model_name: str, values: Union[str, Dict[str, Any]]) -> str:
@@ -1038,6 +1180,92 @@ try:
             logger.error(f"Error executing method: {str(e)}")
             return f"Error executing method: {str(e)}"
 
+    # Tool for querying the local replica
+    @mcp.tool()
+    def query_replica(sql: str = "", sync: bool = False, limit: int = 100) -> str:
+        """Run a read-only SQL query on the local replica of selected Odoo models.
+
+        Filters and aggregations over replicated models run on a local SQLite
+        database instead of the Odoo server. Each model is a table named after
+        it (sale.order -> sale_order) with an id column, one column per field,
+        and an extra <field>_name column for many2one fields. The replica lags
+        behind Odoo by up to the sync interval.
+
+        Args:
+            sql: A single SELECT statement; leave empty to list the tables, columns and lag
+            sync: Synchronize the replicated models before answering
+            limit: Maximum number of rows to return
+
+        Returns:
+            A formatted string with the query results and the replica lag
+        """
+        if not replica:
+            return ("# Error: Replica Disabled\n\n"
+                    "Set ODOO_REPLICA_MODELS (e.g. `sale.order:name,partner_id,amount_total;res.partner`) "
+                    "to replicate models locally.")
+
+        if sync:
+            replica.sync_all()
+
+        result = "# Replica Query\n\n"
+        if sql.strip():
+            try:
+                columns, rows = replica.query(sql, limit=limit)
+            except Exception as e:
+                return f"# Error: Replica Query\n\n{str(e)}"
+            if columns:
+                result += "| " + " | ".join(columns) + " |\n"
+                result += "| " + " | ".join("---" for _ in columns) + " |\n"
+                for row in rows:
+                    result += "| " + " | ".join("" if value is None else str(value) for value in row) + " |\n"
+            result += f"\n{len(rows)} row(s){' (limit reached)' if len(rows) >= limit else ''}\n\n"
+
+        result += "## Replica Lag\n\n"
+        for status in replica.status():
+            if sql.strip() and status['table'] not in sql:
+                continue
+            lag = f"synchronized {status['lag']:.0f} seconds ago" if status['lag'] is not None \
+                else "not synchronized yet"
+            result += f"- **{status['model']}** (`{status['table']}`): {status['records']} records, "
+            result += f"{lag}, newest write {status['last_write_date'] or 'n/a'}\n"
+            if status['error']:
+                result += f"  - Last sync failed: {status['error']}\n"
+            if not sql.strip():
+                result += f"  - Columns: {', '.join(['id'] + status['columns'])}\n"
+        return result
+
+    # Tool for inspecting the record cache
+    @mcp.tool()
+    def record_cache_stats(clear: bool = False) -> str:
+        """Show the hit/miss counters and size of the in-process record cache.
+
+        The cache is disabled unless ODOO_RECORD_CACHE_TTL is set. When enabled,
+        records changed outside this server (in the Odoo UI, by other clients or
+        by computed fields on other models) can be returned stale for up to the
+        TTL; use clear=True to drop them at once.
+
+        Args:
+            clear: Drop all cached entries after reporting
+
+        Returns:
+            A formatted string with the cache statistics
+        """
+        stats = record_cache.stats()
+        result = "# Record Cache\n\n"
+        result += f"- **Enabled**: {stats['enabled']}\n"
+        result += f"- **Hits**: {stats['hits']}\n"
+        result += f"- **Misses**: {stats['misses']}\n"
+        result += f"- **Answered From Cached Supersets**: {stats['local_hits']}\n"
+        result += f"- **Hit Rate**: {stats['hit_rate']:.1%}\n"
+        result += f"- **Entries**: {stats['entries']}\n"
+        result += f"- **Size**: {stats['bytes']} / {stats['max_bytes']} bytes\n"
+        result += f"- **Evictions**: {stats['evictions']}\n"
+        result += f"- **TTL**: {stats['ttl']} seconds\n"
+        if clear:
+            record_cache.clear()
+            result += "\nCache cleared.\n"
+        return result
+
     # Tool for getting field importance
     @mcp.tool()
     def analyze_field_importance(model_name: str, use_nlp: bool = True) -> str:
@@ -1901,6 +2129,7 @@ try:
         child_defaults: Optional[str] = None,
         force: bool = False,
         name_prefix: Optional[str] = None,
+        use_one2many_commands: bool = False,
     ) -> str:
         """Import records from a structured CSV file into related models (parent and child).
 
@@ -1918,6 +2147,9 @@ try:
             child_defaults: Default values for child fields as a Python dict string
             force: Whether to force import even if required fields are missing
             name_prefix: Optional prefix for the name field during import
+            use_one2many_commands: Whether to create or update each parent together with its
+                child lines in a single call using one2many commands (recommended for
+                account.move/account.move.line, sale.order/sale.order.line)
 
         Returns:
             A confirmation message with the import results
@@ -2147,7 +2379,10 @@ try:
                 skip_readonly_fields=skip_readonly_fields,
                 create_if_not_exists=create_if_not_exists,
                 update_if_exists=update_if_exists,
+                use_one2many=use_one2many_commands,
             )
+            record_cache.invalidate(parent_model)
+            record_cache.invalidate(child_model)
 
             if not result["success"]:
                 return f"# Error Importing Related Records\n\n{result.get('error', 'Unknown error')}"
@@ -2209,6 +2444,10 @@ try:
         force: bool = False,
         skip_invalid: bool = False,
         name_prefix: Optional[str] = None,
+        journal_path: Optional[str] = None,
+        external_id_module: Optional[str] = None,
+        duplicate_policy: Optional[str] = None,
+        validate_first: bool = False,
     ) -> str:
         """Import records from a CSV file into an Odoo model.
 
@@ -2222,6 +2461,14 @@ try:
             force: Whether to force import even if required fields are missing
             skip_invalid: Whether to skip invalid values for selection fields
             name_prefix: Optional prefix for the name field during import
+            journal_path: Optional SQLite journal file making the import resumable; rows
+                already imported by a previous run are skipped
+            external_id_module: Optional module prefix under which created records also
+                get external ids (ir.model.data), used together with journal_path
+            duplicate_policy: Optional "first" or "last"; rows of the file that match the same
+                record are collapsed before import, keeping the first or last occurrence
+            validate_first: Whether to validate every row of the file (types, required values,
+                selection values, lengths) and refuse the import if any row is invalid
 
         Returns:
             A confirmation message with the import results
@@ -2319,6 +2566,31 @@ try:
                     except (SyntaxError, ValueError):
                         return f'# Error: Invalid Defaults\n\nThe defaults format is invalid: {defaults}\n\nExample valid format: "{{\\"autopost_bills\\": \\"never\\"}}"'
 
+            if validate_first:
+                from src.agents.export_import.utils.csv_validator import (
+                    validate_csv_file,
+                    format_validation_summary,
+                )
+
+                validation = validate_csv_file(
+                    input_path,
+                    available_fields,
+                    mapping,
+                    check_required=create_if_not_exists,
+                )
+                if not validation["valid"]:
+                    output = f"# Validation Failed\n\n"
+                    output += f"- **Rows Checked**: {validation['total_rows']}\n"
+                    output += f"- **Errors**: {validation['error_count']}\n\n"
+                    output += "## Errors by Column\n\n"
+                    for line in format_validation_summary(validation):
+                        output += f"- {line}\n"
+                    output += "\nNo records were imported. Fix the file and try again."
+                    return output
+
+            if duplicate_policy and duplicate_policy not in ("first", "last"):
+                return f"# Error: Invalid Duplicate Policy\n\nThe duplicate policy must be 'first' or 'last', got '{duplicate_policy}'."
+
             # Use the direct_export_import module to import records
             from direct_export_import import import_records as direct_import_records
 
@@ -2333,7 +2605,11 @@ try:
                 force=force,
                 skip_invalid=skip_invalid,
                 name_prefix=name_prefix,
+                journal_path=journal_path,
+                xmlid_module=external_id_module,
+                dedupe=duplicate_policy,
             )
+            record_cache.invalidate(model_name)
 
             if not result["success"]:
                 return f"# Error Importing Records\n\n{result.get('error', 'Unknown error')}"
@@ -2347,6 +2623,11 @@ try:
             output += f"- **Created Records**: {result['imported_records']}\n"
             output += f"- **Updated Records**: {result['updated_records']}\n"
             output += f"- **Failed Records**: {result['failed_records']}\n"
+            output += f"- **Unchanged Records**: {result.get('unchanged_records', 0)}\n"
+            if duplicate_policy:
+                output += f"- **Collapsed Duplicates**: {result.get('collapsed_records', 0)}\n"
+            if journal_path:
+                output += f"- **Skipped (already imported)**: {result.get('journaled_records', 0)}\n"
 
             if result["failed_records"] > 0 and "validation_errors" in result:
                 output += f"\n## Failed Records\n\n"
@@ -2379,6 +2660,85 @@ try:
             logger.error(f"Error importing records: {str(e)}")
             return f"# Error Importing Records\n\n{str(e)}"
 
+    @mcp.tool()
+    def import_directory_from_csv(
+        directory: str,
+        manifest_path: Optional[str] = None,
+        update_if_exists: bool = False,
+        force: bool = False,
+        workers: int = 4,
+        plan_only: bool = False,
+    ) -> str:
+        """Import a directory of CSV files (e.g. partners, products, orders) in dependency order.
+
+        Files are ordered by the many2one relations of their mapped fields: each level is
+        imported in parallel and the ids it creates are used to resolve the references
+        of the following levels.
+
+        Args:
+            directory: Directory holding the CSV files
+            manifest_path: Optional JSON manifest with a "files" list; each entry has a "file"
+                and either a "model" (with optional "field_mapping") or "parent_model",
+                "child_model", "relation_field", "parent_field_mapping" and
+                "child_field_mapping". Defaults to import_manifest.json in the directory;
+                without a manifest each file is imported into the model named after it
+                (res_partner.csv -> res.partner)
+            update_if_exists: Whether to update existing records
+            force: Whether to force import even if required fields are missing
+            workers: Number of files imported in parallel within a level
+            plan_only: Only show the import levels without importing
+
+        Returns:
+            The import levels and the results of each file
+        """
+        if not model_discovery:
+            return "# Error: Odoo Connection\n\nCould not connect to Odoo server. Please check your connection settings."
+
+        if not os.path.isdir(directory):
+            return f"# Error: Directory Not Found\n\nThe directory '{directory}' does not exist."
+
+        try:
+            from direct_export_import import import_directory
+
+            result = import_directory(
+                directory=directory,
+                manifest=manifest_path,
+                update_if_exists=update_if_exists,
+                force=force,
+                workers=workers,
+                plan_only=plan_only,
+            )
+            if not plan_only:
+                record_cache.clear()
+
+            if not result["success"]:
+                return f"# Error Importing Directory\n\n{result.get('error', 'Unknown error')}"
+
+            output = f"# Directory Import Results\n\n"
+            output += f"- **Directory**: {result['directory']}\n\n"
+            output += "## Import Levels\n\n"
+            for number, level in enumerate(result["levels"], start=1):
+                output += f"{number}. {', '.join(level)}\n"
+
+            if result["results"]:
+                output += "\n## Files\n\n"
+                for name, summary in result["results"].items():
+                    if summary.get("error"):
+                        output += f"- **{name}**: error: {summary['error']}\n"
+                        continue
+                    counts = ", ".join(
+                        f"{key.replace('_', ' ')}: {value}"
+                        for key, value in summary.items()
+                        if key != "validation_errors"
+                    )
+                    output += f"- **{name}**: {counts}\n"
+
+            return output
+
+        except Exception as e:
+            logger.error(f"Error importing directory: {str(e)}")
+            return f"# Error Importing Directory\n\n{str(e)}"
+
     # Add a prompt for advanced search
     @mcp.prompt()
     def advanced_search_prompt() -> str:
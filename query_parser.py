@@ -9,21 +9,175 @@ into Odoo domain filters for advanced search operations.
 """
 
 import re
+import copy
 import logging
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
 
+from term_matcher import TermMatcher
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of query templates kept in the plan cache
+PLAN_CACHE_SIZE = 256
+
+# Words the parsing patterns anchor on; a slot value containing one of them
+# could be parsed differently, so such values are never slotted
+STRUCTURAL_WORDS = ["for", "under", "by", "per", "name", "is", "customer", "client", "partner",
+                    "vendor", "project", "deadline", "task"]
+
+# Maximum number of record ids an entity name condition is replaced with; names
+# matching more records keep their ilike condition
+ENTITY_ID_LIMIT = 20
+
+# Entity values with hard-coded handling in parse_complex_query
+SPECIAL_ENTITIES = ["gemini furniture", "wood corner"]
+
+# Phrases that may precede a leading aggregate term ("what is the total ...")
+AGGREGATE_LEAD_IN = r"(?:what(?:'s| is| are)(?: the)?|show(?: me)?(?: the)?|give me(?: the)?|get(?: the)?|tell me(?: the)?|calculate(?: the)?|compute(?: the)?)"
+
+
+class _Slot:
+    """Placeholder for the n-th entity value of a cached query plan."""
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+class QueryPlanCache:
+    """LRU cache of parse results keyed by query template.
+
+    A template is the normalized query with its entity values (the strings of
+    the domain that were taken from the query) replaced by slots. A cached plan
+    holds the model, the domain skeleton with slots and the display fields, so
+    a query of the same shape is answered by filling in its own entity values.
+    """
+
+    def __init__(self, max_size: int = PLAN_CACHE_SIZE):
+        self.max_size = max_size
+        self._plans = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """Forget all plans."""
+        self._plans.clear()
+
+    def lookup(self, kind: str, query: str, guard) -> Optional[Any]:
+        """Return the plan of a query as a fresh result, or None.
+
+        Args:
+            kind: Parse method the plan belongs to
+            query: Normalized query
+            guard: Compiled pattern of the terms a slot value must not contain
+        """
+        for key, (pattern, plan) in self._plans.items():
+            if key[0] != kind:
+                continue
+            match = pattern.fullmatch(query)
+            if not match:
+                continue
+            values = match.groups()
+            if any(value != value.strip() or guard.search(value) for value in values):
+                continue
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return self._fill(plan, values)
+        self.misses += 1
+        return None
+
+    def store(self, kind: str, query: str, result: Any, guard) -> None:
+        """Learn the template and plan of a parsed query.
+
+        Queries whose entity values are ambiguous (repeated or overlapping in
+        the query) are cached literally, i.e. without slots.
+        """
+        values = []
+        self._collect_values(result, query, guard, values)
+        positions = []
+        for value in values:
+            start = query.find(value)
+            if query.find(value, start + 1) != -1:
+                values, positions = [], []
+                break
+            positions.append((start, start + len(value)))
+        positions.sort()
+        if any(end > next_start for (_, end), (next_start, _) in zip(positions, positions[1:])):
+            values, positions = [], []
+
+        template, pattern, last = [], [], 0
+        ordered = sorted(values, key=query.find)
+        for start, end in positions:
+            template.append(query[last:start] + "{}")
+            pattern.append(re.escape(query[last:start]) + "(.+?)")
+            last = end
+        template.append(query[last:])
+        pattern.append(re.escape(query[last:]))
+
+        key = (kind, "".join(template))
+        plan = self._template(result, {value: _Slot(index) for index, value in enumerate(ordered)})
+        self._plans[key] = (re.compile("".join(pattern)), plan)
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_size:
+            self._plans.popitem(last=False)
+
+    @staticmethod
+    def _searches(result: Any) -> List[Tuple[str, List[Any], List[str]]]:
+        """The (model, domain, fields) searches of a parse_query or parse_complex_query result."""
+        return [result] if isinstance(result, tuple) else list(result)
+
+    def _collect_values(self, result: Any, query: str, guard, values: List[str]) -> None:
+        """Collect the domain strings of a result that were taken from the query."""
+        for _, domain, _ in self._searches(result):
+            for condition in domain:
+                if not isinstance(condition, (list, tuple)) or len(condition) != 3:
+                    continue
+                value = condition[2]
+                if (isinstance(value, str) and value and value in query and value not in values
+                        and not guard.search(value)):
+                    values.append(value)
+
+    def _template(self, result: Any, slots: Dict[str, _Slot]) -> Any:
+        """Copy a result, replacing entity values in the domains with their slots."""
+        searches = []
+        for model_name, domain, fields in self._searches(result):
+            domain = [
+                type(condition)([condition[0], condition[1], slots[condition[2]]])
+                if (isinstance(condition, (list, tuple)) and len(condition) == 3
+                    and isinstance(condition[2], str) and condition[2] in slots)
+                else copy.deepcopy(condition)
+                for condition in domain
+            ]
+            searches.append((model_name, domain, list(fields)))
+        return searches[0] if isinstance(result, tuple) else searches
+
+    def _fill(self, plan: Any, values: Tuple[str, ...]) -> Any:
+        """Instantiate a plan with the entity values of a query."""
+        if isinstance(plan, _Slot):
+            return values[plan.index]
+        if isinstance(plan, (list, tuple)):
+            return type(plan)(self._fill(item, values) for item in plan)
+        return copy.deepcopy(plan)
+
 class QueryParser:
     """Class for parsing natural language queries into Odoo domain filters."""
 
-    def __init__(self, model_discovery):
+    def __init__(self, model_discovery, entity_index=None, schema_index=None, execute=None):
         """Initialize the query parser.
 
         Args:
             model_discovery: ModelDiscovery instance for accessing Odoo models and fields
+            entity_index: Optional EntityIndex resolving entity names of indexed
+                models to record ids
+            schema_index: Optional SchemaIndex mapping words the static
+                mappings miss to fields by meaning
+            execute: Optional function executing (model, method, args, kwargs), through
+                which every RPC is sent instead of the model discovery's connection
         """
         self.model_discovery = model_discovery
+        self.execute = execute
+        self.entity_index = entity_index
+        self.schema_index = schema_index
 
         # Caches for dynamic model and field information
         self._model_cache = {}
@@ -31,6 +185,14 @@ class QueryParser:
         self._model_mappings_cache = None
         self._field_mappings_cache = {}
 
+        # Parse results of previous queries, by query template
+        self.plan_cache = QueryPlanCache()
+        self._plan_guard = None
+
+        # Term automatons over the model mappings and the field mappings of each model
+        self._model_matcher = None
+        self._field_matchers = {}
+
         # Initialize static mappings as fallbacks
         self._init_static_mappings()
 
@@ -90,6 +252,26 @@ class QueryParser:
             "crm": "crm.lead",
         }
 
+        # Aggregation functions in natural language, matched on word boundaries
+        self.aggregate_terms = {
+            "total": "sum",
+            "sum of": "sum",
+            "sum": "sum",
+            "average": "avg",
+            "avg": "avg",
+            "mean": "avg",
+            "count of": "count",
+            "count": "count",
+            "number of": "count",
+            "how many": "count",
+        }
+
+        # Date granularities usable as group-by terms ("per month")
+        self.date_granularities = ["day", "week", "month", "quarter", "year"]
+
+        # Group-by terms referring to the partner of a document
+        self.partner_terms = ["customer", "vendor", "supplier", "partner", "client"]
+
         # Common field mappings (generic across models)
         self.common_field_mappings = {
             "name": ["name", "display_name", "title"],
@@ -173,31 +355,47 @@ class QueryParser:
             logger.error(f"Error loading dynamic mappings: {str(e)}")
             logger.info("Falling back to static mappings")
 
+    def _execute(self, model_name: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Execute a model method through the given executor, the client or the object proxy."""
+        if self.execute:
+            return self.execute(model_name, method, args, kwargs)
+        # Use client's execute method if available
+        if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
+            return self.model_discovery.client.execute(model_name, method, args, kwargs)
+        # Fallback to direct execution if models_proxy is available
+        if hasattr(self.model_discovery, 'models_proxy') and self.model_discovery.models_proxy:
+            return self.model_discovery.models_proxy.execute_kw(
+                self.model_discovery.db,
+                self.model_discovery.uid,
+                self.model_discovery.password,
+                model_name, method, args, kwargs
+            )
+        raise AttributeError(f"No suitable method found to execute {method} for {model_name}")
+
+    def _available_models(self) -> List[Dict[str, Any]]:
+        """Models without the ir.model 'info' field, for servers where reading it fails."""
+        if not self.execute:
+            return self.model_discovery.get_available_models()
+        return self.execute('ir.model', 'search_read', [[('transient', '=', False)]],
+                            {'fields': ['name', 'model'], 'order': 'model'})
+
+    def _fields_get(self, model_name: str) -> Dict[str, Dict[str, Any]]:
+        """fields_get metadata of a model, for users who cannot read ir.model.fields."""
+        if not self.execute:
+            return self.model_discovery.get_model_fields(model_name)
+        return self.execute(model_name, 'fields_get', [],
+                            {'attributes': ['string', 'help', 'type', 'required', 'readonly', 'selection', 'relation']})
+
     def _load_available_models(self):
         """Load available models from Odoo using ir.model."""
         try:
             # Get all available models from ir.model
-            # Use client's execute method if available
-            if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
-                models = self.model_discovery.client.execute(
-                    'ir.model',
-                    'search_read',
-                    [[('transient', '=', False)]],  # Exclude transient models
-                    {'fields': ['name', 'model', 'info'], 'order': 'model'}
-                )
-            # Fallback to direct execution if models_proxy is available
-            elif hasattr(self.model_discovery, 'models_proxy') and self.model_discovery.models_proxy:
-                models = self.model_discovery.models_proxy.execute_kw(
-                    self.model_discovery.db,
-                    self.model_discovery.uid,
-                    self.model_discovery.password,
-                    'ir.model', 'search_read',
-                    [[('transient', '=', False)]],  # Exclude transient models
-                    {'fields': ['name', 'model', 'info'], 'order': 'model'}
-                )
-            else:
-                # Fallback to get_available_models method
-                raise AttributeError("No suitable method found to execute search for ir.model")
+            models = self._execute(
+                'ir.model',
+                'search_read',
+                [[('transient', '=', False)]],  # Exclude transient models
+                {'fields': ['name', 'model', 'info'], 'order': 'model'}
+            )
 
             # Cache model information
             for model in models:
@@ -214,7 +412,7 @@ class QueryParser:
             logger.error(f"Error loading available models: {str(e)}")
             # Fallback to original method if direct approach fails
             try:
-                models = self.model_discovery.get_available_models()
+                models = self._available_models()
                 for model in models:
                     model_name = model.get('model')
                     if model_name:
@@ -254,6 +452,11 @@ class QueryParser:
         # Merge with static mappings, giving priority to dynamic ones
         self._model_mappings_cache = {**self.model_mappings, **mappings}
 
+        # Plans and matchers were built from the previous mappings
+        self.plan_cache.clear()
+        self._plan_guard = None
+        self._model_matcher = None
+
     def _get_model_fields_dynamic(self, model_name: str) -> Dict[str, Dict[str, Any]]:
         """Get fields for a model dynamically from Odoo using ir.model.fields.
 
@@ -269,33 +472,19 @@ class QueryParser:
 
         try:
             # Get fields directly from ir.model.fields for better field information
-            if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
-                fields_data = self.model_discovery.client.execute(
-                    'ir.model.fields',
-                    'search_read',
-                    [[('model', '=', model_name)]],
-                    {'fields': ['name', 'field_description', 'ttype', 'relation', 'relation_field',
-                               'required', 'readonly', 'store', 'copied', 'selection_ids']}
-                )
-            # Fallback to direct execution if models_proxy is available
-            elif hasattr(self.model_discovery, 'models_proxy') and self.model_discovery.models_proxy:
-                fields_data = self.model_discovery.models_proxy.execute_kw(
-                    self.model_discovery.db,
-                    self.model_discovery.uid,
-                    self.model_discovery.password,
-                    'ir.model.fields', 'search_read',
-                    [[('model', '=', model_name)]],
-                    {'fields': ['name', 'field_description', 'ttype', 'relation', 'relation_field',
-                               'required', 'readonly', 'store', 'copied', 'selection_ids']}
-                )
-            else:
-                # Fallback to get_model_fields method
-                raise AttributeError("No suitable method found to execute search for ir.model.fields")
+            fields_data = self._execute(
+                'ir.model.fields',
+                'search_read',
+                [[('model', '=', model_name)]],
+                {'fields': ['name', 'field_description', 'help', 'ttype', 'relation', 'relation_field',
+                           'required', 'readonly', 'store', 'copied', 'selection_ids']}
+            )
 
             fields = {}
             for field in fields_data:
                 fields[field['name']] = {
                     'string': field['field_description'],
+                    'help': field.get('help') or '',
                     'type': field['ttype'],
                     'relation': field.get('relation', False),
                     'relation_field': field.get('relation_field', False),
@@ -308,7 +497,7 @@ class QueryParser:
 
             # If direct approach fails or returns empty, fall back to original method
             if not fields:
-                fields = self.model_discovery.get_model_fields(model_name)
+                fields = self._fields_get(model_name)
 
             if fields:
                 # Cache the fields
@@ -324,7 +513,7 @@ class QueryParser:
             logger.error(f"Error getting fields for model {model_name}: {str(e)}")
             # Fall back to original method
             try:
-                fields = self.model_discovery.get_model_fields(model_name)
+                fields = self._fields_get(model_name)
                 if fields:
                     # Cache the fields
                     self._field_cache[model_name] = fields
@@ -430,6 +619,8 @@ class QueryParser:
 
         # Store in cache
         self._field_mappings_cache[model_name] = model_mappings
+        self._plan_guard = None
+        self._field_matchers.pop(model_name, None)
 
         # Common operators in natural language
         self.operator_mappings = {
@@ -505,9 +696,68 @@ class QueryParser:
             "overdue": "overdue",
         }
 
+    def _get_plan_guard(self):
+        """Pattern of the terms that affect parsing, which slot values must not contain."""
+        if self._plan_guard is None:
+            terms = set(self._model_mappings_cache or self.model_mappings)
+            for mappings in self._field_mappings_cache.values():
+                terms.update(mappings)
+            for mappings in self.model_field_mappings.values():
+                terms.update(mappings)
+            terms.update(getattr(self, 'time_terms', {}))
+            terms.update(getattr(self, 'state_value_mappings', {}))
+            terms.update(self.aggregate_terms)
+            terms.update(SPECIAL_ENTITIES)
+            terms = sorted((term for term in terms if term), key=len, reverse=True)
+            self._plan_guard = re.compile(
+                "|".join([re.escape(term) for term in terms]
+                         + [rf"\b{word}\b" for word in STRUCTURAL_WORDS]))
+        return self._plan_guard
+
+    def _resolve_entities(self, result: Any) -> Any:
+        """Replace the entity name conditions of indexed models with exact id conditions.
+
+        A [field, 'ilike', name] condition on the name of an indexed model, or on
+        a many2one field pointing to one, becomes [field, 'in', ids] (or
+        ['id', 'in', ids]) when the entity index resolves the name to at most
+        ENTITY_ID_LIMIT records. Names the index cannot resolve, or that match
+        more records, are left to Odoo.
+
+        Args:
+            result: Result of parse_query (tuple) or parse_complex_query (list)
+
+        Returns:
+            The result with resolved domains
+        """
+        if not self.entity_index:
+            return result
+
+        searches = []
+        for model_name, domain, fields in ([result] if isinstance(result, tuple) else result):
+            model_fields = self._get_model_fields_dynamic(model_name)
+            resolved_domain = []
+            for condition in domain:
+                if (isinstance(condition, (list, tuple)) and len(condition) == 3
+                        and condition[1] == 'ilike' and isinstance(condition[2], str)):
+                    field = condition[0]
+                    target, id_field = None, field
+                    if field in ('name', 'display_name'):
+                        target, id_field = model_name, 'id'
+                    elif model_fields.get(field, {}).get('type') == 'many2one':
+                        target = model_fields[field].get('relation')
+                    ids = self.entity_index.resolve(target, condition[2], ENTITY_ID_LIMIT + 1) if target else []
+                    if ids and len(ids) <= ENTITY_ID_LIMIT:
+                        condition = [id_field, 'in', ids]
+                resolved_domain.append(condition)
+            searches.append((model_name, resolved_domain, fields))
+        return searches[0] if isinstance(result, tuple) else searches
+
     def parse_query(self, query: str) -> Tuple[str, List[List[Any]], List[str]]:
         """Parse a natural language query into an Odoo model and domain filter.
 
+        Results are cached by query template, so a query differing from a
+        previous one only by its entity values is not parsed again.
+
         Args:
             query: Natural language query string
 
@@ -517,6 +767,16 @@ class QueryParser:
             - Domain filter (List[List[Any]])
             - Fields to display (List[str])
         """
+        normalized_query = query.lower().strip()
+        result = self.plan_cache.lookup('query', normalized_query, self._get_plan_guard())
+        if result is None:
+            result = self._parse_query(query)
+            if result[2]:
+                self.plan_cache.store('query', normalized_query, result, self._get_plan_guard())
+        return self._resolve_entities(result)
+
+    def _parse_query(self, query: str) -> Tuple[str, List[List[Any]], List[str]]:
+        """Parse a query without using the plan cache (see parse_query)."""
         # Normalize query
         normalized_query = query.lower().strip()
 
@@ -541,6 +801,19 @@ class QueryParser:
 
         return model_name, domain, display_fields
 
+    def _get_model_matcher(self) -> TermMatcher:
+        """Get the automaton over the model mapping terms (dynamic ones if loaded)."""
+        if self._model_matcher is None:
+            self._model_matcher = TermMatcher(self._model_mappings_cache or self.model_mappings)
+        return self._model_matcher
+
+    def _get_field_matcher(self, model_name: str) -> TermMatcher:
+        """Get the automaton over the field mapping categories of a model."""
+        if model_name not in self._field_matchers:
+            self._field_matchers[model_name] = TermMatcher(
+                {term: term for term in self._field_mappings_cache.get(model_name, {})})
+        return self._field_matchers[model_name]
+
     def _identify_model(self, query: str) -> Optional[str]:
         """Identify the Odoo model from the query.
 
@@ -550,17 +823,10 @@ class QueryParser:
         Returns:
             Model name or None if not identified
         """
-        # Use dynamic model mappings if available
-        if self._model_mappings_cache:
-            # Check for direct model mentions
-            for term, model in self._model_mappings_cache.items():
-                if term in query:
-                    return model
-        else:
-            # Fallback to static mappings
-            for term, model in self.model_mappings.items():
-                if term in query:
-                    return model
+        # Check for direct model mentions, the longest matching term wins
+        _, model = self._get_model_matcher().best_match(query)
+        if model:
+            return model
 
         # Check for specific patterns
         if re.search(r'(customer|client|partner)s?', query):
@@ -582,13 +848,6 @@ class QueryParser:
         if "unpaid bills" in query or "vendor" in query:
             return "account.move"
 
-        # Try to find a model by searching through all available models
-        if self._model_cache:
-            for model_name, model_info in self._model_cache.items():
-                display_name = model_info.get('name', '').lower()
-                if display_name and display_name in query:
-                    return model_name
-
         return None
 
     def _generate_domain(self, query: str, model_name: str, model_fields: Dict[str, Any]) -> List[List[Any]]:
@@ -636,12 +895,12 @@ class QueryParser:
         entities = self._extract_entities(query, model_name)
         for entity_type, entity_value in entities.items():
             field_names = self._map_entity_to_fields(entity_type, model_name)
-            if field_names:
-                # Find the first field that exists in the model
-                for field_name in field_names:
-                    if field_name in model_fields:
-                        domain.append([field_name, "ilike", entity_value])
-                        break
+            # Find the first field that exists in the model, else the closest one in meaning
+            field_name = next((field for field in field_names if field in model_fields), None)
+            if field_name is None:
+                field_name = next(iter(self._semantic_fields(entity_type, model_name, model_fields)), None)
+            if field_name:
+                domain.append([field_name, "ilike", entity_value])
 
         # Handle date-related queries
         date_domain = self._handle_date_filters(query, model_name, model_fields)
@@ -680,8 +939,8 @@ class QueryParser:
         model_info = self._model_cache.get(model_name, {})
         model_display_name = model_info.get('name', '').lower() if model_info else ''
 
-        # Extract entities based on field mappings
-        for entity_type in field_mappings.keys():
+        # Extract entities based on the field mapping categories mentioned in the query
+        for entity_type, _ in self._get_field_matcher(model_name).ranked_matches(query):
             # Skip technical categories
             if entity_type in ['name', 'date', 'amount', 'status', 'reference', 'description']:
                 continue
@@ -735,6 +994,29 @@ class QueryParser:
 
         return entities
 
+    def _semantic_fields(self, phrase: str, model_name: str, model_fields: Dict[str, Any],
+                         types: Optional[List[str]] = None) -> List[str]:
+        """Find the fields of a model closest in meaning to a phrase using the schema index.
+
+        Args:
+            phrase: Query words the static mappings did not resolve
+            model_name: Odoo model name
+            model_fields: Dictionary of model fields
+            types: Accepted field types (any type if None)
+
+        Returns:
+            List of field names, best first; empty without a schema index
+        """
+        if not self.schema_index or not model_fields:
+            return []
+        try:
+            matches = self.schema_index.search(model_name, phrase, model_fields)
+        except Exception as e:
+            logger.error(f"Error looking up '{phrase}' in the schema index: {str(e)}")
+            return []
+        return [field for field, _ in matches
+                if field in model_fields and (types is None or model_fields[field].get('type') in types)]
+
     def _map_entity_to_fields(self, entity_type: str, model_name: str) -> List[str]:
         """Map an entity type to corresponding model fields.
 
@@ -848,10 +1130,13 @@ class QueryParser:
             elif "kanban_state" in model_fields:
                 state_field = "kanban_state"
 
-        # Check for state terms
+        # Check for state terms ("paid" must not match "unpaid")
         if state_field:
             for term, value in self.state_value_mappings.items():
-                if term in query:
+                if term in ("paid", "unpaid", "partial") and state_field != "payment_state":
+                    # Payment terms only apply to the payment state
+                    continue
+                if re.search(rf'\b{re.escape(term)}\b', query):
                     domain.append([state_field, "=", value])
                     break
 
@@ -953,9 +1238,155 @@ class QueryParser:
 
         return display_fields
 
+    def _resolve_aggregate_field(self, term: str, model_name: str, model_fields: Dict[str, Any],
+                                 types: Optional[List[str]] = None) -> Optional[str]:
+        """Resolve a natural language term such as "expected revenue" to a model field.
+
+        Args:
+            term: Normalized term
+            model_name: Odoo model name
+            model_fields: Dictionary of model fields
+            types: Accepted field types (any type if None)
+
+        Returns:
+            Field name or None if no field of an accepted type matches
+        """
+        candidates = []
+        for mappings in (self._field_mappings_cache.get(model_name, {}),
+                         self.model_field_mappings.get(model_name, {}),
+                         self.common_field_mappings):
+            candidates.extend(mappings.get(term, []))
+        name = term.replace(' ', '_')
+        candidates.extend([name, f"{name}_id", f"{name}_ids"])
+        candidates.extend(field for field, info in model_fields.items()
+                          if str(info.get('string', '')).lower() == term)
+
+        for field in candidates:
+            if field in model_fields and (types is None or model_fields[field].get('type') in types):
+                return field
+        return next(iter(self._semantic_fields(term, model_name, model_fields, types)), None)
+
+    def _resolve_group_by(self, term: str, model_name: str, model_fields: Dict[str, Any]) -> Optional[str]:
+        """Resolve a group-by term ("vendor", "month", "stage") to a read_group group-by spec."""
+        groupable = ['many2one', 'many2many', 'selection', 'char', 'boolean', 'integer', 'date', 'datetime']
+
+        if term in self.date_granularities:
+            date_fields = self._field_mappings_cache.get(model_name, {}).get('date', [])
+            date_fields = date_fields + self.model_field_mappings.get(model_name, {}).get('date', [])
+            date_fields = date_fields + self.common_field_mappings['date']
+            for field in date_fields:
+                if model_fields.get(field, {}).get('type') in ('date', 'datetime'):
+                    return f"{field}:{term}"
+            return None
+
+        if term in self.partner_terms and 'partner_id' in model_fields:
+            return 'partner_id'
+        if term in ('status', 'state', 'stage'):
+            term = 'status'
+
+        return self._resolve_aggregate_field(term, model_name, model_fields, groupable)
+
+    def _resolve_measure(self, phrase: str, model_name: str, model_fields: Dict[str, Any],
+                         query: str) -> Optional[str]:
+        """Resolve the measured field of a sum/avg phrase, defaulting to the model's amount field."""
+        numeric = ['integer', 'float', 'monetary']
+        words = phrase.split()
+        # Try the longest leading phrase first ("expected revenue" before "expected")
+        for size in range(min(len(words), 3), 0, -1):
+            field = self._resolve_aggregate_field(' '.join(words[:size]), model_name, model_fields, numeric)
+            if field:
+                return field
+
+        # Unpaid invoices are measured by what remains due
+        if model_name == "account.move" and re.search(r'\b(unpaid|due|outstanding)\b', query):
+            if 'amount_residual' in model_fields:
+                return 'amount_residual'
+        for term in ('amount', 'price', 'expected revenue'):
+            field = self._resolve_aggregate_field(term, model_name, model_fields, numeric)
+            if field:
+                return field
+        return None
+
+    def parse_aggregate_query(self, query: str) -> Optional[Dict[str, Any]]:
+        """Parse an aggregation query such as "total unpaid bills per vendor".
+
+        Args:
+            query: Natural language query string
+
+        Only queries starting with an aggregate phrase ("total", "what is the
+        average", "number of") are aggregations.
+
+        Returns:
+            None if the query asks for no aggregation, else a dictionary with:
+            - model: Model name (str)
+            - domain: Domain filter (List[List[Any]])
+            - groupby: read_group group-by specs, e.g. ["partner_id", "invoice_date:month"]
+            - measures: (field, function) pairs with function "sum" or "avg";
+              the record count of each group is always returned
+        """
+        normalized_query = query.lower().strip()
+
+        # Only a leading aggregate phrase asks for an aggregation: "invoices with
+        # total over 1000" is a search, even with a group-by clause
+        function = None
+        measure_phrase = ""
+        for term, term_function in self.aggregate_terms.items():
+            match = re.match(rf'(?:{AGGREGATE_LEAD_IN}\s+)?{term}\b\s*(.*)', normalized_query)
+            if match:
+                function, measure_phrase = term_function, match.group(1)
+                break
+        if not function:
+            return None
+
+        # Split off the group-by clauses ("per vendor", "by month and stage")
+        group_terms = []
+        group_pattern = (r'\b(?:per|by|for each|grouped by|group by)\s+'
+                         r'(.+?)(?=\s+(?:this|last|today|yesterday|for|with|where|in|from|per|by)\b|$)')
+        for match in re.finditer(group_pattern, normalized_query):
+            group_terms.extend(term.strip() for term in re.split(r'\s*(?:,|\band\b)\s*', match.group(1))
+                               if term.strip())
+        subject_query = re.sub(group_pattern, '', normalized_query).strip()
+        measure_phrase = re.sub(group_pattern, '', measure_phrase).strip()
+
+        model_name = self._identify_model(subject_query) or self._identify_model(normalized_query)
+        if not model_name:
+            logger.warning(f"No model identified in aggregation query: {query}")
+            return None
+
+        model_fields = self._get_model_fields_dynamic(model_name)
+        if not model_fields:
+            logger.error(f"Could not get fields for model: {model_name}")
+            return None
+
+        groupby = []
+        for term in group_terms:
+            group = (self._resolve_group_by(term, model_name, model_fields)
+                     or self._resolve_group_by(term.rstrip('s'), model_name, model_fields))
+            if group:
+                groupby.append(group)
+            else:
+                logger.warning(f"Could not map group-by term '{term}' to a field of {model_name}")
+
+        measures = []
+        if function != "count":
+            measure = self._resolve_measure(measure_phrase, model_name, model_fields, normalized_query)
+            if measure:
+                measures.append((measure, function))
+            else:
+                logger.warning(f"No numeric field to {function} in {model_name}; returning counts only")
+
+        return {
+            "model": model_name,
+            "domain": self._generate_domain(subject_query, model_name, model_fields),
+            "groupby": groupby,
+            "measures": measures,
+        }
+
     def parse_complex_query(self, query: str) -> List[Tuple[str, List[List[Any]], List[str]]]:
         """Parse a complex query that might involve multiple models.
 
+        Results are cached by query template like those of parse_query.
+
         Args:
             query: Natural language query string
 
@@ -965,6 +1396,16 @@ class QueryParser:
             - Domain filter (List[List[Any]])
             - Fields to display (List[str])
         """
+        normalized_query = query.lower().strip()
+        result = self.plan_cache.lookup('complex', normalized_query, self._get_plan_guard())
+        if result is None:
+            result = self._parse_complex_query(query)
+            if all(fields for _, _, fields in result):
+                self.plan_cache.store('complex', normalized_query, result, self._get_plan_guard())
+        return self._resolve_entities(result)
+
+    def _parse_complex_query(self, query: str) -> List[Tuple[str, List[List[Any]], List[str]]]:
+        """Parse a complex query without using the plan cache (see parse_complex_query)."""
         # Normalize query
         normalized_query = query.lower().strip()
 
@@ -998,7 +1439,7 @@ class QueryParser:
 
             # Then, find sales orders for that customer
             order_model = "sale.order"
-            # We'll use a domain that will be updated by the relationship handler
+            # The search executor restricts the orders to the customers found above
             order_domain = []
             # Make sure to include partner_id for the relationship handler to work properly
             order_fields = ["id", "name", "partner_id", "date_order", "amount_total", "state"]
@@ -1045,7 +1486,7 @@ class QueryParser:
 
             # Then, find invoices for that customer
             invoice_model = "account.move"
-            # We'll use a domain that will be updated by the relationship handler
+            # The search executor restricts the invoices to the customers found above
             invoice_domain = [["move_type", "in", ["out_invoice", "out_refund"]]]
             # Make sure to include partner_id for the relationship handler to work properly
             invoice_fields = ["id", "name", "partner_id", "invoice_date", "amount_total", "payment_state"]
@@ -1073,7 +1514,7 @@ class QueryParser:
 
             # Then, find tasks for that project
             task_model = "project.task"
-            # We'll need to update this domain with the actual project ID
+            # The search executor restricts the tasks to the projects found above
             task_domain = []
             # Make sure to include project_id for the relationship handler to work properly
             task_fields = ["id", "name", "project_id", "user_ids", "date_deadline", "stage_id"]
@@ -1103,15 +1544,15 @@ class QueryParser:
 
         # Try to identify models dynamically based on the query
         if self._model_mappings_cache:
-            for term, model in self._model_mappings_cache.items():
-                if term in normalized_query and len(term) > 3:  # Avoid short terms that might cause false matches
-                    # Found a potential model match
-                    model_name = model
-                    model_fields = self._get_model_fields_dynamic(model_name)
-                    if model_fields:
-                        domain = self._generate_domain(normalized_query, model_name, model_fields)
-                        display_fields = self._determine_display_fields(model_name, model_fields)
-                        return [(model_name, domain, display_fields)]
+            # Avoid short terms that might cause false matches
+            for term, model in self._get_model_matcher().ranked_matches(normalized_query, min_length=4):
+                # Found a potential model match
+                model_name = model
+                model_fields = self._get_model_fields_dynamic(model_name)
+                if model_fields:
+                    domain = self._generate_domain(normalized_query, model_name, model_fields)
+                    display_fields = self._determine_display_fields(model_name, model_fields)
+                    return [(model_name, domain, display_fields)]
 
         # If no specific pattern or dynamic model matches, fall back to single model parsing
         model_name, domain, fields = self.parse_query(query)
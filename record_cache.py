@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Record Cache Module
+
+This module provides an in-process read-through cache of Odoo records, so the
+same records fetched repeatedly by the MCP tools and advanced search within a
+few seconds are served without a round trip.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable
+
+from domain_evaluator import UnsupportedDomain, parse_domain, domain_fields, evaluate, covers
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached entry stays valid; 0 disables the cache
+RECORD_CACHE_TTL = 30
+
+# Maximum approximate size of the cached entries
+RECORD_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Methods that do not modify records and never invalidate the cache
+READ_METHODS = ["read", "search", "search_read", "search_count", "read_group", "fields_get",
+                "name_search", "name_get", "default_get", "check_access_rights", "get_views"]
+
+
+def _entry_size(value: Any) -> int:
+    """Approximate size in bytes of a cached value."""
+    return len(repr(value))
+
+
+class RecordCache:
+    """LRU cache of records keyed by (model, id, field set), bounded by TTL and size.
+
+    search_read results are cached as the list of ids they returned, with each
+    record cached separately, so a repeated search is answered from memory and
+    records evicted since are re-read by id. A narrower search (an extra
+    filter, a longer ilike term, a smaller limit) is answered by evaluating
+    its domain on the records of a cached superset. Writes invalidate the written
+    records and every cached search of their model. Changes made outside this
+    process, or computed on other models by a write, are picked up when the
+    TTL expires.
+    """
+
+    def __init__(self, ttl: float = RECORD_CACHE_TTL, max_bytes: int = RECORD_CACHE_MAX_BYTES):
+        """Initialize an empty cache.
+
+        Args:
+            ttl: Seconds an entry stays valid (0 disables the cache)
+            max_bytes: Maximum approximate size of the cached entries
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.local_hits = 0
+        self.evictions = 0
+        # Bumped by every invalidation, so results read during one are not stored
+        self._generation = 0
+        self._entries = OrderedDict()
+        self._record_keys: Dict[Tuple[str, int], Set[tuple]] = {}
+        self._search_keys: Dict[str, Set[tuple]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are cached at all."""
+        return self.ttl > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def _fields_key(fields: Optional[List[str]]) -> Tuple[str, ...]:
+        """Field set part of a key; empty means all fields."""
+        return tuple(sorted(set(fields))) if fields else ()
+
+    def _get(self, key: tuple) -> Any:
+        """Return a live entry and mark it as recently used, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def _put(self, key: tuple, value: Any):
+        """Store an entry, evicting the least recently used ones beyond the size bound."""
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.bytes += size
+        if key[0] == 'record':
+            self._record_keys.setdefault((key[1], key[2]), set()).add(key)
+        elif key[0] == 'search':
+            self._search_keys.setdefault(key[1], set()).add(key)
+        while self.bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key: tuple):
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry[1]
+        if key[0] == 'record':
+            index, index_key = self._record_keys, (key[1], key[2])
+        elif key[0] == 'search':
+            index, index_key = self._search_keys, key[1]
+        else:
+            return
+        keys = index.get(index_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[index_key]
+
+    def _put_records(self, model_name: str, records: List[Dict[str, Any]], fields: Tuple[str, ...],
+                     generation: int):
+        """Cache records read with a field set, unless the cache was invalidated since."""
+        if generation != self._generation:
+            return
+        for record in records:
+            if 'id' in record:
+                self._put(('record', model_name, record['id'], fields), copy.deepcopy(record))
+
+    def _cached_records(self, model_name: str, ids: List[int],
+                        fields: Tuple[str, ...]) -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
+        """Split ids into the cached records and the ids missing from the cache."""
+        found, missing = {}, []
+        for record_id in ids:
+            record = self._get(('record', model_name, record_id, fields))
+            if record is None:
+                missing.append(record_id)
+            else:
+                found[record_id] = record
+        return found, missing
+
+    def read(self, execute: Callable[[str, List[Any], Dict[str, Any]], Any], model_name: str,
+             ids: List[int], kwargs: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Read records by id, reading only the ones missing from the cache.
+
+        Args:
+            execute: Function executing (method, args, kwargs) on the model
+            model_name: Model of the records
+            ids: Record ids
+            kwargs: read keyword arguments ('fields', 'context')
+
+        Returns:
+            List of records in the order of ids (deleted records are omitted)
+        """
+        kwargs = kwargs or {}
+        if not self.enabled or set(kwargs) - {'fields', 'context'}:
+            return execute('read', [ids], kwargs)
+        fields = self._fields_key(kwargs.get('fields'))
+        with self._lock:
+            generation = self._generation
+            found, missing = self._cached_records(model_name, ids, fields)
+        if missing:
+            records = execute('read', [missing], kwargs)
+            with self._lock:
+                self._put_records(model_name, records, fields, generation)
+            found.update((record['id'], record) for record in records)
+        with self._lock:
+            if missing:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return [copy.deepcopy(found[record_id]) for record_id in ids if record_id in found]
+
+    def search_read(self, execute: Callable[[str, List[Any], Dict[str, Any]], Any], model_name: str,
+                    domain: List[Any], kwargs: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Read the records matching a domain, from the cache when the search is cached.
+
+        Args:
+            execute: Function executing (method, args, kwargs) on the model
+            model_name: Model to search
+            domain: Domain filter
+            kwargs: search_read keyword arguments
+
+        Returns:
+            List of records
+        """
+        kwargs = kwargs or {}
+        if not self.enabled:
+            return execute('search_read', [domain], kwargs)
+        fields = self._fields_key(kwargs.get('fields'))
+        key = ('search', model_name, repr(domain), fields, kwargs.get('limit'), kwargs.get('offset', 0),
+               kwargs.get('order'), repr(kwargs.get('context')))
+
+        with self._lock:
+            generation = self._generation
+            entry = self._get(key)
+            if entry is not None:
+                ids = entry['ids']
+                found, missing = self._cached_records(model_name, ids, fields)
+            else:
+                records = self._answer_locally(model_name, domain, kwargs, fields)
+                if records is not None:
+                    self.hits += 1
+                    self.local_hits += 1
+                    return records
+        if entry is not None:
+            if missing:
+                read_kwargs = {name: kwargs[name] for name in ('fields', 'context') if name in kwargs}
+                records = execute('read', [missing], read_kwargs)
+                with self._lock:
+                    self._put_records(model_name, records, fields, generation)
+                found.update((record['id'], record) for record in records)
+            if all(record_id in found for record_id in ids):
+                with self._lock:
+                    self.hits += 1
+                return [copy.deepcopy(found[record_id]) for record_id in ids]
+
+        records = execute('search_read', [domain], kwargs)
+        with self._lock:
+            self.misses += 1
+            if generation == self._generation:
+                self._put_records(model_name, records, fields, generation)
+                try:
+                    tree = parse_domain(domain)
+                except UnsupportedDomain:
+                    tree = None
+                limit = kwargs.get('limit')
+                self._put(key, {
+                    'ids': [record['id'] for record in records if 'id' in record],
+                    'tree': tree,
+                    # Whether the ids are all the records matching the domain
+                    'complete': not kwargs.get('offset') and (not limit or len(records) < limit),
+                })
+        return records
+
+    def _parent_lookup(self, model_name: str) -> Callable[[str, int], Any]:
+        """Function returning the cached parent of a record referenced by a field, for child_of."""
+        comodels = {}
+
+        def parent_of(field: str, record_id: int) -> Any:
+            if field not in comodels:
+                # The comodel comes from the cached fields_get metadata of the model
+                comodel = model_name if field in ('id', 'parent_id') else None
+                for key, entry in list(self._entries.items()):
+                    if comodel:
+                        break
+                    if key[0] == 'fields' and key[1] == model_name:
+                        comodel = (entry[2].get(field) or {}).get('relation')
+                comodels[field] = comodel
+            for key in list(self._record_keys.get((comodels[field], record_id), ())):
+                record = self._get(key)
+                if record is not None and 'parent_id' in record:
+                    parent = record['parent_id']
+                    return parent[0] if parent else False
+            raise LookupError(f"Parent of {record_id} is not cached")
+
+        return parent_of
+
+    def _answer_locally(self, model_name: str, domain: List[Any], kwargs: Dict[str, Any],
+                        fields: Tuple[str, ...]) -> Optional[List[Dict[str, Any]]]:
+        """Answer a search from a cached search whose results include all of its matches.
+
+        The cached search must have the same order and context and have read
+        every field the new search returns or filters on. Its records are
+        filtered with the new domain in their cached order; an incomplete
+        (limited) cached search only answers if enough of its records match.
+
+        Returns:
+            List of records, or None if no cached search can answer
+        """
+        try:
+            tree = parse_domain(domain)
+            needed = set(fields) | domain_fields(tree)
+        except UnsupportedDomain:
+            return None
+        offset = kwargs.get('offset') or 0
+        limit = kwargs.get('limit') or None
+        order, context = kwargs.get('order'), repr(kwargs.get('context'))
+        parent_of = self._parent_lookup(model_name)
+
+        for key in list(self._search_keys.get(model_name, ())):
+            _, _, _, cached_fields, _, cached_offset, cached_order, cached_context = key
+            if cached_offset or cached_order != order or cached_context != context:
+                continue
+            if cached_fields and (not fields or not needed <= set(cached_fields) | {'id'}):
+                continue
+            entry = self._get(key)
+            if entry is None or entry['tree'] is None or not covers(entry['tree'], tree):
+                continue
+            found, missing = self._cached_records(model_name, entry['ids'], cached_fields)
+            if missing:
+                continue
+
+            matches = []
+            try:
+                for record_id in entry['ids']:
+                    if evaluate(tree, found[record_id], parent_of):
+                        matches.append(found[record_id])
+                        if limit and len(matches) >= offset + limit:
+                            break
+            except UnsupportedDomain as e:
+                logger.debug(f"Cannot answer a {model_name} search locally: {str(e)}")
+                return None
+            if not entry['complete'] and not (limit and len(matches) >= offset + limit):
+                continue
+
+            matches = matches[offset:offset + limit if limit else None]
+            if fields:
+                matches = [{name: record[name] for name in ('id',) + fields if name in record}
+                           for record in matches]
+            logger.debug(f"Answered a {model_name} search locally with {len(matches)} records")
+            return copy.deepcopy(matches)
+        return None
+
+    def get_fields(self, execute: Callable[[str, List[Any], Dict[str, Any]], Any], model_name: str,
+                   attributes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Return the fields_get metadata of a model, cached like records."""
+        if not self.enabled:
+            return execute('fields_get', [], {'attributes': attributes} if attributes else {})
+        key = ('fields', model_name, tuple(attributes or ()))
+        with self._lock:
+            generation = self._generation
+            fields = self._get(key)
+            if fields is not None:
+                self.hits += 1
+                return copy.deepcopy(fields)
+        fields = execute('fields_get', [], {'attributes': attributes} if attributes else {})
+        with self._lock:
+            self.misses += 1
+            if fields and generation == self._generation:
+                self._put(key, copy.deepcopy(fields))
+        return fields
+
+    def invalidate(self, model_name: str, ids: Optional[List[int]] = None):
+        """Drop the cached searches of a model and its cached records.
+
+        Args:
+            model_name: Model whose records changed
+            ids: Ids of the changed records (all records of the model if None;
+                an empty list only drops the searches, e.g. after a create)
+        """
+        with self._lock:
+            self._generation += 1
+            for key in list(self._search_keys.pop(model_name, ())):
+                self._drop(key)
+            if ids is None:
+                record_keys = [key for key in self._record_keys if key[0] == model_name]
+            else:
+                record_keys = [(model_name, record_id) for record_id in ids]
+            for record_key in record_keys:
+                for key in list(self._record_keys.pop(record_key, ())):
+                    self._drop(key)
+        logger.debug(f"Invalidated cached records of {model_name}" + (f" {ids}" if ids is not None else ""))
+
+    def invalidate_for_method(self, model_name: str, method: str, args: Optional[List[Any]] = None):
+        """Invalidate the entries a method call may have changed.
+
+        write and unlink invalidate the records they target, create the
+        searches of the model. Other non-read methods (workflow actions) can
+        change any model, so they clear the cache.
+        """
+        if method in READ_METHODS:
+            return
+        if method in ('write', 'unlink') and args and isinstance(args[0], (list, tuple)):
+            self.invalidate(model_name, [record_id for record_id in args[0] if isinstance(record_id, int)])
+        elif method in ('write', 'unlink') and args and isinstance(args[0], int):
+            self.invalidate(model_name, [args[0]])
+        elif method == 'create':
+            self.invalidate(model_name, [])
+        else:
+            self.clear()
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._record_keys.clear()
+            self._search_keys.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'local_hits': self.local_hits,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+            }
@@ -9,6 +9,7 @@ when performing complex queries that span multiple models.
 """
 
 import logging
+import re
 import traceback
 from typing import Dict, List, Any, Optional, Tuple, Set, Union
 
@@ -17,13 +18,16 @@ logger = logging.getLogger(__name__)
 class RelationshipHandler:
     """Class for handling relationships between Odoo models."""
 
-    def __init__(self, model_discovery):
+    def __init__(self, model_discovery, execute=None):
         """Initialize the relationship handler.
 
         Args:
             model_discovery: ModelDiscovery instance for accessing Odoo models and fields
+            execute: Optional function executing (model, method, args, kwargs), through
+                which every RPC is sent instead of the model discovery's connection
         """
         self.model_discovery = model_discovery
+        self.execute = execute
 
         # Common relationships between models
         self.model_relationships = {
@@ -72,6 +76,19 @@ class RelationshipHandler:
             },
         }
 
+    def _execute(self, model_name: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Execute a model method through the given executor, the client or the object proxy."""
+        if self.execute:
+            return self.execute(model_name, method, args, kwargs)
+        if hasattr(self.model_discovery, 'client') and self.model_discovery.client:
+            return self.model_discovery.client.execute(model_name, method, args, kwargs)
+        return self.model_discovery.models_proxy.execute_kw(
+            self.model_discovery.db,
+            self.model_discovery.uid,
+            self.model_discovery.password,
+            model_name, method, args, kwargs
+        )
+
     def get_relationship(self, from_model: str, to_model: str) -> Optional[Dict[str, Any]]:
         """Get the relationship information between two models.
 
@@ -112,10 +129,7 @@ class RelationshipHandler:
         """
         try:
             # Search for fields in the target model that reference the source model
-            to_fields = self.model_discovery.models_proxy.execute_kw(
-                self.model_discovery.db,
-                self.model_discovery.uid,
-                self.model_discovery.password,
+            to_fields = self._execute(
                 'ir.model.fields', 'search_read',
                 [[('model', '=', to_model), ('relation', '=', from_model)]],
                 {'fields': ['name', 'ttype', 'relation_field']}
@@ -143,10 +157,7 @@ class RelationshipHandler:
                     }
 
             # Search for fields in the source model that reference the target model
-            from_fields = self.model_discovery.models_proxy.execute_kw(
-                self.model_discovery.db,
-                self.model_discovery.uid,
-                self.model_discovery.password,
+            from_fields = self._execute(
                 'ir.model.fields', 'search_read',
                 [[('model', '=', from_model), ('relation', '=', to_model)]],
                 {'fields': ['name', 'ttype', 'relation_field']}
@@ -192,8 +203,12 @@ class RelationshipHandler:
             Dictionary with relationship information or None if no relationship exists
         """
         # Get fields for both models
-        from_fields = self.model_discovery.get_model_fields(from_model)
-        to_fields = self.model_discovery.get_model_fields(to_model)
+        try:
+            from_fields = self._execute(from_model, 'fields_get', [], {'attributes': ['type', 'relation']})
+            to_fields = self._execute(to_model, 'fields_get', [], {'attributes': ['type', 'relation']})
+        except Exception as e:
+            logger.error(f"Error getting fields for models {from_model}, {to_model}: {str(e)}")
+            return None
 
         if not from_fields or not to_fields:
             logger.warning(f"Could not get fields for models: {from_model}, {to_model}")
@@ -237,10 +252,33 @@ class RelationshipHandler:
         # No relationship found
         return None
 
+    @staticmethod
+    def _join_key(value: Any) -> Any:
+        """Return the hashable key of a relation value ([id, name] pairs are keyed by id).
+
+        Returns:
+            The key, or None if the value cannot be used as a key
+        """
+        if isinstance(value, (list, tuple)) and len(value) >= 1:
+            value = value[0]
+        try:
+            hash(value)
+        except TypeError:
+            return None
+        return value
+
+    @staticmethod
+    def _text_tokens(value: str) -> Set[str]:
+        """Split a text reference such as invoice_origin ("S00012, S00015") into tokens."""
+        return {token for token in re.split(r'[\s,;]+', value) if token}
+
     def join_results(self, from_records: List[Dict[str, Any]], to_records: List[Dict[str, Any]],
                     relationship: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Join records from two models based on their relationship.
 
+        The target (or source, for many2one) records are indexed once by their
+        relation key, so the join is linear in the number of records.
+
         Args:
             from_records: Records from the source model
             to_records: Records from the target model
@@ -256,48 +294,41 @@ class RelationshipHandler:
         to_field = relationship["to_field"]
         relation_type = relationship["relation_type"]
         special = relationship.get("special")
+        debug = logger.isEnabledFor(logging.DEBUG)
 
         # Handle different relationship types
         if relation_type == "one2many":
-            # For each source record, find matching target records
+            # Index target records by relation id, and by text token for text matching
+            id_index: Dict[Any, List[int]] = {}
+            token_index: Dict[str, List[int]] = {}
+            for position, to_record in enumerate(to_records):
+                to_value = to_record.get(to_field)
+                if special == "text_match" and isinstance(to_value, str):
+                    # For text fields like invoice_origin that might contain the SO name
+                    for token in self._text_tokens(to_value):
+                        token_index.setdefault(token, []).append(position)
+                    continue
+                key = self._join_key(to_value)
+                if key is not None:
+                    id_index.setdefault(key, []).append(position)
+
             for from_record in from_records:
                 from_value = from_record.get(from_field)
-                logger.info(f"Processing source record with {from_field}={from_value}")
 
                 # Skip if the source value is missing
                 if from_value is None:
-                    logger.info(f"Skipping source record because {from_field} is None")
+                    if debug:
+                        logger.debug(f"Skipping source record because {from_field} is None")
                     continue
 
-                # Find matching target records
-                matches = []
-                for to_record in to_records:
-                    to_value = to_record.get(to_field)
-
-                    # Log the values we're comparing
-                    logger.info(f"Comparing source {from_field}={from_value} with target {to_field}={to_value}")
-
-                    # Handle special case for text matching
-                    if special == "text_match" and isinstance(to_value, str) and isinstance(from_value, (int, str)):
-                        # For text fields like invoice_origin that might contain the SO name
-                        if str(from_value) in to_value:
-                            logger.info(f"Found text match: {from_value} in {to_value}")
-                            matches.append(to_record)
-                    # Handle many2one fields that store [id, name]
-                    elif isinstance(to_value, list) and len(to_value) >= 1:
-                        if to_value[0] == from_value:
-                            logger.info(f"Found many2one match: {to_value[0]} == {from_value}")
-                            matches.append(to_record)
-                    # Handle many2one fields that store just the ID (common in Odoo 18)
-                    elif to_field.endswith('_id') and isinstance(to_value, int) and to_value == from_value:
-                        logger.info(f"Found many2one ID match: {to_value} == {from_value}")
-                        matches.append(to_record)
-                    # Direct value comparison
-                    elif to_value == from_value:
-                        logger.info(f"Found direct match: {to_value} == {from_value}")
-                        matches.append(to_record)
-
-                logger.info(f"Found {len(matches)} matches for source record with {from_field}={from_value}")
+                positions = list(id_index.get(self._join_key(from_value), []))
+                if token_index and isinstance(from_value, (int, str)):
+                    positions.extend(token_index.get(str(from_value), []))
+                    positions = sorted(set(positions))
+                matches = [to_records[position] for position in positions]
+
+                if debug:
+                    logger.debug(f"Found {len(matches)} matches for source record with {from_field}={from_value}")
 
                 # Add the source record with its matches
                 joined_record = {
@@ -307,6 +338,13 @@ class RelationshipHandler:
                 joined_records.append(joined_record)
 
         elif relation_type == "many2one":
+            # Index source records by relation id, keeping the first record of each id
+            source_index: Dict[Any, Dict[str, Any]] = {}
+            for from_record in from_records:
+                key = self._join_key(from_record.get(from_field))
+                if key is not None:
+                    source_index.setdefault(key, from_record)
+
             # For each target record, find the matching source record
             for to_record in to_records:
                 to_value = to_record.get(to_field)
@@ -315,20 +353,10 @@ class RelationshipHandler:
                 if to_value is None:
                     continue
 
-                # Find the matching source record
-                match = None
-                for from_record in from_records:
-                    from_value = from_record.get(from_field)
-
-                    # Handle many2one fields that store [id, name]
-                    if isinstance(from_value, list) and len(from_value) >= 1:
-                        if from_value[0] == to_value:
-                            match = from_record
-                            break
-                    # Direct value comparison
-                    elif from_value == to_value:
-                        match = from_record
-                        break
+                try:
+                    match = source_index.get(to_value)
+                except TypeError:
+                    match = None
 
                 # Add the target record with its match
                 joined_record = {
@@ -338,6 +366,13 @@ class RelationshipHandler:
                 joined_records.append(joined_record)
 
         elif relation_type == "many2many":
+            # Index target records by id
+            target_index: Dict[Any, List[int]] = {}
+            for position, to_record in enumerate(to_records):
+                key = self._join_key(to_record.get(to_field))
+                if key is not None:
+                    target_index.setdefault(key, []).append(position)
+
             # For each source record, find matching target records
             for from_record in from_records:
                 from_value = from_record.get(from_field)
@@ -346,14 +381,13 @@ class RelationshipHandler:
                 if from_value is None or not isinstance(from_value, list):
                     continue
 
-                # Find matching target records
-                matches = []
-                for to_record in to_records:
-                    to_id = to_record.get(to_field)
-
-                    # Check if the target ID is in the source's many2many list
-                    if to_id in from_value:
-                        matches.append(to_record)
+                positions = set()
+                for related_id in from_value:
+                    try:
+                        positions.update(target_index.get(related_id, []))
+                    except TypeError:
+                        continue
+                matches = [to_records[position] for position in sorted(positions)]
 
                 # Add the source record with its matches
                 joined_record = {
@@ -362,6 +396,8 @@ class RelationshipHandler:
                 }
                 joined_records.append(joined_record)
 
+        logger.info(f"Joined {len(from_records)} source and {len(to_records)} target records "
+                    f"({relation_type}) into {len(joined_records)} records")
         return joined_records
 
     def process_complex_query_results(self, query_results: List[Tuple[str, List[Dict[str, Any]], Dict[str, Any]]]) -> Dict[str, Any]:
@@ -438,10 +474,7 @@ class RelationshipHandler:
             if customer_name:
                 try:
                     # Try to find the customer directly
-                    partner_records = self.model_discovery.models_proxy.execute_kw(
-                        self.model_discovery.db,
-                        self.model_discovery.uid,
-                        self.model_discovery.password,
+                    partner_records = self._execute(
                         'res.partner',
                         'search_read',
                         [[("name", "ilike", customer_name)]],
@@ -474,10 +507,7 @@ class RelationshipHandler:
 
                         # Fetch the records with a higher limit
                         search_limit = 1000  # Higher limit to get more records
-                        secondary_records = self.model_discovery.models_proxy.execute_kw(
-                            self.model_discovery.db,
-                            self.model_discovery.uid,
-                            self.model_discovery.password,
+                        secondary_records = self._execute(
                             secondary_model,
                             'search_read',
                             [domain],
@@ -495,7 +525,7 @@ class RelationshipHandler:
                     logger.error(f"Exception details: {traceback.format_exc()}")
 
         # If we have primary records but no secondary records, we need to fetch the related secondary records
-        elif primary_records and not secondary_records:
+        elif primary_records and not secondary_records and not secondary_info.get("related_filter"):
             logger.info(f"Found primary records but no secondary records. Fetching related {secondary_model} records...")
 
             # Get primary record IDs
@@ -533,10 +563,7 @@ class RelationshipHandler:
                     search_limit = 1000  # Higher limit to get more records
 
                     logger.info(f"Fetching {secondary_model} records with domain {domain} and fields {secondary_fields}")
-                    secondary_records = self.model_discovery.models_proxy.execute_kw(
-                        self.model_discovery.db,
-                        self.model_discovery.uid,
-                        self.model_discovery.password,
+                    secondary_records = self._execute(
                         secondary_model,
                         'search_read',
                         [domain],
@@ -582,10 +609,7 @@ class RelationshipHandler:
                         search_limit = 1000  # Higher limit to get more records
 
                         logger.info(f"Fetching {secondary_model} records with domain {domain} and fields {secondary_fields}")
-                        secondary_records = self.model_discovery.models_proxy.execute_kw(
-                            self.model_discovery.db,
-                            self.model_discovery.uid,
-                            self.model_discovery.password,
+                        secondary_records = self._execute(
                             secondary_model,
                             'search_read',
                             [domain],
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Replica Module
+
+This module keeps a local SQLite replica of selected Odoo models, so that
+analytical queries (filters, aggregations, joins) run locally instead of on
+the production database. Each model is bulk exported once, then kept up to
+date incrementally by write_date, with a record count check to detect
+deletions.
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+import time
+import xmlrpc.client
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two synchronizations of the replicated models
+REPLICA_SYNC_INTERVAL = 300
+
+# Records read per search_read call when synchronizing
+REPLICA_BATCH_SIZE = 2000
+
+# Ids deleted per DELETE statement
+DELETE_CHUNK = 500
+
+# Field types not replicated unless configured explicitly
+SKIPPED_TYPES = ['one2many', 'many2many', 'binary', 'html', 'properties', 'properties_definition']
+
+# SQLite column type of each Odoo field type (TEXT otherwise)
+COLUMN_TYPES = {
+    'integer': 'INTEGER',
+    'boolean': 'INTEGER',
+    'many2one': 'INTEGER',
+    'float': 'REAL',
+    'monetary': 'REAL',
+}
+
+
+def table_name(model_name: str) -> str:
+    """Name of the replica table of a model (sale.order -> sale_order)."""
+    return model_name.replace('.', '_')
+
+
+def parse_replica_models(spec: str) -> Dict[str, Optional[List[str]]]:
+    """Parse a replica configuration such as "sale.order:name,amount_total;res.partner".
+
+    Args:
+        spec: Semicolon-separated models, each optionally followed by a colon
+            and its comma-separated fields
+
+    Returns:
+        Dictionary mapping model names to their fields (None for the default fields)
+    """
+    models = {}
+    for part in spec.split(';'):
+        model_name, _, fields = part.partition(':')
+        model_name = model_name.strip()
+        if model_name:
+            models[model_name] = [field.strip() for field in fields.split(',') if field.strip()] or None
+    return models
+
+
+class OdooReplica:
+    """Local SQLite mirror of configured Odoo models."""
+
+    def __init__(self, model_discovery, path: str, models: Dict[str, Optional[List[str]]],
+                 sync_interval: float = REPLICA_SYNC_INTERVAL):
+        """Open (or create) the replica database.
+
+        Args:
+            model_discovery: ModelDiscovery instance for accessing Odoo models
+            path: Path of the SQLite database file
+            models: Dictionary mapping the replicated models to their fields
+                (None for all stored fields except relational lists and binaries)
+            sync_interval: Seconds between two synchronizations in the background
+        """
+        self.model_discovery = model_discovery
+        self.path = path
+        self.models = models
+        self.sync_interval = sync_interval
+        self.errors: Dict[str, str] = {}
+        self._proxy = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # Readers keep seeing the last committed state while a sync is running
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS replica_sync ("
+            " model TEXT PRIMARY KEY, table_name TEXT NOT NULL, columns TEXT NOT NULL,"
+            " last_write_date TEXT, synced_at REAL, record_count INTEGER)"
+        )
+        self.conn.commit()
+
+    def _execute(self, model_name: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Execute a model method with a proxy of its own.
+
+        Syncs run in a background thread, and XML-RPC proxies are not thread
+        safe, so the proxy (or client) of the model discovery is never used
+        when the server URL is known.
+        """
+        client = getattr(self.model_discovery, 'client', None)
+        if client:
+            url, db, uid, password = client.config.url, client.config.db, client.uid, client.config.password
+        else:
+            url = getattr(self.model_discovery, 'url', None)
+            db, uid, password = self.model_discovery.db, self.model_discovery.uid, self.model_discovery.password
+        if self._proxy is None:
+            self._proxy = (xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object", allow_none=True)
+                           if url else self.model_discovery.models_proxy)
+        return self._proxy.execute_kw(db, uid, password, model_name, method, args, kwargs)
+
+    def _columns(self, model_name: str) -> Dict[str, str]:
+        """Replicated fields of a model with their types."""
+        fields = self._execute(model_name, 'fields_get', [], {'attributes': ['type', 'store']})
+        configured = self.models.get(model_name)
+        if configured:
+            unknown = [field for field in configured if field not in fields]
+            if unknown:
+                logger.warning(f"Ignoring unknown fields of {model_name} in the replica: {', '.join(unknown)}")
+            names = [field for field in configured if field in fields and field != 'id']
+        else:
+            names = [field for field, info in fields.items()
+                     if field != 'id' and info.get('store', True) and info.get('type') not in SKIPPED_TYPES]
+        for field in ('write_date', 'active'):
+            if field in fields and field not in names:
+                names.append(field)
+        return {field: fields[field].get('type', 'char') for field in names}
+
+    def _ensure_table(self, model_name: str, columns: Dict[str, str]) -> bool:
+        """Create the table of a model, or recreate it if its columns changed.
+
+        Returns:
+            True if the table was (re)created and needs a full export
+        """
+        table = table_name(model_name)
+        row = self.conn.execute("SELECT columns FROM replica_sync WHERE model = ?", (model_name,)).fetchone()
+        if row and json.loads(row[0]) == columns:
+            return False
+
+        definitions = ['id INTEGER PRIMARY KEY']
+        for field, field_type in columns.items():
+            definitions.append(f'"{field}" {COLUMN_TYPES.get(field_type, "TEXT")}')
+            if field_type == 'many2one':
+                definitions.append(f'"{field}_name" TEXT')
+        self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        self.conn.execute(f'CREATE TABLE "{table}" ({", ".join(definitions)})')
+        if 'write_date' in columns:
+            self.conn.execute(f'CREATE INDEX "{table}_write_date" ON "{table}" (write_date)')
+        self.conn.execute(
+            "INSERT OR REPLACE INTO replica_sync (model, table_name, columns, last_write_date, synced_at, record_count)"
+            " VALUES (?, ?, ?, NULL, NULL, 0)",
+            (model_name, table, json.dumps(columns))
+        )
+        logger.info(f"Created replica table {table} with {len(columns)} fields")
+        return True
+
+    @staticmethod
+    def _row(record: Dict[str, Any], columns: Dict[str, str]) -> List[Any]:
+        """Column values of a record (many2one fields give an id and a name column)."""
+        row = [record['id']]
+        for field, field_type in columns.items():
+            value = record.get(field)
+            if field_type == 'many2one':
+                row.extend(value[:2] if isinstance(value, (list, tuple)) and value else [None, None])
+            elif field_type == 'boolean':
+                row.append(int(bool(value)))
+            elif value is False or value is None:
+                row.append(None)
+            elif isinstance(value, (list, dict)):
+                row.append(json.dumps(value))
+            else:
+                row.append(value)
+        return row
+
+    def sync(self, model_name: str, full: bool = False) -> Dict[str, Any]:
+        """Bring the replica of a model up to date.
+
+        Records written since the last sync are read within a fixed write_date
+        window, paged by id. Odoo returns write_date truncated to the second
+        while it stores microseconds, so the window ends one second after the
+        newest write_date at the start of the sync, and the next sync starts
+        again from that second. Records written during the sync are read by
+        the next one. Deleted records are detected by comparing the local and
+        remote record counts, and only then looked up by id.
+
+        Args:
+            model_name: Model to synchronize
+            full: Whether to export all records again
+
+        Returns:
+            Dictionary with the numbers of records read and deleted
+        """
+        with self._lock:
+            try:
+                result = self._sync(model_name, full)
+            except Exception:
+                self.conn.rollback()
+                raise
+            self.errors.pop(model_name, None)
+
+        logger.info(f"Synchronized replica of {model_name}: {result['read']} records read, "
+                    f"{result['deleted']} deleted, {result['records']} in total")
+        return result
+
+    def _sync(self, model_name: str, full: bool) -> Dict[str, Any]:
+        """Synchronize a model; the caller holds the lock and rolls back on errors."""
+        table = table_name(model_name)
+        columns = self._columns(model_name)
+        full = self._ensure_table(model_name, columns) or full
+        last_write_date = None
+        if full:
+            self.conn.execute(f'DELETE FROM "{table}"')
+        else:
+            last_write_date = self.conn.execute(
+                "SELECT last_write_date FROM replica_sync WHERE model = ?", (model_name,)).fetchone()[0]
+
+        column_names = ['id']
+        for field, field_type in columns.items():
+            column_names.append(f'"{field}"')
+            if field_type == 'many2one':
+                column_names.append(f'"{field}_name"')
+        insert = (f'INSERT OR REPLACE INTO "{table}" ({", ".join(column_names)})'
+                  f' VALUES ({", ".join("?" * len(column_names))})')
+
+        window = []
+        if 'write_date' in columns:
+            newest = self._execute(model_name, 'search_read', [[('write_date', '!=', False)]], {
+                'fields': ['write_date'],
+                'order': 'write_date desc',
+                'limit': 1,
+                'context': {'active_test': False},
+            })
+            if newest:
+                upper = datetime.strptime(newest[0]['write_date'][:19], '%Y-%m-%d %H:%M:%S')
+                window = [('write_date', '<', (upper + timedelta(seconds=1)).strftime('%Y-%m-%d %H:%M:%S'))]
+                if last_write_date:
+                    window.insert(0, ('write_date', '>=', last_write_date))
+                last_write_date = newest[0]['write_date'][:19]
+
+        read = 0
+        last_id = 0
+        while True:
+            records = self._execute(model_name, 'search_read', [window + [('id', '>', last_id)]], {
+                'fields': list(columns),
+                'order': 'id asc',
+                'limit': REPLICA_BATCH_SIZE,
+                'context': {'active_test': False},
+            })
+            self.conn.executemany(insert, [self._row(record, columns) for record in records])
+            read += len(records)
+            if len(records) < REPLICA_BATCH_SIZE:
+                break
+            last_id = records[-1]['id']
+
+        # Local records are a superset of the remote ones, so equal counts mean no deletions
+        deleted = 0
+        remote_count = self._execute(model_name, 'search_count', [[]], {'context': {'active_test': False}})
+        local_count = self.conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        if local_count > remote_count:
+            remote_ids = set(self._execute(model_name, 'search', [[]], {'context': {'active_test': False}}))
+            gone = [row[0] for row in self.conn.execute(f'SELECT id FROM "{table}"') if row[0] not in remote_ids]
+            for start in range(0, len(gone), DELETE_CHUNK):
+                part = gone[start:start + DELETE_CHUNK]
+                self.conn.execute(f'DELETE FROM "{table}" WHERE id IN ({",".join("?" * len(part))})', part)
+            deleted = len(gone)
+            local_count -= deleted
+
+        self.conn.execute(
+            "UPDATE replica_sync SET last_write_date = ?, synced_at = ?, record_count = ? WHERE model = ?",
+            (last_write_date, time.time(), local_count, model_name)
+        )
+        self.conn.commit()
+        return {'model': model_name, 'read': read, 'deleted': deleted, 'records': local_count, 'full': full}
+
+    def sync_all(self, full: bool = False) -> List[Dict[str, Any]]:
+        """Synchronize every replicated model, recording the errors per model."""
+        results = []
+        for model_name in self.models:
+            try:
+                results.append(self.sync(model_name, full=full))
+            except Exception as e:
+                self.errors[model_name] = str(e)
+                logger.error(f"Error synchronizing replica of {model_name}: {str(e)}")
+        return results
+
+    def start(self):
+        """Synchronize the replica now and then every sync_interval seconds in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                self.sync_all()
+                self._stop.wait(self.sync_interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="odoo-replica-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background synchronization."""
+        self._stop.set()
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Replication state of each model, with its lag (seconds since its last sync)."""
+        # A connection of its own: the sync thread writes through self.conn
+        conn = self._reader()
+        try:
+            rows = {row[0]: row for row in conn.execute(
+                "SELECT model, table_name, columns, last_write_date, synced_at, record_count FROM replica_sync")}
+        finally:
+            conn.close()
+        now = time.time()
+        status = []
+        for model_name in self.models:
+            row = rows.get(model_name)
+            synced_at = row[4] if row else None
+            columns = []
+            for field, field_type in (json.loads(row[2]) if row else {}).items():
+                columns.extend([field, f"{field}_name"] if field_type == 'many2one' else [field])
+            status.append({
+                'model': model_name,
+                'table': table_name(model_name),
+                'columns': columns,
+                'records': row[5] if row else 0,
+                'last_write_date': row[3] if row else None,
+                'synced_at': synced_at,
+                'lag': now - synced_at if synced_at else None,
+                'error': self.errors.get(model_name),
+            })
+        return status
+
+    def _reader(self) -> sqlite3.Connection:
+        """Read-only connection to the replica, seeing the last committed sync."""
+        return sqlite3.connect(f"file:{quote(os.path.abspath(self.path))}?mode=ro", uri=True)
+
+    def query(self, sql: str, params: Optional[List[Any]] = None,
+              limit: int = 100) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Run a read-only SELECT query on the replica.
+
+        Args:
+            sql: A single SELECT (or WITH ... SELECT) statement
+            params: Values of the ? placeholders
+            limit: Maximum number of rows returned
+
+        Returns:
+            Tuple of (column names, rows)
+
+        Raises:
+            ValueError: If the statement is not a single SELECT query
+        """
+        statement = sql.strip().rstrip(';').strip()
+        if not re.match(r'(?is)^(select|with)\b', statement) or ';' in statement:
+            raise ValueError("Only a single SELECT query can be run on the replica")
+        conn = self._reader()
+        try:
+            cursor = conn.execute(statement, params or [])
+            columns = [description[0] for description in cursor.description or []]
+            return columns, cursor.fetchmany(limit)
+        finally:
+            conn.close()
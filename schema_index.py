@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Schema Index Module
+
+This module provides an optional embedding index of the labels and help texts
+of Odoo fields, built with the documentation EmbeddingEngine. It maps words
+the static mappings do not know ("turnover", "Client Ref") to the closest
+fields of a model.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sentence-transformers model used when the index creates its own engine
+SCHEMA_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Minimum similarity (1 / (1 + squared L2 distance), as in EmbeddingEngine.search) of a match
+MIN_SCORE = 0.5
+
+# Maximum number of phrase lookups kept in memory
+PHRASE_CACHE_SIZE = 1024
+
+# Fields never suggested
+SKIPPED_FIELDS = ["id", "create_uid", "write_uid", "create_date", "write_date", "__last_update"]
+
+
+def field_text(field_name: str, field_info: Dict[str, Any]) -> str:
+    """Text embedded for a field: its label, its technical name as words and its help."""
+    parts = [str(field_info.get('string') or ''), field_name.replace('_', ' ')]
+    if field_info.get('help'):
+        parts.append(str(field_info['help']))
+    return ". ".join(part for part in parts if part)
+
+
+def fields_signature(fields: Dict[str, Dict[str, Any]]) -> str:
+    """Hash of the indexed attributes of a model's fields, to detect schema changes."""
+    digest = hashlib.sha1()
+    for field_name in sorted(fields):
+        info = fields[field_name]
+        digest.update(f"{field_name}\0{info.get('string') or ''}\0{info.get('help') or ''}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SchemaIndex:
+    """Embedding index of the fields of the models it has been asked about.
+
+    Each model is embedded the first time it is searched (or again when its
+    fields change). The vectors and documents live in the engine, so they are
+    saved with its index and documents and reused on the next start.
+    """
+
+    def __init__(self, engine):
+        """Initialize the index from the documents already stored in the engine.
+
+        Args:
+            engine: EmbeddingEngine used to embed texts and persist the index
+        """
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._documents: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._rows: Dict[str, List[int]] = {}
+        self._signatures: Dict[str, str] = {}
+        self._phrases = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        documents = [doc for doc in (engine.documents or []) if 'model' in doc and 'field' in doc]
+        index = getattr(engine, 'index', None)
+        if documents and index is not None and index.ntotal == len(engine.documents) == len(documents):
+            self._set_documents(documents, np.asarray(index.reconstruct_n(0, index.ntotal), dtype=np.float32))
+            logger.info(f"Loaded schema index with {len(documents)} fields of {len(self._rows)} models")
+
+    def _set_documents(self, documents: List[Dict[str, Any]], vectors: np.ndarray):
+        """Replace the indexed documents and vectors and rebuild the per-model rows."""
+        self._documents = documents
+        self._vectors = vectors
+        self._rows = {}
+        self._signatures = {}
+        for row, doc in enumerate(documents):
+            self._rows.setdefault(doc['model'], []).append(row)
+            self._signatures[doc['model']] = doc['signature']
+
+    def index_model(self, model_name: str, fields: Dict[str, Dict[str, Any]]) -> bool:
+        """Embed the fields of a model unless they are already indexed unchanged.
+
+        Args:
+            model_name: Technical name of the model
+            fields: Dictionary of field information ('string' and optional 'help')
+
+        Returns:
+            True if the model is indexed, False if embedding failed
+        """
+        signature = fields_signature(fields)
+        if self._signatures.get(model_name) == signature:
+            return True
+
+        documents = [
+            {
+                "id": f"{model_name}:{field_name}",
+                "text": field_text(field_name, info),
+                "model": model_name,
+                "field": field_name,
+                "signature": signature,
+            }
+            for field_name, info in fields.items()
+            if field_name not in SKIPPED_FIELDS and not field_name.startswith('_')
+        ]
+        if not documents:
+            return False
+        vectors = np.asarray(self.engine.create_embeddings([doc["text"] for doc in documents]), dtype=np.float32)
+        if len(vectors) != len(documents):
+            logger.error(f"Could not embed the fields of {model_name}")
+            return False
+
+        keep = [row for row, doc in enumerate(self._documents) if doc['model'] != model_name]
+        if keep:
+            vectors = np.vstack([self._vectors[keep], vectors])
+            documents = [self._documents[row] for row in keep] + documents
+        if not self.engine.create_index(vectors):
+            return False
+        self.engine.documents = documents
+        self.engine.document_ids = [doc["id"] for doc in documents]
+        if getattr(self.engine, 'index_path', None) or getattr(self.engine, 'db', None):
+            self.engine.save_index_and_documents()
+
+        self._set_documents(documents, vectors)
+        for key in [key for key in self._phrases if key[0] == model_name]:
+            del self._phrases[key]
+        logger.info(f"Indexed {len(self._rows[model_name])} fields of {model_name} in the schema index")
+        return True
+
+    def search(self, model_name: str, phrase: str, fields: Optional[Dict[str, Dict[str, Any]]] = None,
+               k: int = 3) -> List[Tuple[str, float]]:
+        """Find the fields of a model closest in meaning to a phrase.
+
+        Args:
+            model_name: Technical name of the model
+            phrase: Query words or CSV header
+            fields: Current fields of the model, indexed first if given
+            k: Maximum number of matches
+
+        Returns:
+            List of (field_name, score) tuples, best first
+        """
+        key = (model_name, " ".join(phrase.lower().replace('_', ' ').split()), k)
+        with self._lock:
+            try:
+                # Re-indexing a changed model also drops its cached phrases
+                if fields:
+                    self.index_model(model_name, fields)
+            except Exception as e:
+                logger.error(f"Error indexing {model_name} in the schema index: {str(e)}")
+                return []
+            if key in self._phrases:
+                self._phrases.move_to_end(key)
+                self.hits += 1
+                return self._phrases[key]
+            self.misses += 1
+
+            matches = []
+            try:
+                rows = self._rows.get(model_name)
+                if rows and key[1]:
+                    query_vector = np.asarray(self.engine.model.encode([key[1]])[0], dtype=np.float32)
+                    distances = ((self._vectors[rows] - query_vector) ** 2).sum(axis=1)
+                    for position in np.argsort(distances)[:k]:
+                        score = float(1.0 / (1.0 + distances[position]))
+                        if score >= MIN_SCORE:
+                            matches.append((self._documents[rows[position]]['field'], score))
+            except Exception as e:
+                logger.error(f"Error searching the schema index of {model_name}: {str(e)}")
+                return []
+
+            self._phrases[key] = matches
+            while len(self._phrases) > PHRASE_CACHE_SIZE:
+                self._phrases.popitem(last=False)
+        logger.debug(f"Schema index matches for '{phrase}' in {model_name}: {matches}")
+        return matches
+
+
+_default_index = None
+_default_index_loaded = False
+_default_index_lock = threading.Lock()
+
+
+def get_schema_index() -> Optional[SchemaIndex]:
+    """Return the shared schema index, or None if it is disabled or unavailable.
+
+    The index is enabled with ODOO_SCHEMA_INDEX=true and saved under
+    ODOO_INDEX_DIR. It needs sentence-transformers and faiss.
+    """
+    global _default_index, _default_index_loaded
+    with _default_index_lock:
+        if _default_index_loaded:
+            return _default_index
+        _default_index_loaded = True
+
+        if os.getenv("ODOO_SCHEMA_INDEX", "").strip().lower() not in ("1", "true", "yes"):
+            return None
+        try:
+            from src.odoo_docs_rag.embedding_engine import EmbeddingEngine, FAISS_AVAILABLE
+        except Exception as e:
+            logger.warning(f"Schema index not available. Import error: {e}")
+            return None
+        if not FAISS_AVAILABLE:
+            logger.warning("Schema index not available: faiss is not installed")
+            return None
+
+        index_dir = os.getenv("ODOO_INDEX_DIR", "./odoo_docs_index")
+        engine = EmbeddingEngine(
+            model_name=SCHEMA_MODEL_NAME,
+            index_path=os.path.join(index_dir, "schema_index.bin"),
+            documents_path=os.path.join(index_dir, "schema_documents.pkl"),
+        )
+        if not engine.model:
+            logger.warning("Schema index not available: the embedding model could not be loaded")
+            return None
+        _default_index = SchemaIndex(engine)
+        return _default_index
@@ -11,6 +11,18 @@ import xmlrpc.client
 from dotenv import load_dotenv
 import ast
 import sys
+import time
+import itertools
+import hashlib
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 
 def connect():
     load_dotenv()
@@ -252,24 +264,128 @@ def find_existing_record(models, db, uid, pwd, model_name, row, vals, match_fiel
 
     # Special case for product.product
     if model_name == 'product.product' and 'product_tmpl_id' in vals:
-        print("Special case for product.product ----------", file=sys.stderr)
-        tmpl_id = vals['product_tmpl_id']
-        try:
-            domain = [['product_tmpl_id', '=', tmpl_id]]
-            ids = models.execute_kw(db, uid, pwd, model_name, 'search', [domain])
-            if ids:
-                if len(ids) == 1:
-                    return ids[0]
-                elif 'default_code' in vals:
-                    for rec_id in ids:
-                        rec = models.execute_kw(db, uid, pwd, model_name, 'read', [[rec_id]], {'fields': ['default_code']})
-                        if rec and rec[0].get('default_code') == vals['default_code']:
-                            return rec_id
-        except Exception as e:
-            print(f"Warning: Error finding product variant: {e}", file=sys.stderr)
+        return find_product_variant(models, db, uid, pwd, vals)
 
     return None
 
+def find_product_variant(models, db, uid, pwd, vals):
+    """Find the product.product variant of vals['product_tmpl_id'], by default_code if it has several."""
+    print("Special case for product.product ----------", file=sys.stderr)
+    tmpl_id = vals['product_tmpl_id']
+    try:
+        domain = [['product_tmpl_id', '=', tmpl_id]]
+        ids = models.execute_kw(db, uid, pwd, 'product.product', 'search', [domain])
+        if ids:
+            if len(ids) == 1:
+                return ids[0]
+            elif 'default_code' in vals:
+                for rec_id in ids:
+                    rec = models.execute_kw(db, uid, pwd, 'product.product', 'read', [[rec_id]], {'fields': ['default_code']})
+                    if rec and rec[0].get('default_code') == vals['default_code']:
+                        return rec_id
+    except Exception as e:
+        print(f"Warning: Error finding product variant: {e}", file=sys.stderr)
+    return None
+
+def find_existing_records(models, db, uid, pwd, model_name, rows, vals_list, match_field='id', unique_fields=None):
+    """
+    Batched find_existing_record: match a whole chunk of rows with one lookup per criterion.
+
+    External ids are looked up with one ir.model.data search_read, numeric ids with
+    one search and each unique field with one search_read, in the same order of
+    precedence as find_existing_record. Only the product.product variant fallback
+    still runs per row.
+
+    Returns:
+        A list with the existing record id (or None) of each row.
+    """
+    found = [None] * len(rows)
+    xmlids, numeric = {}, {}
+    for index, row in enumerate(rows):
+        raw_val = row.get(match_field)
+        if not raw_val:
+            continue
+        if '.' in raw_val:
+            xmlids.setdefault(tuple(raw_val.split('.', 1)), []).append(index)
+        elif safe_int(raw_val) is not None:
+            numeric.setdefault(int(raw_val), []).append(index)
+    try:
+        if xmlids:
+            data = models.execute_kw(db, uid, pwd, 'ir.model.data', 'search_read',
+                                     [[('model', '=', model_name),
+                                       ('module', 'in', sorted({module for module, _ in xmlids})),
+                                       ('name', 'in', sorted({name for _, name in xmlids}))]],
+                                     {'fields': ['module', 'name', 'res_id']})
+            for d in data:
+                for index in xmlids.get((d['module'], d['name']), ()):
+                    found[index] = d['res_id']
+        if numeric:
+            for record_id in models.execute_kw(db, uid, pwd, model_name, 'search', [[('id', 'in', sorted(numeric))]]):
+                for index in numeric.get(record_id, ()):
+                    found[index] = record_id
+    except Exception as e:
+        print(f"Warning: ID/external ID check failed: {e}", file=sys.stderr)
+
+    # Auto-detect unique fields if not provided
+    if not unique_fields:
+        unique_fields = get_unique_fields(models, db, uid, pwd, model_name)
+
+    for field in unique_fields:
+        pending = {}
+        for index, vals in enumerate(vals_list):
+            val = vals.get(field)
+            if found[index] is None and val and isinstance(val, (str, int, float)):
+                pending.setdefault(val, []).append(index)
+        if not pending:
+            continue
+        try:
+            records = models.execute_kw(db, uid, pwd, model_name, 'search_read',
+                                        [[(field, 'in', list(pending))]], {'fields': [field]})
+        except Exception as e:
+            print(f"Warning: Error searching {model_name}.{field}: {e}", file=sys.stderr)
+            continue
+        # Records come in the model's default order, so the first one wins like search()[0]
+        for record in records:
+            val = record.get(field)
+            if isinstance(val, list):
+                val = val[0] if val else None
+            for index in pending.pop(val, ()):
+                found[index] = record['id']
+
+    if model_name == 'product.product':
+        for index, vals in enumerate(vals_list):
+            if found[index] is None and 'product_tmpl_id' in vals:
+                found[index] = find_product_variant(models, db, uid, pwd, vals)
+    return found
+
+def record_keys(row, vals, match_field='id', unique_fields=()):
+    """Keys under which rows of one import describe the same record, as find_existing_record matches them."""
+    keys = []
+    if row.get(match_field):
+        keys.append((match_field, row[match_field]))
+    for field in unique_fields or ():
+        val = vals.get(field)
+        if val and isinstance(val, (str, int, float)):
+            keys.append((field, val))
+    return keys
+
+def update_vals(model, vals):
+    """Values of a row that may be written on an existing record."""
+    vals = {k: v for k, v in vals.items() if k != 'id'}
+    if model == 'product.product':
+        # product_tmpl_id and combination_indices would break the variant constraints
+        vals.pop('product_tmpl_id', None)
+        vals.pop('combination_indices', None)
+    return vals
+
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%m-%d-%Y')
+# Boolean cell values (lowercased); any other non-empty value imports as False
+BOOLEAN_TRUE_VALUES = ('1', 'true', 'yes', 'y')
+BOOLEAN_FALSE_VALUES = ('0', 'false', 'no', 'n')
+# Rows sampled to infer column formats, and rows converted per chunk
+PLAN_SAMPLE_SIZE = 200
+CONVERT_CHUNK_SIZE = 1000
 
 def process_field(raw, field, meta_fields, selection_fields, models=None, db=None, uid=None, pwd=None):
     raw_str = str(raw).strip() if raw else ''
@@ -285,7 +401,7 @@ def process_field(raw, field, meta_fields, selection_fields, models=None, db=Non
 
     try:
         if ttype == 'boolean':
-            return raw_str.lower() in ('1', 'true', 'yes', 'y')
+            return raw_str.lower() in BOOLEAN_TRUE_VALUES
         elif ttype == 'integer':
             return int(raw_str)
         elif ttype == 'float':
@@ -316,9 +432,8 @@ def process_field(raw, field, meta_fields, selection_fields, models=None, db=Non
             if ids:
                 return [(6, 0, ids)]
         elif ttype == 'date':
-            for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%m-%d-%Y'):
+            for fmt in DATE_FORMATS:
                 try:
-                    from datetime import datetime
                     return datetime.strptime(raw_str, fmt).strftime('%Y-%m-%d')
                 except ValueError:
                     continue
@@ -330,6 +445,651 @@ def process_field(raw, field, meta_fields, selection_fields, models=None, db=Non
     return None
 
 
+class AdaptiveBatchSizer:
+    """
+    Batch size controller for import batches.
+
+    The size is halved when a batch has failures or takes longer than the target
+    latency, and grows by half when batches come back clean and fast.
+    """
+
+    def __init__(self, size=100, min_size=1, max_size=1000, target_latency=5.0):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.size = min(max(size, self.min_size), self.max_size)
+        self.target_latency = target_latency
+
+    def record(self, count, elapsed, failures=0):
+        """Adjust the batch size after a batch of count items took elapsed seconds."""
+        if failures or elapsed > self.target_latency:
+            self.size = max(self.min_size, self.size // 2)
+        elif count >= self.size and elapsed < self.target_latency / 2:
+            self.size = min(self.max_size, self.size + max(1, self.size // 2))
+        return self.size
+
+def execute_bisect(execute, items, validation_errors, model):
+    """
+    Run execute(items) as one RPC and, if it fails, split the batch in half
+    recursively until the failing items are isolated.
+
+    Each item is a (ref, vals) tuple where ref identifies the source row. Odoo runs
+    every RPC in its own transaction, so a failed call leaves nothing behind and the
+    halves can safely be retried. Errors of isolated items are appended to
+    validation_errors.
+
+    Returns:
+        A tuple (succeeded, failed_count) where succeeded is a list of (item, result)
+        pairs, result being the value execute returned for that item.
+    """
+    if not items:
+        return [], 0
+    try:
+        results = execute(items)
+        return list(zip(items, results)), 0
+    except Exception as e:
+        if len(items) == 1:
+            ref, vals = items[0][0], items[0][-1]
+            print(f"Error processing {model} in row {ref}: {e}", file=sys.stderr)
+            validation_errors.append({"model": model, "row": ref, "error": str(e), "record": vals})
+            return [], 1
+        mid = len(items) // 2
+        left, left_failed = execute_bisect(execute, items[:mid], validation_errors, model)
+        right, right_failed = execute_bisect(execute, items[mid:], validation_errors, model)
+        return left + right, left_failed + right_failed
+
+def create_batch(models, db, uid, pwd, model, items, validation_errors, sizer=None):
+    """
+    Create (ref, vals) items with multi-record create calls, isolating failing rows by bisection.
+
+    Returns:
+        A tuple (created, failed_count) where created is a list of (ref, record_id) pairs.
+    """
+    def execute(batch):
+        ids = models.execute_kw(db, uid, pwd, model, 'create', [[vals for _, vals in batch]])
+        return ids if isinstance(ids, list) else [ids]
+
+    start = time.monotonic()
+    succeeded, failed = execute_bisect(execute, items, validation_errors, model)
+    if sizer:
+        sizer.record(len(items), time.monotonic() - start, failed)
+    return [(item[0], rid) for item, rid in succeeded], failed
+
+def write_batch(models, db, uid, pwd, model, items, validation_errors, sizer=None):
+    """
+    Write (ref, record_id, vals) items, grouping records that receive identical values
+    into a single write call and isolating failing rows by bisection.
+
+    Returns:
+        A tuple (written, failed_count) where written is a list of (ref, record_id) pairs.
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(repr(sorted(item[2].items())), []).append(item)
+
+    start = time.monotonic()
+    written, failed = [], 0
+    for group in groups.values():
+        vals = group[0][2]
+
+        def execute(batch, vals=vals):
+            models.execute_kw(db, uid, pwd, model, 'write', [[item[1] for item in batch], vals])
+            return [True] * len(batch)
+
+        succeeded, group_failed = execute_bisect(execute, group, validation_errors, model)
+        written.extend((item[0], item[1]) for item, _ in succeeded)
+        failed += group_failed
+    if sizer:
+        sizer.record(len(items), time.monotonic() - start, failed)
+    return written, failed
+
+READ_CHUNK_SIZE = 500
+
+def value_unchanged(new, current):
+    """Compare an import value with the value read from Odoo for the same field."""
+    current = normalize_read_value(current)
+    if new in (None, False, '') and current in (None, False, ''):
+        return True
+    if isinstance(new, list):
+        # Only many2many replacement commands can be compared with the stored ids
+        if len(new) == 1 and isinstance(new[0], (list, tuple)) and new[0][0] == 6 and isinstance(current, list):
+            return set(new[0][2]) == set(current)
+        return False
+    if isinstance(new, float) or isinstance(current, float):
+        try:
+            return abs(float(new) - float(current)) < 1e-9
+        except (TypeError, ValueError):
+            return False
+    return new == current
+
+def drop_unchanged(models, db, uid, pwd, model, items):
+    """
+    Diff queued (ref, record_id, vals) writes against the current record values.
+
+    The mapped fields of all records are read in chunks, fields whose value would not
+    change are dropped and items left without changes are returned separately, so
+    re-running a sync does not rewrite (and recompute, track, log) unchanged data.
+
+    Returns:
+        A tuple (changed_items, unchanged_items).
+    """
+    current = {}
+    ids = list(dict.fromkeys(item[1] for item in items))
+    fields = sorted({field for item in items for field in item[2]})
+    for start in range(0, len(ids), READ_CHUNK_SIZE):
+        try:
+            for rec in models.execute_kw(db, uid, pwd, model, 'read', [ids[start:start + READ_CHUNK_SIZE]],
+                                         {'fields': fields}):
+                current[rec['id']] = rec
+        except Exception as e:
+            print(f"Warning: Could not read current {model} values, writing all fields: {e}", file=sys.stderr)
+
+    changed, unchanged = [], []
+    for ref, record_id, vals in items:
+        rec = current.get(record_id)
+        if rec is None:
+            changed.append((ref, record_id, vals))
+            continue
+        diff = {field: val for field, val in vals.items()
+                if field not in rec or not value_unchanged(val, rec[field])}
+        if diff:
+            changed.append((ref, record_id, diff))
+        else:
+            unchanged.append((ref, record_id, vals))
+    return changed, unchanged
+
+POSTED_MOVE_READONLY_FIELDS = ['partner_id', 'invoice_date', 'date', 'currency_id']
+
+class DraftResetter:
+    """
+    Batched reset of posted account.move records before they are updated.
+
+    prepare() reads the state of a whole batch of matched moves in one call and
+    resets all posted ones with a single button_draft; the reset moves are
+    remembered and posted again with one action_post per chunk by repost().
+    """
+
+    def __init__(self, models, db, uid, pwd, reset_to_draft=True, model='account.move'):
+        self.models = models
+        self.db = db
+        self.uid = uid
+        self.pwd = pwd
+        self.reset_to_draft = reset_to_draft
+        self.model = model
+        self.checked = set()
+        self.reset_ids = []
+        self.posted_ids = set()
+
+    def prepare(self, ids):
+        """Reset the posted moves among ids; returns the ids that are still posted."""
+        ids = [i for i in dict.fromkeys(ids) if i not in self.checked]
+        for start in range(0, len(ids), READ_CHUNK_SIZE):
+            batch = ids[start:start + READ_CHUNK_SIZE]
+            self.checked.update(batch)
+            try:
+                states = self.models.execute_kw(self.db, self.uid, self.pwd, self.model, 'read',
+                                                [batch], {'fields': ['state']})
+            except Exception as e:
+                print(f"Warning: Error checking {self.model} state: {e}", file=sys.stderr)
+                continue
+            posted = [rec['id'] for rec in states if rec.get('state') == 'posted']
+            if not posted:
+                continue
+            if not self.reset_to_draft:
+                print(f"Warning: Cannot update {len(posted)} posted {self.model} records without reset_to_draft option", file=sys.stderr)
+                self.posted_ids.update(posted)
+                continue
+            try:
+                print(f"Resetting {len(posted)} {self.model} records to draft state", file=sys.stderr)
+                self.models.execute_kw(self.db, self.uid, self.pwd, self.model, 'button_draft', [posted])
+                self.reset_ids.extend(posted)
+            except Exception as e:
+                print(f"Warning: Could not reset {self.model} records to draft: {e}", file=sys.stderr)
+                self.posted_ids.update(posted)
+        return self.posted_ids
+
+    def repost(self):
+        """Post again every move reset by prepare(); returns the number of reposted moves."""
+        reposted = 0
+        for start in range(0, len(self.reset_ids), READ_CHUNK_SIZE):
+            batch = self.reset_ids[start:start + READ_CHUNK_SIZE]
+            try:
+                self.models.execute_kw(self.db, self.uid, self.pwd, self.model, 'action_post', [batch])
+                reposted += len(batch)
+            except Exception as e:
+                print(f"Warning: Could not post {self.model} records {batch} again: {e}", file=sys.stderr)
+        if reposted:
+            print(f"Posted {reposted} {self.model} records again", file=sys.stderr)
+        self.reset_ids = []
+        return reposted
+
+class RelationResolver:
+    """
+    Memoized name-to-id resolution for many2one and many2many cells.
+
+    Distinct names are collected per relation and resolved with a single
+    search_read on the relation's name field; names that are not found exactly
+    fall back to name_search, as process_field does. Results (including misses)
+    are kept for the whole import, so each distinct name costs at most one lookup.
+    """
+
+    def __init__(self, models, db, uid, pwd, cache=None):
+        self.models = models
+        self.db = db
+        self.uid = uid
+        self.pwd = pwd
+        # The cache can be shared between imports so ids resolved or created by one feed the next
+        self.cache = {} if cache is None else cache
+        self.name_fields = {}
+        self.rpc_count = 0
+
+    def register(self, model, items):
+        """Remember the ids of (vals, record_id) pairs just created or written on model."""
+        for vals, record_id in items:
+            name = vals.get('name')
+            if isinstance(name, str) and name:
+                self.cache[(model, name)] = record_id
+
+    def _name_field(self, relation):
+        if relation not in self.name_fields:
+            try:
+                self.rpc_count += 1
+                info = self.models.execute_kw(self.db, self.uid, self.pwd, relation, 'fields_get', [['name']])
+                self.name_fields[relation] = 'name' if 'name' in info else None
+            except Exception as e:
+                print(f"Warning: Could not read fields of {relation}: {e}", file=sys.stderr)
+                self.name_fields[relation] = None
+        return self.name_fields[relation]
+
+    def prime(self, relation, names):
+        """Resolve every not yet cached name of relation with one search_read plus name_search for misses."""
+        missing = {n for n in names if n and not n.isdigit() and (relation, n) not in self.cache}
+        if not relation or not missing:
+            return
+        name_field = self._name_field(relation)
+        if name_field:
+            try:
+                self.rpc_count += 1
+                records = self.models.execute_kw(self.db, self.uid, self.pwd, relation, 'search_read',
+                                                 [[(name_field, 'in', sorted(missing))]],
+                                                 {'fields': [name_field], 'order': 'id'})
+                for rec in records:
+                    key = (relation, rec.get(name_field))
+                    if rec.get(name_field) in missing and key not in self.cache:
+                        self.cache[key] = rec['id']
+            except Exception as e:
+                print(f"Warning: Bulk lookup on {relation} failed, falling back to name_search: {e}", file=sys.stderr)
+        for name in missing:
+            if (relation, name) in self.cache:
+                continue
+            try:
+                self.rpc_count += 1
+                res = self.models.execute_kw(self.db, self.uid, self.pwd, relation, 'name_search', [[name]], {'limit': 1})
+                self.cache[(relation, name)] = res[0][0] if res else None
+            except Exception as e:
+                print(f"Error resolving '{name}' on {relation}: {e}", file=sys.stderr)
+                self.cache[(relation, name)] = None
+
+    def resolve(self, relation, name):
+        """Return the id for name on relation (digits are taken as ids), or None."""
+        name = name.strip()
+        if name.isdigit():
+            return int(name)
+        if not relation:
+            return None
+        if (relation, name) not in self.cache:
+            self.prime(relation, [name])
+        return self.cache.get((relation, name))
+
+def is_empty_cell(raw):
+    """Return True for cells that process_field treats as no value."""
+    raw_str = str(raw).strip() if raw else ''
+    return not raw_str or raw_str.lower() in ('false', 'none')
+
+def infer_date_format(samples):
+    """Return the first known date format that parses every non-empty sample value."""
+    values = [str(v).strip() for v in samples if not is_empty_cell(v)]
+    if not values:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            for value in values:
+                datetime.strptime(value, fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+class ColumnPlan:
+    """
+    Converter for one CSV column, compiled once per import.
+
+    The field metadata is resolved up front, selection values are bound to a
+    frozenset and the date format is inferred from a sample of the column, so
+    converting a cell no longer re-derives anything. Numeric and date columns are
+    converted a whole chunk at a time with pandas when it is available.
+    """
+
+    VECTORIZED_TYPES = ('integer', 'float', 'date')
+
+    def __init__(self, csv_field, field, fmeta=None, selection_values=None, date_format=None, resolver=None):
+        self.csv_field = csv_field
+        self.field = field
+        self.fmeta = fmeta
+        self.ttype = fmeta['ttype'] if fmeta else None
+        self.relation = fmeta.get('relation') if fmeta else None
+        self.selection = frozenset(selection_values or ())
+        self.date_format = date_format
+        self.resolver = resolver
+
+    def convert(self, raw, models=None, db=None, uid=None, pwd=None):
+        """Convert a single cell; returns None when the cell has no usable value."""
+        if is_empty_cell(raw):
+            return None
+        raw_str = str(raw).strip()
+        if self.ttype == 'selection':
+            if raw_str not in self.selection:
+                print(f"Warning: Invalid selection '{raw_str}' for field '{self.field}'")
+                return None
+            return raw_str
+        if self.ttype == 'date':
+            return self._convert_date(raw_str)
+        if self.ttype in ('many2one', 'many2many'):
+            if self.resolver is None:
+                return process_field(raw_str, self.field, {self.field: self.fmeta}, {}, models, db, uid, pwd)
+            return self._convert_relational(raw_str)
+        try:
+            if self.ttype == 'boolean':
+                return raw_str.lower() in BOOLEAN_TRUE_VALUES
+            elif self.ttype == 'integer':
+                return int(raw_str)
+            elif self.ttype == 'float':
+                return float(raw_str)
+        except Exception as e:
+            print(f"Error processing field '{self.field}' value '{raw_str}': {e}")
+            return None
+        return raw_str
+
+    def _convert_relational(self, raw_str):
+        if self.ttype == 'many2one':
+            return self.resolver.resolve(self.relation, raw_str)
+        ids = [self.resolver.resolve(self.relation, part) for part in raw_str.split(',') if part.strip()]
+        ids = [i for i in ids if i]
+        return [(6, 0, ids)] if ids else None
+
+    def relation_names(self, raw_values):
+        """Return the distinct non-id names referenced by raw_values of a relational column."""
+        names = set()
+        for raw in raw_values:
+            if is_empty_cell(raw):
+                continue
+            parts = str(raw).split(',') if self.ttype == 'many2many' else [str(raw)]
+            names.update(p.strip() for p in parts if p.strip() and not p.strip().isdigit())
+        return names
+
+    def _convert_date(self, raw_str):
+        formats = (self.date_format,) + DATE_FORMATS if self.date_format else DATE_FORMATS
+        for fmt in formats:
+            try:
+                return datetime.strptime(raw_str, fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        print(f"Warning: Unrecognized date format: {raw_str}")
+        return None
+
+    def convert_many(self, raw_values, models=None, db=None, uid=None, pwd=None):
+        """Convert a chunk of cells of this column; returns a list aligned with raw_values."""
+        if self.resolver is not None and self.relation and self.ttype in ('many2one', 'many2many'):
+            self.resolver.prime(self.relation, self.relation_names(raw_values))
+        if pd is None or self.ttype not in self.VECTORIZED_TYPES:
+            return [self.convert(raw, models, db, uid, pwd) for raw in raw_values]
+
+        empty = [is_empty_cell(raw) for raw in raw_values]
+        series = pd.Series([None if e else str(raw).strip() for raw, e in zip(raw_values, empty)], dtype=object)
+        if self.ttype == 'date':
+            if not self.date_format:
+                return [self.convert(raw) for raw in raw_values]
+            parsed = pd.to_datetime(series, format=self.date_format, errors='coerce').dt.strftime('%Y-%m-%d')
+        elif self.ttype == 'integer':
+            # Only integer literals, as int() accepts them, converted without going through float
+            literal = series.str.fullmatch(r'[+-]?\d+', na=False)
+            parsed = pd.to_numeric(series.where(literal, '0'), errors='coerce').astype('Int64').where(literal)
+        else:
+            parsed = pd.to_numeric(series, errors='coerce')
+
+        results = []
+        for raw, is_empty, value in zip(raw_values, empty, parsed.tolist()):
+            if is_empty:
+                results.append(None)
+            elif pd.isna(value):
+                # Not parsable in bulk (NaN/NaT/NA): fall back to the per-cell path for its warning/fallbacks
+                results.append(self.convert(raw))
+            elif self.ttype == 'integer':
+                results.append(int(value))
+            elif self.ttype == 'float':
+                results.append(float(value))
+            else:
+                results.append(value)
+        return results
+
+def compile_parse_plans(field_mapping, meta_fields, selection_fields, sample_rows=(), resolver=None):
+    """
+    Compile a ColumnPlan for every mapped CSV column.
+
+    Args:
+        field_mapping: Mapping from CSV field names to Odoo field names
+        meta_fields: Field metadata keyed by Odoo field name (from fetch_fields)
+        selection_fields: Allowed selection keys keyed by Odoo field name
+        sample_rows: Rows used to infer the date format of date columns
+        resolver: Optional RelationResolver shared by the plans of relational columns
+    """
+    plans = {}
+    for csv_field, odoo_field in field_mapping.items():
+        fmeta = meta_fields.get(odoo_field)
+        date_format = None
+        if fmeta and fmeta['ttype'] == 'date':
+            date_format = infer_date_format(row.get(csv_field) for row in sample_rows)
+        plans[csv_field] = ColumnPlan(csv_field, odoo_field, fmeta,
+                                      selection_fields.get(odoo_field), date_format, resolver)
+    return plans
+
+def prime_relations(plans, rows):
+    """Resolve the relational names used by rows in bulk before converting them one by one."""
+    for csv_field, plan in plans.items():
+        if plan.resolver is not None and plan.relation and plan.ttype in ('many2one', 'many2many'):
+            plan.resolver.prime(plan.relation, plan.relation_names(row.get(csv_field) for row in rows))
+
+def convert_row(plans, row, models=None, db=None, uid=None, pwd=None):
+    """Convert one CSV row with compiled plans; returns the Odoo vals (None values dropped)."""
+    vals = {}
+    for csv_field, plan in plans.items():
+        val = plan.convert(row.get(csv_field), models, db, uid, pwd)
+        if val is not None:
+            vals[plan.field] = val
+    return vals
+
+def convert_chunk(plans, rows, models=None, db=None, uid=None, pwd=None):
+    """Convert a chunk of CSV rows column by column; returns one vals dict per row."""
+    converted = [{} for _ in rows]
+    for csv_field, plan in plans.items():
+        values = plan.convert_many([row.get(csv_field) for row in rows], models, db, uid, pwd)
+        for vals, val in zip(converted, values):
+            if val is not None:
+                vals[plan.field] = val
+    return converted
+
+def iter_chunks(iterable, size):
+    """Yield lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class ImportJournal:
+    """
+    Local SQLite journal of imported CSV rows.
+
+    Each source row is identified by a hash of its raw values and recorded with the
+    id of the Odoo record it produced, right after the batch containing it has been
+    committed. A rerun of the same import skips journaled rows in bulk and carries
+    on from the last committed batch. When xmlid_module is set, created records also
+    get an ir.model.data external id under that module, so reruns stay idempotent
+    even without the local journal file.
+    """
+
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path, model, models=None, db=None, uid=None, pwd=None, xmlid_module=None):
+        self.path = path
+        self.model = model
+        self.models = models
+        self.db = db
+        self.uid = uid
+        self.pwd = pwd
+        self.xmlid_module = xmlid_module
+        self.batch = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS import_journal ("
+            " model TEXT NOT NULL, row_hash TEXT NOT NULL, res_id INTEGER NOT NULL,"
+            " batch INTEGER NOT NULL, imported_at TEXT NOT NULL,"
+            " PRIMARY KEY (model, row_hash))"
+        )
+        self.conn.commit()
+        row = self.conn.execute("SELECT MAX(batch) FROM import_journal WHERE model = ?", (model,)).fetchone()
+        self.batch = row[0] or 0
+
+    @staticmethod
+    def row_hash(row):
+        """Stable hash of a raw CSV row."""
+        payload = json.dumps(row, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def xmlid_name(self, row_hash):
+        return f"{self.model.replace('.', '_')}_{row_hash[:20]}"
+
+    def completed(self, hashes):
+        """Return {row_hash: res_id} for the hashes already imported."""
+        hashes = list(dict.fromkeys(hashes))
+        done = {}
+        for start in range(0, len(hashes), self.LOOKUP_CHUNK):
+            part = hashes[start:start + self.LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(part))
+            for row_hash, res_id in self.conn.execute(
+                    f"SELECT row_hash, res_id FROM import_journal WHERE model = ? AND row_hash IN ({placeholders})",
+                    [self.model] + part):
+                done[row_hash] = res_id
+
+        missing = [h for h in hashes if h not in done]
+        if self.xmlid_module and self.models and missing:
+            # Rows imported from another machine or with a lost journal still have their external id
+            by_name = {self.xmlid_name(h): h for h in missing}
+            try:
+                data = self.models.execute_kw(self.db, self.uid, self.pwd, 'ir.model.data', 'search_read',
+                                              [[('module', '=', self.xmlid_module), ('model', '=', self.model),
+                                                ('name', 'in', list(by_name))]],
+                                              {'fields': ['name', 'res_id']})
+            except Exception as e:
+                print(f"Warning: Could not look up external ids for {self.model}: {e}", file=sys.stderr)
+                return done
+            recovered = [(by_name[d['name']], d['res_id']) for d in data]
+            done.update(recovered)
+            self._store(recovered)
+        return done
+
+    def record(self, entries, created=False):
+        """Journal (row_hash, res_id) pairs of a committed batch."""
+        entries = list(entries)
+        if not entries:
+            return
+        if created and self.xmlid_module and self.models:
+            try:
+                self.models.execute_kw(self.db, self.uid, self.pwd, 'ir.model.data', 'create', [[
+                    {'module': self.xmlid_module, 'name': self.xmlid_name(h), 'model': self.model,
+                     'res_id': res_id, 'noupdate': True}
+                    for h, res_id in entries
+                ]])
+            except Exception as e:
+                print(f"Warning: Could not create external ids for {self.model}: {e}", file=sys.stderr)
+        self._store(entries)
+
+    def _store(self, entries):
+        if not entries:
+            return
+        self.batch += 1
+        now = datetime.now().isoformat(timespec='seconds')
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO import_journal (model, row_hash, res_id, batch, imported_at) VALUES (?, ?, ?, ?, ?)",
+            [(self.model, h, res_id, self.batch, now) for h, res_id in entries])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def normalize_cell(value, fold_case=False):
+    """
+    Normalize a raw CSV cell for duplicate detection.
+
+    Whitespace is stripped and collapsed. Case is only folded for keys matched with
+    =ilike; find_existing_record matches with =, which is case-sensitive in Odoo.
+    """
+    normalized = ' '.join(str(value or '').split())
+    return normalized.casefold() if fold_case else normalized
+
+def find_duplicate_rows(path, field_mapping, unique_fields, match_field='id', policy='last', fold_case=False):
+    """
+    Pre-pass over a CSV file collapsing rows that describe the same record.
+
+    Rows are keyed the way find_existing_record matches them: the match_field
+    column, else the first mapped unique field with a value, else the hash of all
+    normalized mapped values. For each key only the first or the last row is kept.
+    Keys are compared case-sensitively unless fold_case is set, matching the =
+    operator; keys differing only by case are reported instead of collapsed.
+
+    Returns:
+        A tuple (dropped, conflicts, case_collisions): the set of dropped row numbers
+        (2-based, as in import_model), the number of dropped rows whose values
+        differed from the row that was kept, and (row_num, other_row_num, field)
+        tuples for rows whose key differs only by case from an earlier row.
+    """
+    key_columns = [(csv_field, field) for csv_field, field in field_mapping.items() if field in unique_fields]
+    key_columns.sort(key=lambda c: unique_fields.index(c[1]))
+
+    seen = {}
+    folded_keys = {}
+    dropped = set()
+    conflicts = 0
+    case_collisions = []
+    with open(path, newline='') as f:
+        for row_num, row in enumerate(csv.DictReader(f), start=2):
+            mapped = [normalize_cell(row.get(csv_field), fold_case) for csv_field in field_mapping]
+            values_hash = hashlib.sha1('\x1f'.join(mapped).encode('utf-8')).hexdigest()
+            if row.get(match_field):
+                key = (match_field, normalize_cell(row[match_field], fold_case))
+            else:
+                key = next(((field, normalize_cell(row[csv_field], fold_case)) for csv_field, field in key_columns
+                            if normalize_cell(row.get(csv_field))), ('*', values_hash))
+
+            if key not in seen:
+                if key[0] != '*' and not fold_case:
+                    folded_key = (key[0], key[1].casefold())
+                    if folded_key in folded_keys:
+                        case_collisions.append((row_num, folded_keys[folded_key], key[0]))
+                    else:
+                        folded_keys[folded_key] = row_num
+                seen[key] = (row_num, values_hash)
+                continue
+            kept_num, kept_hash = seen[key]
+            conflicts += kept_hash != values_hash
+            if policy == 'first':
+                dropped.add(row_num)
+            else:
+                dropped.add(kept_num)
+                seen[key] = (row_num, values_hash)
+    return dropped, conflicts, case_collisions
+
 def import_model(args):
     models, db, uid, pwd = connect()
     fields_meta, field_names = fetch_fields(models, db, uid, pwd, args.model)
@@ -354,6 +1114,7 @@ def import_model(args):
     with open(args.input, newline='') as f:
         sample_reader = csv.DictReader(f)
         csv_fields = sample_reader.fieldnames if sample_reader.fieldnames else []
+        sample_rows = list(itertools.islice(sample_reader, PLAN_SAMPLE_SIZE))
 
     missing_required = [f for f in required_fields if f not in csv_fields and f not in default_values]
     if missing_required:
@@ -371,6 +1132,10 @@ def import_model(args):
             if fm['name'] in field_info and 'selection' in field_info[fm['name']]:
                 selection_fields[fm['name']] = [s[0] for s in field_info[fm['name']]['selection']]
 
+    # Compile one converter per mapped column; relational names are resolved in bulk and memoized
+    resolver = RelationResolver(models, db, uid, pwd, cache=getattr(args, 'id_map', None))
+    plans = compile_parse_plans(args.field_mapping, {f['name']: f for f in fields_meta}, selection_fields, sample_rows, resolver)
+
     # Get unique fields for this model dynamically
     model_unique_fields = get_unique_fields(models, db, uid, pwd, args.model)
     print(f"Detected potential unique fields for {args.model}: {', '.join(model_unique_fields)}", file=sys.stderr)
@@ -388,124 +1153,233 @@ def import_model(args):
     updated_count = 0
     error_count = 0
     skipped_count = 0
+    unchanged_count = 0
+    validation_errors = []
+
+    # Optionally collapse rows describing the same record before anything reaches Odoo
+    duplicate_rows = set()
+    dedupe = getattr(args, 'dedupe', None)
+    if dedupe:
+        duplicate_rows, conflicts, case_collisions = find_duplicate_rows(
+            args.input, args.field_mapping, model_unique_fields, match_field, dedupe)
+        print(f"Collapsed {len(duplicate_rows)} duplicate rows keeping the {dedupe} occurrence "
+              f"({conflicts} with differing values)", file=sys.stderr)
+        for row_num, other_row_num, field in case_collisions:
+            print(f"Warning: Row {row_num} differs from row {other_row_num} only by the case of {field}; "
+                  f"both are kept since {field} is matched case-sensitively", file=sys.stderr)
+
+    # Optional journal making reruns resumable and idempotent
+    journal = None
+    journaled_count = 0
+    row_hashes = {}
+    if getattr(args, 'journal', None):
+        journal = ImportJournal(args.journal, args.model, models, db, uid, pwd,
+                                xmlid_module=getattr(args, 'xmlid_module', None))
+        print(f"Using import journal {args.journal} (last committed batch: {journal.batch})", file=sys.stderr)
+
+    # Creates and writes are queued and sent in batches
+    sizer = AdaptiveBatchSizer(size=getattr(args, 'batch_size', None) or 100)
+    pending_creates = []
+    pending_writes = []
+    # Rows of this run describing the same record: key -> ('queued', ref, vals) or ('created', record_id)
+    run_keys = {}
+    pending_keys = {}
+    folded_rows = {}
+
+    def flush_creates():
+        nonlocal created_count, updated_count, error_count
+        created, failed = create_batch(models, db, uid, pwd, args.model, pending_creates, validation_errors, sizer)
+        print(f"Created {len(created)} {args.model} records ({failed} failed), next batch size {sizer.size}", file=sys.stderr)
+        vals_by_ref = dict(pending_creates)
+        resolver.register(args.model, ((vals_by_ref[ref], rid) for ref, rid in created))
+        created_ids = dict(created)
+        for ref, _ in pending_creates:
+            for key in pending_keys.pop(ref, ()):
+                if run_keys.get(key, ())[:2] != ('queued', ref):
+                    continue
+                if ref in created_ids:
+                    run_keys[key] = ('created', created_ids[ref])
+                else:
+                    run_keys.pop(key, None)
+        # Later rows folded into a create count as updates of the created record
+        folded = [(fold, created_ids.get(ref)) for ref, _ in pending_creates for fold in folded_rows.pop(ref, ())]
+        created_count += len(created)
+        updated_count += sum(1 for _, rid in folded if rid)
+        error_count += failed + sum(1 for _, rid in folded if not rid)
+        if journal:
+            journal.record(((row_hashes[ref], rid) for ref, rid in created), created=True)
+            journal.record((row_hashes[fold], rid) for fold, rid in folded if rid)
+            for ref, _ in pending_creates:
+                row_hashes.pop(ref, None)
+            for fold, _ in folded:
+                row_hashes.pop(fold, None)
+        pending_creates.clear()
+
+    # Posted account.move records are checked and reset to draft per write batch
+    resetter = None
+    if args.model == 'account.move' and update_existing:
+        resetter = DraftResetter(models, db, uid, pwd, reset_to_draft=getattr(args, 'reset_to_draft', False))
+
+    def flush_writes():
+        nonlocal updated_count, unchanged_count, error_count
+        # Only send the fields that actually differ from the stored values
+        changed, unchanged = drop_unchanged(models, db, uid, pwd, args.model, pending_writes)
+        if resetter and changed:
+            posted = resetter.prepare([record_id for _, record_id, _ in changed])
+            if posted and getattr(args, 'skip_readonly_fields', False):
+                # Remove readonly fields for moves that stay posted
+                stripped = []
+                for ref, record_id, vals in changed:
+                    if record_id in posted:
+                        vals = {k: v for k, v in vals.items() if k not in POSTED_MOVE_READONLY_FIELDS}
+                        if not vals:
+                            unchanged.append((ref, record_id, vals))
+                            continue
+                    stripped.append((ref, record_id, vals))
+                changed = stripped
+        unchanged_count += len(unchanged)
+        written, failed = write_batch(models, db, uid, pwd, args.model, changed, validation_errors, sizer)
+        print(f"Updated {len(written)} {args.model} records ({len(unchanged)} unchanged, {failed} failed), next batch size {sizer.size}", file=sys.stderr)
+        updated_count += len(written)
+        error_count += failed
+        if journal:
+            journal.record((row_hashes[ref], rid) for ref, rid in written + [item[:2] for item in unchanged])
+            for ref, _, _ in pending_writes:
+                row_hashes.pop(ref, None)
+        pending_writes.clear()
 
     with open(args.input, newline='') as f:
         reader = csv.DictReader(f)
-        for row_num, row in enumerate(reader, start=2):  # Start at 2 to account for header row
-            vals = {}
-
-            # Add default values first
-            for key, value in default_values.items():
-                vals[key] = value
-
-            # Process CSV values
-            csv_field = next(iter(args.field_mapping))   # CSV field name
-            odoo_field = args.field_mapping[csv_field]   # Odoo field name
-
-            key = row.get(csv_field)
-            vals = {**default_values}
-            for csv_field, odoo_field in args.field_mapping.items():
-                val = process_field(row.get(csv_field), odoo_field, {f['name']: f for f in fields_meta}, selection_fields, models, db, uid, pwd)
-                if val is not None:
-                    vals[odoo_field] = val
-
-            # override name if prefix provided
-            if hasattr(args, 'name_prefix') and args.name_prefix and 'name' in vals:
-                vals['name'] = f"{args.name_prefix}-{counter:03d}"
-                counter += 1
-
-            # Final check for required fields
-            missing_vals = [f for f in required_fields if f not in vals]
-            if missing_vals and not args.force:
-                print(f"Error: Missing required fields in row {row_num}: {', '.join(missing_vals)}",file=sys.stderr)
-                error_count += 1
-                continue
+        # Start at 2 to account for header row
+        rows = enumerate(reader, start=2)
+        if duplicate_rows:
+            rows = ((row_num, row) for row_num, row in rows if row_num not in duplicate_rows)
+        for chunk in iter_chunks(rows, CONVERT_CHUNK_SIZE):
+            if journal:
+                # Skip the rows a previous run already committed
+                hashes = {row_num: ImportJournal.row_hash(row) for row_num, row in chunk}
+                done = journal.completed(hashes.values())
+                if done:
+                    chunk = [(row_num, row) for row_num, row in chunk if hashes[row_num] not in done]
+                    journaled_count += len(hashes) - len(chunk)
+                row_hashes.update((row_num, hashes[row_num]) for row_num, _ in chunk)
+                if not chunk:
+                    continue
+
+            # Convert the whole chunk column by column with the compiled plans
+            converted = convert_chunk(plans, [row for _, row in chunk], models, db, uid, pwd)
+            queued_rows = set()
+            ready = []
+            for (row_num, row), row_vals in zip(chunk, converted):
+                vals = {**default_values, **row_vals}
+
+                # override name if prefix provided
+                if hasattr(args, 'name_prefix') and args.name_prefix and 'name' in vals:
+                    vals['name'] = f"{args.name_prefix}-{counter:03d}"
+                    counter += 1
+
+                # Final check for required fields
+                missing_vals = [f for f in required_fields if f not in vals]
+                if missing_vals and not args.force:
+                    print(f"Error: Missing required fields in row {row_num}: {', '.join(missing_vals)}",file=sys.stderr)
+                    error_count += 1
+                    continue
+                ready.append((row_num, row, vals))
 
-            # Check if record exists
-            existing_id =  find_existing_record(
+            # Check which records exist, with one lookup per criterion for the whole chunk
+            existing_ids = find_existing_records(
                 models=models,
                 db=db,
                 uid=uid,
                 pwd=pwd,
                 model_name=args.model,
-                row=row,
-                vals=vals,
+                rows=[row for _, row, _ in ready],
+                vals_list=[vals for _, _, vals in ready],
                 match_field=match_field,
                 unique_fields=model_unique_fields
             )
 
-            # Handle account.move special case (reset to draft)
-            if existing_id and update_existing and args.model == 'account.move':
+            for (row_num, row, vals), existing_id in zip(ready, existing_ids):
+                keys = record_keys(row, vals, match_field, model_unique_fields)
+                queued = None
+                if not existing_id:
+                    # An earlier row of this run may already create (or have created) the record
+                    hit = next((run_keys[key] for key in keys if key in run_keys), None)
+                    if hit and hit[0] == 'queued':
+                        queued = hit
+                    elif hit:
+                        existing_id = hit[1]
+
                 try:
-                    print(f"Checking state of existing account.move {existing_id}...",file=sys.stderr)
-                    # Check if the move is posted
-                    move_info = models.execute_kw(db, uid, pwd, 'account.move', 'read',
-                                               [[existing_id]], {'fields': ['state']})
-                    if move_info and move_info[0]['state'] == 'posted':
-                        if getattr(args, 'reset_to_draft', False):
-                            print(f"Resetting account.move {existing_id} to draft state",file=sys.stderr)
-                            models.execute_kw(db, uid, pwd, 'account.move', 'button_draft', [[existing_id]])
+                    # Update or create record
+                    if queued and update_existing:
+                        # Fold the row into the queued create, as if it updated the created record
+                        queued[2].update(update_vals(args.model, vals))
+                        folded_rows.setdefault(queued[1], []).append(row_num)
+                        queued_rows.add(row_num)
+                    elif queued:
+                        print(f"Skipping row {row_num}, an earlier row already creates this {args.model} (update not enabled)")
+                        skipped_count += 1
+                    elif existing_id and update_existing:
+                        print("Updating existing record..............",file=sys.stderr)
+                        # Remove ID and constrained fields from vals to avoid errors
+                        vals = update_vals(args.model, vals)
+
+                        # Queue the update of the existing record
+                        if vals:  # Only update if there are values to update
+                            pending_writes.append((row_num, existing_id, vals))
+                            queued_rows.add(row_num)
+                            if len(pending_writes) >= sizer.size:
+                                flush_writes()
                         else:
-                            print(f"Warning: Cannot update posted account.move {existing_id} without reset_to_draft option")
-                            if getattr(args, 'skip_readonly_fields', False):
-                                # Remove readonly fields for posted moves
-                                readonly_fields = ['partner_id', 'invoice_date', 'date', 'currency_id']
-                                for field in readonly_fields:
-                                    if field in vals:
-                                        print("Removing readonly field  for posted move",field,file=sys.stderr)
-                                        del vals[field]
-                except Exception as e:
-                    print("Warning: Error checking account.move state: ",e ,file=sys.stderr)
-
-            try:
-                # Update or create record
-                if existing_id and update_existing:
-                    print("Updating existing record..............",file=sys.stderr)
-                    # Remove ID from vals if present to avoid errors
-                    if 'id' in vals:
-                        del vals['id']
-
-                    # For product.product, handle special fields
-                    if args.model == 'product.product':
-                        # Remove product_tmpl_id if present to avoid constraint errors
-                        if 'product_tmpl_id' in vals:
-                            del vals['product_tmpl_id']
-
-                        # Remove combination_indices if present
-                        if 'combination_indices' in vals:
-                            del vals['combination_indices']
-
-                    # Update existing record
-                    if vals:  # Only update if there are values to update
-                        result = models.execute_kw(db, uid, pwd, args.model, 'write',
-                                                 [[existing_id], vals])
-                        print(f"Updated {args.model} {existing_id}")
-                        updated_count += 1
+                            print(f"No changes to update for {args.model} {existing_id}")
+                            skipped_count += 1
+                    elif existing_id and not update_existing:
+                        print(f"Skipping existing {args.model} {existing_id} (update not enabled)")
+                        skipped_count += 1
+                    elif not existing_id and create_if_not_exists:
+                        # Queue the new record for a multi-record create
+                        pending_creates.append((row_num, vals))
+                        pending_keys[row_num] = keys
+                        queued_rows.add(row_num)
+                        for key in keys:
+                            run_keys.setdefault(key, ('queued', row_num, vals))
+                        if len(pending_creates) >= sizer.size:
+                            flush_creates()
                     else:
-                        print(f"No changes to update for {args.model} {existing_id}")
+                        print(f"Skipping record in row {row_num} (create not enabled)")
                         skipped_count += 1
-                elif existing_id and not update_existing:
-                    print(f"Skipping existing {args.model} {existing_id} (update not enabled)")
-                    skipped_count += 1
-                elif not existing_id and create_if_not_exists:
-                    print("Creating new record..............",file=sys.stderr)
-                    # Create new record
-                    rid = models.execute_kw(db, uid, pwd, args.model, 'create', [vals])
-                    print(f"Created {args.model} {rid}",    file=sys.stderr)
-                    created_count += 1
-                else:
-                    print(f"Skipping record in row {row_num} (create not enabled)")
-                    skipped_count += 1
-            except Exception as e:
-                print(f"Error processing {args.model} in row {row_num}: {e}", file=sys.stderr)
-                error_count += 1
-
-    print(f"Import summary: {created_count} records created, {updated_count} records updated, {skipped_count} skipped, {error_count} errors",file=sys.stderr)
+                except Exception as e:
+                    print(f"Error processing {args.model} in row {row_num}: {e}", file=sys.stderr)
+                    error_count += 1
+
+            if journal:
+                # Skipped and failed rows are never journaled, so their hashes are not kept
+                for row_num, _ in chunk:
+                    if row_num not in queued_rows:
+                        row_hashes.pop(row_num, None)
+
+    if pending_creates:
+        flush_creates()
+    if pending_writes:
+        flush_writes()
+    if resetter:
+        resetter.repost()
+
+    if journal:
+        journal.close()
+        print(f"Skipped {journaled_count} rows already recorded in the import journal", file=sys.stderr)
+    print(f"Resolved {len(resolver.cache)} distinct relational values with {resolver.rpc_count} lookups", file=sys.stderr)
+    print(f"Import summary: {created_count} records created, {updated_count} records updated, {unchanged_count} unchanged, {skipped_count} skipped, {error_count} errors",file=sys.stderr)
     return {
         "created_count": created_count,
         "updated_count": updated_count,
         "error_count": error_count,
         "skipped_count": skipped_count,
+        "unchanged_count": unchanged_count,
+        "collapsed_count": len(duplicate_rows),
+        "journaled_count": journaled_count,
+        "validation_errors": validation_errors,
     }
 
 def export_rel(args):
@@ -665,13 +1539,254 @@ def export_rel(args):
         print(f"Error exporting related records: {e}")
         return
 
+def find_one2many_field(models, db, uid, pwd, parent_model, child_model, relation_field):
+    """Find the one2many field on the parent model that is the inverse of relation_field."""
+    fields_info = models.execute_kw(db, uid, pwd, parent_model, 'fields_get', [],
+                                    {'attributes': ['type', 'relation', 'relation_field']})
+    for name in sorted(fields_info):
+        info = fields_info[name]
+        if (info.get('type') == 'one2many' and info.get('relation') == child_model
+                and info.get('relation_field') == relation_field):
+            return name
+    return None
+
+def normalize_read_value(val):
+    """Normalize a value returned by read/search_read so it compares with import vals."""
+    if isinstance(val, (list, tuple)) and len(val) == 2 and isinstance(val[0], int) and isinstance(val[1], str):
+        # many2one values are returned as [id, display_name]
+        return val[0]
+    if val is False:
+        return None
+    return val
+
+# Existing lines an imported CSV line may update, per child model. Other lines
+# (taxes, receivable/payable, payment terms) are computed by Odoo and never matched
+IMPORTED_LINE_DOMAINS = {
+    'account.move.line': [('display_type', '=', 'product')],
+}
+
+def read_existing_lines(models, db, uid, pwd, child_model, relation_field, parent_id, unique_fields):
+    """Read the existing child lines of a parent that imported lines can be matched to."""
+    domain = [(relation_field, '=', parent_id)] + IMPORTED_LINE_DOMAINS.get(child_model, [])
+    return models.execute_kw(db, uid, pwd, child_model, 'search_read', [domain],
+                             {'fields': unique_fields or ['id'], 'order': 'id'})
+
+def build_line_commands(child_vals_list, existing_lines, unique_fields):
+    """
+    Build one2many commands for the child values of one parent.
+
+    Lines are matched to existing child records on the unique fields they carry,
+    falling back to their position among the lines that are still unmatched.
+    Matched lines become (1, id, vals) commands, the rest (0, 0, vals).
+    """
+    unmatched = [line['id'] for line in existing_lines]
+    by_id = {line['id']: line for line in existing_lines}
+    commands = []
+    for vals in child_vals_list:
+        keys = [f for f in unique_fields if f in vals]
+        line_id = None
+        if keys:
+            for candidate in unmatched:
+                line = by_id[candidate]
+                if all(normalize_read_value(line.get(f)) == vals[f] for f in keys):
+                    line_id = candidate
+                    break
+        elif unmatched:
+            line_id = unmatched[0]
+        if line_id:
+            unmatched.remove(line_id)
+            commands.append((1, line_id, vals))
+        else:
+            commands.append((0, 0, vals))
+    return commands
+
+def import_rel_one2many(args, models, db, uid, pwd, rows, parent_defaults, child_defaults,
+                        parent_plans, child_plans, parent_required, child_required, resetter=None):
+    """
+    Import flat CSV rows by grouping child rows under their parent key and writing
+    each parent together with its lines in a single create/write call using
+    one2many commands, so Odoo recomputes the parent once instead of once per line.
+
+    Rows are streamed: consecutive rows sharing a parent key form one group. If a
+    key shows up again later in the file, its lines are appended to the parent
+    created or updated earlier in the run. Writes to existing parents are queued per
+    chunk so posted moves can be reset to draft in one call through resetter.
+    """
+    o2m_field = getattr(args, 'one2many_field', None) or find_one2many_field(
+        models, db, uid, pwd, args.parent_model, args.child_model, args.relation_field)
+    if not o2m_field:
+        raise ValueError(f"No one2many field on {args.parent_model} is the inverse of "
+                         f"{args.child_model}.{args.relation_field}")
+    print(f"Using one2many field {args.parent_model}.{o2m_field} for child lines", file=sys.stderr)
+
+    parent_csv_field = next(iter(args.parent_field_mapping))
+    unique_fields = get_unique_fields(models, db, uid, pwd, args.parent_model)
+    unique_fields_child = get_unique_fields(models, db, uid, pwd, args.child_model)
+
+    summary = {
+        "parent_created": 0,
+        "parent_failed": 0,
+        "parent_updated": 0,
+        "child_created": 0,
+        "child_failed": 0,
+        "child_updated": 0,
+        "validation_errors": [],
+    }
+    parent_ids = {}
+    pending_writes = []
+    counter = 1
+
+    def child_vals_for(group_rows):
+        child_vals_list = []
+        for r in group_rows:
+            cvals = {**child_defaults, **convert_row(child_plans, r, models, db, uid, pwd)}
+            cvals.pop(args.relation_field, None)
+            if not cvals:
+                continue
+            missing = [f for f in child_required if f not in cvals and f != args.relation_field]
+            if missing and not getattr(args, 'force', False):
+                print(f"Skipping child record due to missing fields: {missing}", file=sys.stderr)
+                summary["child_failed"] += 1
+                continue
+            child_vals_list.append(cvals)
+        return child_vals_list
+
+    def process_group(key, group_rows):
+        nonlocal counter
+        if key in parent_ids:
+            # Key seen earlier in the file: append its lines to the same parent
+            pid = parent_ids[key]
+            child_vals_list = child_vals_for(group_rows)
+            if not pid or not child_vals_list:
+                return
+            pending_writes.append((key, pid, {o2m_field: [(0, 0, cvals) for cvals in child_vals_list]}, False))
+            return
+
+        vals = {**parent_defaults, **convert_row(parent_plans, group_rows[0], models, db, uid, pwd)}
+
+        if getattr(args, 'name_prefix', None):
+            vals[args.parent_field_mapping[parent_csv_field]] = f"{args.name_prefix}-{counter:03d}"
+            counter += 1
+
+        missing = [f for f in parent_required if f not in vals]
+        if missing and not getattr(args, 'force', False):
+            print(f"Skipping parent record due to missing fields: {missing}", file=sys.stderr)
+            summary["parent_failed"] += 1
+            parent_ids[key] = None
+            return
+
+        child_vals_list = child_vals_for(group_rows)
+
+        existing_pid = find_existing_record(
+            models, db, uid, pwd, args.parent_model, vals,
+            vals, match_field='id', unique_fields=unique_fields
+        )
+
+        if existing_pid:
+            if not getattr(args, 'update_if_exists', False):
+                print(f"Skipped existing parent {args.parent_model} ID: {existing_pid} (update not enabled)", file=sys.stderr)
+                parent_ids[key] = None
+                return
+            try:
+                existing_lines = read_existing_lines(models, db, uid, pwd, args.child_model, args.relation_field,
+                                                     existing_pid, unique_fields_child)
+                commands = build_line_commands(child_vals_list, existing_lines, unique_fields_child)
+                if commands:
+                    vals[o2m_field] = commands
+                parent_ids[key] = existing_pid
+                pending_writes.append((key, existing_pid, vals, True))
+            except Exception as e:
+                print(f"Error reading lines of parent {args.parent_model} {existing_pid}: {e}", file=sys.stderr)
+                parent_ids[key] = None
+                summary["parent_failed"] += 1
+                summary["child_failed"] += len(child_vals_list)
+                summary["validation_errors"].append({"model": args.parent_model, "error": str(e), "record": {"key": key}})
+        elif getattr(args, 'create_if_not_exists', True):
+            if child_vals_list:
+                vals[o2m_field] = [(0, 0, cvals) for cvals in child_vals_list]
+            try:
+                pid = models.execute_kw(db, uid, pwd, args.parent_model, 'create', [vals])
+                print(f"Created parent {args.parent_model} ID: {pid} with {len(child_vals_list)} lines", file=sys.stderr)
+                parent_ids[key] = pid
+                summary["parent_created"] += 1
+                summary["child_created"] += len(child_vals_list)
+            except Exception as e:
+                print(f"Error creating parent {args.parent_model}: {e}", file=sys.stderr)
+                parent_ids[key] = None
+                summary["parent_failed"] += 1
+                summary["child_failed"] += len(child_vals_list)
+                summary["validation_errors"].append({"model": args.parent_model, "error": str(e), "record": {"key": key}})
+        else:
+            print(f"Skipping parent {args.parent_model} for key {key} (create not enabled)", file=sys.stderr)
+            parent_ids[key] = None
+
+    def write_pending():
+        if resetter:
+            resetter.prepare([pid for _, pid, _, _ in pending_writes])
+        for key, pid, vals, is_update in pending_writes:
+            commands = vals.get(o2m_field, [])
+            try:
+                models.execute_kw(db, uid, pwd, args.parent_model, 'write', [[pid], vals])
+                if is_update:
+                    print(f"Updated existing parent {args.parent_model} ID: {pid} with {len(commands)} lines", file=sys.stderr)
+                    summary["parent_updated"] += 1
+                summary["child_updated"] += sum(1 for c in commands if c[0] == 1)
+                summary["child_created"] += sum(1 for c in commands if c[0] == 0)
+            except Exception as e:
+                if is_update:
+                    print(f"Error updating parent {args.parent_model}: {e}", file=sys.stderr)
+                    parent_ids[key] = None
+                    summary["parent_failed"] += 1
+                else:
+                    print(f"Error adding lines to parent {args.parent_model} {pid}: {e}", file=sys.stderr)
+                summary["child_failed"] += len(commands)
+                summary["validation_errors"].append({
+                    "model": args.parent_model if is_update else args.child_model,
+                    "error": str(e), "record": {"key": key}})
+        pending_writes.clear()
+
+    def flush_groups(buffered):
+        chunk = [r for _, group_rows in buffered for r in group_rows]
+        prime_relations(parent_plans, chunk)
+        prime_relations(child_plans, chunk)
+        for key, group_rows in buffered:
+            process_group(key, group_rows)
+        if pending_writes:
+            write_pending()
+
+    # Buffer whole groups until a chunk worth of rows is reached, then resolve their
+    # relational names in bulk and write them
+    buffered, buffered_rows = [], 0
+    for key, group in itertools.groupby(rows, key=lambda r: r.get(parent_csv_field)):
+        if not key:
+            continue
+        group_rows = list(group)
+        buffered.append((key, group_rows))
+        buffered_rows += len(group_rows)
+        if buffered_rows >= CONVERT_CHUNK_SIZE:
+            flush_groups(buffered)
+            buffered, buffered_rows = [], 0
+    if buffered:
+        flush_groups(buffered)
+
+    print(f"\n=== Import Summary ===", file=sys.stderr)
+    print(f"Parent: {summary['parent_created']} created, {summary['parent_updated']} updated, {summary['parent_failed']} errors", file=sys.stderr)
+    print(f"Child: {summary['child_created']} created, {summary['child_updated']} updated, {summary['child_failed']} errors", file=sys.stderr)
+    return summary
+
 def import_rel(args):
-    """Import flat CSV to parent and child models using grouping on first parent field."""
+    """
+    Import flat CSV to parent and child models using grouping on first parent field.
+
+    The CSV is streamed in a single pass, one chunk at a time: only the
+    parent-key-to-id map is kept across chunks. Every parent first seen in a
+    chunk is created or written before the chunk's children, so child rows whose
+    parent is still queued wait in the chunk until that batch has been created.
+    """
     models, db, uid, pwd = connect()
-    # read CSV
+    # Sample the CSV to compile the column plans; the rows themselves are streamed below
     with open(args.input, newline='') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+        sample_rows = list(itertools.islice(csv.DictReader(f), PLAN_SAMPLE_SIZE))
 
     # Parse default values if provided
     parent_defaults = {}
@@ -715,10 +1830,33 @@ def import_rel(args):
     child_required = [f['name'] for f in child_meta if f.get('required')]
    
     # Handle reset to draft for account.move
-    if args.reset_to_draft and args.parent_model == 'account.move':
-        print("Note: Will reset account.move records to draft before updating")
+    resetter = None
+    if args.parent_model == 'account.move' and getattr(args, 'update_if_exists', False):
+        if getattr(args, 'reset_to_draft', False):
+            print("Note: Will reset account.move records to draft before updating")
+        resetter = DraftResetter(models, db, uid, pwd, reset_to_draft=getattr(args, 'reset_to_draft', False))
+
+    # Compile one converter per mapped column; relational names are resolved in bulk and memoized
+    resolver = RelationResolver(models, db, uid, pwd, cache=getattr(args, 'id_map', None))
+    parent_plans = compile_parse_plans(args.parent_field_mapping, parent_fields, selection_fields_parent, sample_rows, resolver)
+    child_plans = compile_parse_plans(args.child_field_mapping, child_fields, selection_fields_child, sample_rows, resolver)
+
+    if getattr(args, 'use_one2many', False):
+        with open(args.input, newline='') as f:
+            summary = import_rel_one2many(args, models, db, uid, pwd, csv.DictReader(f), parent_defaults, child_defaults,
+                                          parent_plans, child_plans, parent_required, child_required, resetter)
+        if resetter:
+            resetter.repost()
+        return summary
+
+    # Get first CSV column name (e.g., 'parent_name'); its value groups rows by parent
+    parent_csv_field = next(iter(args.parent_field_mapping))
+    parent_odoo_field = args.parent_field_mapping[parent_csv_field]
+    unique_fields = get_unique_fields(models, db, uid, pwd, args.parent_model)
+    unique_fields_child = get_unique_fields(models, db, uid, pwd, args.child_model)
 
     parent_ids = {}
+    failed_keys = set()
     counter = 1
     parent_create = 0
     parent_update = 0
@@ -726,36 +1864,76 @@ def import_rel(args):
     child_create = 0
     child_update = 0
     child_error = 0
-    
-    # Create parent records
-    for r in rows:
-         # Get first CSV column name (e.g., 'parent_name') and its Odoo field (e.g., 'name')
-        csv_field = next(iter(args.parent_field_mapping))   # CSV field name
-        odoo_field = args.parent_field_mapping[csv_field]   # Odoo field name
-        key = r.get(csv_field)
-        if not key or key in parent_ids:
-            continue
-
-        vals = {**parent_defaults}
-        for csv_field, odoo_field in args.parent_field_mapping.items():
-            val = process_field(r.get(csv_field), odoo_field, parent_fields, selection_fields_parent, models, db, uid, pwd)
-            if val is not None:
-                vals[odoo_field] = val
+    validation_errors = []
+
+    # Parent creates, child creates and child writes are queued and sent in batches
+    parent_sizer = AdaptiveBatchSizer(size=getattr(args, 'batch_size', None) or 100)
+    child_sizer = AdaptiveBatchSizer(size=getattr(args, 'batch_size', None) or 100)
+    pending_parents = []
+    pending_keys = set()
+    pending_parent_writes = []
+    pending_children = []
+    pending_child_writes = []
+
+    def flush_parents():
+        nonlocal parent_create, parent_error
+        created, failed = create_batch(models, db, uid, pwd, args.parent_model, pending_parents, validation_errors, parent_sizer)
+        for key, pid in created:
+            parent_ids[key] = pid
+        failed_keys.update(key for key, _ in pending_parents if key not in parent_ids)
+        vals_by_key = dict(pending_parents)
+        resolver.register(args.parent_model, ((vals_by_key[key], pid) for key, pid in created))
+        print(f"Created {len(created)} parent {args.parent_model} records ({failed} failed)", file=sys.stderr)
+        parent_create += len(created)
+        parent_error += failed
+        pending_parents.clear()
+        pending_keys.clear()
+
+    def flush_parent_writes():
+        nonlocal parent_update, parent_error
+        if resetter:
+            resetter.prepare([pid for _, pid, _ in pending_parent_writes])
+        written, failed = write_batch(models, db, uid, pwd, args.parent_model, pending_parent_writes, validation_errors, parent_sizer)
+        written_keys = {key for key, _ in written}
+        for key, pid, _ in pending_parent_writes:
+            if key in written_keys:
+                print(f"Updated existing parent {args.parent_model} ID: {pid}", file=sys.stderr)
+            else:
+                parent_ids.pop(key, None)
+                failed_keys.add(key)
+        parent_update += len(written)
+        parent_error += failed
+        pending_parent_writes.clear()
+
+    def flush_children():
+        nonlocal child_create, child_update, child_error
+        if pending_children:
+            created, failed = create_batch(models, db, uid, pwd, args.child_model, pending_children, validation_errors, child_sizer)
+            print(f"Created {len(created)} child {args.child_model} records ({failed} failed)", file=sys.stderr)
+            child_create += len(created)
+            child_error += failed
+            pending_children.clear()
+        if pending_child_writes:
+            written, failed = write_batch(models, db, uid, pwd, args.child_model, pending_child_writes, validation_errors, child_sizer)
+            print(f"Updated {len(written)} child {args.child_model} records ({failed} failed)", file=sys.stderr)
+            child_update += len(written)
+            child_error += failed
+            pending_child_writes.clear()
+
+    def process_parent(key, r):
+        nonlocal counter, parent_update, parent_error
+        vals = {**parent_defaults, **convert_row(parent_plans, r, models, db, uid, pwd)}
 
         if getattr(args, 'name_prefix', None):
-            # vals[args.parent_field_mapping[0]] = f"{args.name_prefix}-{counter:03d}"
-            first_csv_field = next(iter(args.parent_field_mapping))
-            odoo_field = args.parent_field_mapping[first_csv_field]
-            vals[odoo_field] = f"{args.name_prefix}-{counter:03d}"
-
+            vals[parent_odoo_field] = f"{args.name_prefix}-{counter:03d}"
             counter += 1
 
         missing = [f for f in parent_required if f not in vals]
         if missing and not getattr(args, 'force', False):
             print(f"Skipping parent record due to missing fields: {missing}", file=sys.stderr)
             parent_error += 1
-            continue
-        unique_fields=get_unique_fields(models, db, uid, pwd, args.parent_model)
+            failed_keys.add(key)
+            return
         existing_pid = find_existing_record(
             models, db, uid, pwd, args.parent_model,vals,
             vals, match_field='id', unique_fields=unique_fields
@@ -763,55 +1941,30 @@ def import_rel(args):
 
         if existing_pid:
             if getattr(args, 'update_if_exists', False):
-                try:
-                    models.execute_kw(db, uid, pwd, args.parent_model, 'write', [[existing_pid], vals])
-                    print(f"Updated existing parent {args.parent_model} ID: {existing_pid}", file=sys.stderr)
-                    parent_ids[key] = existing_pid
-                    parent_update += 1
-                except Exception as e:
-                    print(f"Error updating parent {args.parent_model}: {e}", file=sys.stderr)
-                    parent_error += 1
+                # Written once the whole chunk's parents are known, before any of their children
+                pending_parent_writes.append((key, existing_pid, vals))
+                parent_ids[key] = existing_pid
             else:
                 print(f"Skipped existing parent {args.parent_model} ID: {existing_pid} (update not enabled)", file=sys.stderr)
                 parent_ids[key] = existing_pid
         else:
             if getattr(args, 'create_if_not_exists', True):
-                try:
-                    pid = models.execute_kw(db, uid, pwd, args.parent_model, 'create', [vals])
-                    parent_ids[key] = pid
-                    print(f"Created parent {args.parent_model} ID: {pid}", file=sys.stderr)
-                    parent_create += 1
-                except Exception as e:
-                    print(f"Error creating parent {args.parent_model}: {e}", file=sys.stderr)
-                    parent_error += 1
+                pending_parents.append((key, vals))
+                pending_keys.add(key)
             else:
-                print(f"Skipping parent {args.parent_model} ID: {existing_pid} (create not enabled)", file=sys.stderr)
+                print(f"Skipping parent {args.parent_model} for key {key} (create not enabled)", file=sys.stderr)
                 parent_ids[key] = None
 
-
-    # Create child records
-    for r in rows:
-        parent_csv_field = next(iter(args.parent_field_mapping))
-        odoo_field = args.parent_field_mapping[parent_csv_field]
-        parent_key = r.get(parent_csv_field)
-        pid = parent_ids.get(parent_key)
-
-        if not pid:
-            continue
-
-        vals = {args.relation_field: pid, **child_defaults}
-        for csv_field, odoo_field in args.child_field_mapping.items():
-            val = process_field(r.get(csv_field), odoo_field, child_fields, selection_fields_child, models, db, uid, pwd)
-            if val is not None:
-                vals[odoo_field] = val
+    def process_child(parent_key, pid, r):
+        nonlocal child_error
+        vals = {args.relation_field: pid, **child_defaults, **convert_row(child_plans, r, models, db, uid, pwd)}
 
         missing = [f for f in child_required if f not in vals]
         if missing and not getattr(args, 'force', False):
             print(f"Skipping child record due to missing fields: {missing}", file=sys.stderr)
             child_error += 1
-            continue
-        
-        unique_fields_child = get_unique_fields(models, db, uid, pwd, args.child_model)
+            return
+
         domain = [(args.relation_field, '=', pid)]
         for field in unique_fields_child:
             if field in vals:
@@ -820,27 +1973,56 @@ def import_rel(args):
         existing_cid = models.execute_kw(db, uid, pwd, args.child_model, 'search', [domain], {'limit': 1})
         if existing_cid:
             if getattr(args, 'update_if_exists', False):
-                try:
-                    models.execute_kw(db, uid, pwd, args.child_model, 'write', [[existing_cid[0]], vals])
-                    print(f"Updated child {args.child_model} ID: {existing_cid[0]}", file=sys.stderr)
-                    child_update += 1
-                except Exception as e:
-                    print(f"Error updating child {args.child_model}: {e}", file=sys.stderr)
-                    child_error += 1
+                pending_child_writes.append((parent_key, existing_cid[0], vals))
             else:
                 print(f"Skipped existing child {args.child_model} ID: {existing_cid[0]} (update not enabled)", file=sys.stderr)
         else:
             if getattr(args, 'create_if_not_exists', True):
-                try:
-                    cid = models.execute_kw(db, uid, pwd, args.child_model, 'create', [vals])
-                    print(f"Created child {args.child_model} ID: {cid}", file=sys.stderr)
-                    child_create += 1
-                except Exception as e:
-                    print(f"Error creating child {args.child_model}: {e}", file=sys.stderr)
-                    child_error += 1
+                pending_children.append((parent_key, vals))
             else:
-                print(f"Skipping child {args.child_model} ID: {existing_cid[0]} (create not enabled)", file=sys.stderr)
-            
+                print(f"Skipping child {args.child_model} for parent {pid} (create not enabled)", file=sys.stderr)
+
+        if len(pending_children) + len(pending_child_writes) >= child_sizer.size:
+            flush_children()
+
+    with open(args.input, newline='') as f:
+        reader = csv.DictReader(f)
+        for chunk in iter_chunks(reader, CONVERT_CHUNK_SIZE):
+            prime_relations(parent_plans, chunk)
+            prime_relations(child_plans, chunk)
+            # First pass: match, queue and write the parents first seen in this chunk
+            for r in chunk:
+                key = r.get(parent_csv_field)
+                if not key or key in failed_keys:
+                    continue
+                if key not in parent_ids and key not in pending_keys:
+                    process_parent(key, r)
+                    if len(pending_parents) >= parent_sizer.size:
+                        flush_parents()
+            if pending_parent_writes:
+                flush_parent_writes()
+
+            # Second pass: children; those whose parent is not created yet wait for the last parent batch
+            waiting = []
+            for r in chunk:
+                key = r.get(parent_csv_field)
+                if not key or key in failed_keys:
+                    continue
+                if key in pending_keys:
+                    waiting.append(r)
+                elif parent_ids.get(key):
+                    process_child(key, parent_ids[key], r)
+
+            if pending_parents:
+                flush_parents()
+            for r in waiting:
+                key = r.get(parent_csv_field)
+                if parent_ids.get(key):
+                    process_child(key, parent_ids[key], r)
+
+    flush_children()
+    if resetter:
+        resetter.repost()
 
     print(f"\n=== Import Summary ===", file=sys.stderr)
     print(f"Parent: {parent_create} created, {parent_update} updated, {parent_error} errors", file=sys.stderr)
@@ -854,10 +2036,183 @@ def import_rel(args):
         "child_created": child_create,
         "child_failed": child_error,
         "child_updated": child_update,
-        "validation_errors": [],  # collect errors if needed
+        "validation_errors": validation_errors,
     }
 
 
+MANIFEST_NAME = 'import_manifest.json'
+
+def load_import_specs(directory, manifest=None):
+    """
+    Load the file specs of a dataset directory.
+
+    The manifest (import_manifest.json in the directory by default) holds a "files"
+    list. Each entry names a "file" and either a "model" with an optional
+    "field_mapping", or "parent_model", "child_model" and "relation_field" with
+    "parent_field_mapping" and "child_field_mapping" for import_rel. Without a
+    manifest, every CSV is imported into the model named after the file
+    (res_partner.csv -> res.partner).
+    """
+    manifest = manifest or os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            specs = json.load(f).get('files', [])
+    else:
+        specs = [{'file': name, 'model': os.path.splitext(name)[0].replace('_', '.')}
+                 for name in sorted(os.listdir(directory)) if name.lower().endswith('.csv')]
+    for spec in specs:
+        spec['path'] = os.path.join(directory, spec['file'])
+    return specs
+
+def complete_spec_mappings(models, db, uid, pwd, spec, meta_cache):
+    """Fill in missing field mappings with the CSV columns named like stored fields."""
+    def meta(model):
+        if model not in meta_cache:
+            meta_cache[model] = {f['name']: f for f in fetch_fields(models, db, uid, pwd, model)[0]}
+        return meta_cache[model]
+
+    with open(spec['path'], newline='') as f:
+        headers = next(csv.reader(f), [])
+    if spec.get('model'):
+        if not spec.get('field_mapping'):
+            spec['field_mapping'] = {h: h for h in headers if h in meta(spec['model'])}
+    else:
+        for side in ('parent', 'child'):
+            if not spec.get(f'{side}_field_mapping'):
+                raise ValueError(f"{spec['file']}: {side}_field_mapping is required for related imports")
+
+def spec_models(spec):
+    """Models written by a file spec."""
+    return {spec['model']} if spec.get('model') else {spec['parent_model'], spec['child_model']}
+
+def spec_dependencies(spec, meta_cache):
+    """Models referenced through the many2one/many2many fields a file spec maps."""
+    if spec.get('model'):
+        mapped = [(spec['model'], spec['field_mapping'])]
+    else:
+        mapped = [(spec['parent_model'], spec['parent_field_mapping']),
+                  (spec['child_model'], spec['child_field_mapping'])]
+    deps = set()
+    for model, mapping in mapped:
+        fields = meta_cache.get(model, {})
+        for odoo_field in mapping.values():
+            fmeta = fields.get(odoo_field)
+            if fmeta and fmeta['ttype'] in ('many2one', 'many2many') and fmeta.get('relation'):
+                deps.add(fmeta['relation'])
+    return deps - spec_models(spec)
+
+def plan_import_levels(specs, dependencies):
+    """
+    Topologically sort file specs into levels.
+
+    A file depends on the files writing a model it references; files in the same
+    level do not depend on each other and can be imported in parallel. Files left
+    in a dependency cycle are put together in a final level.
+    """
+    writers = {}
+    for index, spec in enumerate(specs):
+        for model in spec_models(spec):
+            writers.setdefault(model, set()).add(index)
+    requires = {index: {w for model in dependencies[index] for w in writers.get(model, ())} - {index}
+                for index in range(len(specs))}
+
+    levels, done = [], set()
+    while len(done) < len(specs):
+        level = [index for index in range(len(specs)) if index not in done and requires[index] <= done]
+        if not level:
+            cycle = [index for index in range(len(specs)) if index not in done]
+            print(f"Warning: Dependency cycle between {', '.join(specs[i]['file'] for i in cycle)}; "
+                  f"importing them together last", file=sys.stderr)
+            level = cycle
+        levels.append(level)
+        done.update(level)
+    return [[specs[index] for index in level] for level in levels]
+
+def spec_args(spec, args, id_map):
+    """Build the argument namespace of import_model/import_rel for a file spec."""
+    class SpecArgs:
+        pass
+    a = SpecArgs()
+    a.input = spec['path']
+    a.force = spec.get('force', getattr(args, 'force', False))
+    a.create_if_not_exists = spec.get('create_if_not_exists', True)
+    a.batch_size = getattr(args, 'batch_size', None) or 100
+    a.name_prefix = None
+    a.reset_to_draft = spec.get('reset_to_draft', False)
+    a.skip_readonly_fields = spec.get('skip_readonly_fields', False)
+    a.id_map = id_map
+    if spec.get('model'):
+        a.model = spec['model']
+        a.field_mapping = spec['field_mapping']
+        a.defaults = repr(spec['defaults']) if spec.get('defaults') else None
+        a.update = spec.get('update', getattr(args, 'update', False))
+        a.match_field = spec.get('match_field', 'id')
+        a.dedupe = spec.get('dedupe')
+    else:
+        a.parent_model = spec['parent_model']
+        a.child_model = spec['child_model']
+        a.relation_field = spec['relation_field']
+        a.parent_field_mapping = spec['parent_field_mapping']
+        a.child_field_mapping = spec['child_field_mapping']
+        a.parent_defaults = repr(spec['parent_defaults']) if spec.get('parent_defaults') else None
+        a.child_defaults = repr(spec['child_defaults']) if spec.get('child_defaults') else None
+        a.update_if_exists = spec.get('update', getattr(args, 'update', False))
+        a.use_one2many = spec.get('use_one2many', False)
+        a.one2many_field = spec.get('one2many_field')
+    return a
+
+def import_dir(args):
+    """
+    Import a directory of CSV files in dependency order.
+
+    Files are ordered by the many2one/many2many relations of their mapped fields:
+    each level is imported in parallel with import_model/import_rel, and the ids
+    created or resolved by a level are shared with the following ones, so their
+    references resolve without further lookups.
+    """
+    models, db, uid, pwd = connect()
+    specs = load_import_specs(args.directory, getattr(args, 'manifest', None))
+    if not specs:
+        print(f"No CSV files to import in {args.directory}", file=sys.stderr)
+        return {}
+
+    meta_cache = {}
+    for spec in specs:
+        complete_spec_mappings(models, db, uid, pwd, spec, meta_cache)
+        for model in spec_models(spec):
+            if model not in meta_cache:
+                meta_cache[model] = {f['name']: f for f in fetch_fields(models, db, uid, pwd, model)[0]}
+    levels = plan_import_levels(specs, [spec_dependencies(spec, meta_cache) for spec in specs])
+    for number, level in enumerate(levels, start=1):
+        print(f"Level {number}: {', '.join(spec['file'] for spec in level)}", file=sys.stderr)
+    if getattr(args, 'plan_only', False):
+        return {"levels": [[spec['file'] for spec in level] for level in levels], "results": {}}
+
+    id_map = {}
+    results = {}
+    workers = getattr(args, 'workers', None) or 4
+
+    def run(spec):
+        a = spec_args(spec, args, id_map)
+        return import_model(a) if spec.get('model') else import_rel(a)
+
+    for number, level in enumerate(levels, start=1):
+        with ThreadPoolExecutor(max_workers=min(workers, len(level))) as executor:
+            futures = {spec['file']: executor.submit(run, spec) for spec in level}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result() or {}
+                except Exception as e:
+                    print(f"Error importing {name}: {e}", file=sys.stderr)
+                    results[name] = {"error": str(e)}
+        print(f"Finished level {number} ({len(id_map)} ids known)", file=sys.stderr)
+
+    print(f"\n=== Directory Import Summary ===", file=sys.stderr)
+    for name, summary in results.items():
+        counts = {k: v for k, v in summary.items() if k != 'validation_errors'}
+        print(f"{name}: {counts}", file=sys.stderr)
+    return {"levels": [[spec['file'] for spec in level] for level in levels], "results": results}
+
 def model_info(args):
     """Display information about a model and its fields."""
     models, db, uid, pwd = connect()
@@ -961,6 +2316,12 @@ def main():
                     help='Reset records to draft before updating (for account.move)')
     im.add_argument('--skip-readonly-fields', action='store_true', 
                     help='Skip readonly fields for posted records')
+    im.add_argument('--batch-size', type=int, default=100,
+                    help='Initial number of records per create/write call; adapts to failures and latency (default: 100)')
+    im.add_argument('--dedupe', choices=['first', 'last'],
+                    help='Collapse CSV rows matching the same record, keeping the first or last occurrence')
+    im.add_argument('--journal', help='SQLite journal file making the import resumable; rows already imported are skipped')
+    im.add_argument('--xmlid-module', help='Module prefix for external ids created for imported records (requires --journal)')
 
     # Export related models command
     rel_ex = sub.add_parser('export-rel', help='Export parent and child model relation to a flat CSV')
@@ -986,6 +2347,21 @@ def main():
     rel_im.add_argument('--force', action='store_true', help='Force import even if required fields are missing')
     rel_im.add_argument('--reset-to-draft', action='store_true', help='Reset records to draft before updating (for account.move)')
     rel_im.add_argument('--skip-readonly-fields', action='store_true', help='Skip readonly fields for posted records')
+    rel_im.add_argument('--batch-size', type=int, default=100,
+                        help='Initial number of records per create/write call; adapts to failures and latency (default: 100)')
+    rel_im.add_argument('--use-one2many', action='store_true',
+                        help='Create/update each parent and its lines in one call using one2many commands')
+    rel_im.add_argument('--one2many-field', help='One2many field on the parent holding the lines (default: auto-detect)')
+
+    # Import a directory of CSV files in dependency order
+    dir_im = sub.add_parser('import-dir', help='Import a directory of CSV files ordered by their many2one dependencies')
+    dir_im.add_argument('--directory', required=True, help='Directory holding the CSV files')
+    dir_im.add_argument('--manifest', help=f'JSON manifest with file/model mappings (default: <directory>/{MANIFEST_NAME})')
+    dir_im.add_argument('--workers', type=int, default=4, help='Files imported in parallel within a level (default: 4)')
+    dir_im.add_argument('--update', action='store_true', help='Update existing records')
+    dir_im.add_argument('--force', action='store_true', help='Force import even if required fields are missing')
+    dir_im.add_argument('--batch-size', type=int, default=100, help='Initial number of records per create/write call (default: 100)')
+    dir_im.add_argument('--plan-only', action='store_true', help='Only print the import levels')
 
     # Info command to get model information
     info = sub.add_parser('info', help='Get information about a model')
@@ -999,6 +2375,7 @@ def main():
     elif args.command == 'import': import_model(args)
     elif args.command == 'export-rel': export_rel(args)
     elif args.command == 'import-rel': import_rel(args)
+    elif args.command == 'import-dir': import_dir(args)
     elif args.command == 'info': model_info(args)
     else: p.print_help()
 
@@ -13,13 +13,15 @@ from typing import Dict, List, Any, Tuple, Optional
 from langchain.schema import HumanMessage, AIMessage
 
 from src.agents.export_import.state import AgentState
-from src.agents.export_import.utils.csv_handler import import_from_csv, apply_field_mapping
+from src.agents.export_import.utils.csv_handler import iter_csv_records, apply_field_mapping
 from src.agents.export_import.utils.field_mapper import (
     suggest_field_mapping,
     validate_field_mapping,
     get_field_type_compatibility,
     convert_value_for_odoo
 )
+from src.agents.export_import.utils.bulk_importer import BulkImporter, get_model_fields
+from src.agents.export_import.utils.csv_validator import validate_csv_file, format_validation_summary
 
 logger = logging.getLogger(__name__)
 
@@ -192,11 +194,9 @@ def map_fields(state: AgentState, message: Optional[str] = None) -> AgentState:
         models = xmlrpc.client.ServerProxy(f"{state.odoo_url}/xmlrpc/2/object")
 
         # Get model fields
-        odoo_fields = models.execute_kw(
-            state.odoo_db, uid, state.odoo_password,
-            state.import_state.model_name, 'fields_get',
-            [],
-            {'attributes': ['string', 'help', 'type', 'required']}
+        odoo_fields = get_model_fields(
+            models, state.odoo_url, state.odoo_db, uid, state.odoo_password,
+            state.import_state.model_name
         )
 
         # Get CSV fields
@@ -254,7 +254,7 @@ def map_fields(state: AgentState, message: Optional[str] = None) -> AgentState:
                         # Stay on the same step to try again
 
         # If no mapping is provided, suggest one
-        suggested_mapping = suggest_field_mapping(csv_fields, odoo_fields)
+        suggested_mapping = suggest_field_mapping(csv_fields, odoo_fields, state.import_state.model_name)
 
         if suggested_mapping:
             state.import_state.field_mapping = suggested_mapping
@@ -303,11 +303,9 @@ def validate_mapping(state: AgentState, message: Optional[str] = None) -> AgentS
                 models = xmlrpc.client.ServerProxy(f"{state.odoo_url}/xmlrpc/2/object")
 
                 # Get model fields
-                odoo_fields = models.execute_kw(
-                    state.odoo_db, uid, state.odoo_password,
-                    state.import_state.model_name, 'fields_get',
-                    [],
-                    {'attributes': ['string', 'help', 'type', 'required']}
+                odoo_fields = get_model_fields(
+                    models, state.odoo_url, state.odoo_db, uid, state.odoo_password,
+                    state.import_state.model_name
                 )
 
                 # Get CSV fields
@@ -315,7 +313,7 @@ def validate_mapping(state: AgentState, message: Optional[str] = None) -> AgentS
                 csv_fields = get_csv_fields(state.import_state.import_path)
 
                 # Suggest field mapping
-                suggested_mapping = suggest_field_mapping(csv_fields, odoo_fields)
+                suggested_mapping = suggest_field_mapping(csv_fields, odoo_fields, state.import_state.model_name)
 
                 if suggested_mapping:
                     state.import_state.field_mapping = suggested_mapping
@@ -345,11 +343,9 @@ def validate_mapping(state: AgentState, message: Optional[str] = None) -> AgentS
         models = xmlrpc.client.ServerProxy(f"{state.odoo_url}/xmlrpc/2/object")
 
         # Get model fields
-        odoo_fields = models.execute_kw(
-            state.odoo_db, uid, state.odoo_password,
-            state.import_state.model_name, 'fields_get',
-            [],
-            {'attributes': ['string', 'help', 'type', 'required']}
+        odoo_fields = get_model_fields(
+            models, state.odoo_url, state.odoo_db, uid, state.odoo_password,
+            state.import_state.model_name
         )
 
         # Validate mapping
@@ -362,7 +358,7 @@ def validate_mapping(state: AgentState, message: Optional[str] = None) -> AgentS
 
         # Get sample records from CSV
         from src.agents.export_import.utils.csv_handler import import_from_csv
-        csv_records = import_from_csv(state.import_state.import_path)[:5]  # Get first 5 records
+        csv_records = import_from_csv(state.import_state.import_path, limit=5)  # Get first 5 records
 
         # Check field type compatibility
         compatibility = get_field_type_compatibility(
@@ -399,9 +395,25 @@ def validate_mapping(state: AgentState, message: Optional[str] = None) -> AgentS
                 else:
                     state.import_state.update_if_exists = True
 
-        # Load all records from CSV
-        state.import_state.records_to_import = import_from_csv(state.import_state.import_path)
-        state.import_state.total_records = len(state.import_state.records_to_import)
+        # Validate every row of the file before anything is sent to Odoo
+        validation = validate_csv_file(
+            state.import_state.import_path,
+            odoo_fields,
+            state.import_state.field_mapping,
+            check_required=state.import_state.create_if_not_exists
+        )
+        if not validation['valid']:
+            summary = format_validation_summary(validation)
+            state.import_state.validation_errors = [{'error': line} for line in summary]
+            state.import_state.error = (
+                f"CSV validation failed with {validation['error_count']} errors: {'; '.join(summary)}"
+            )
+            state.current_step = "error"
+            return state
+
+        # The rows are streamed from the file by execute_import instead of being loaded here
+        state.import_state.total_records = validation['total_rows']
+        state.import_state.status = "validated"
 
         # Move to next step
         state.current_step = "execute_import"
@@ -438,7 +450,7 @@ def execute_import(state: AgentState, message: Optional[str] = None) -> AgentSta
         state.current_step = "map_fields"
         return state
 
-    if not state.import_state.records_to_import:
+    if state.import_state.status != "validated" and not state.import_state.records_to_import:
         state.current_step = "validate_mapping"
         return state
 
@@ -455,133 +467,42 @@ def execute_import(state: AgentState, message: Optional[str] = None) -> AgentSta
         models = xmlrpc.client.ServerProxy(f"{state.odoo_url}/xmlrpc/2/object")
 
         # Get model fields
-        odoo_fields = models.execute_kw(
-            state.odoo_db, uid, state.odoo_password,
-            state.import_state.model_name, 'fields_get',
-            [],
-            {'attributes': ['string', 'help', 'type', 'required']}
+        odoo_fields = get_model_fields(
+            models, state.odoo_url, state.odoo_db, uid, state.odoo_password,
+            state.import_state.model_name
         )
 
-        # Apply field mapping to records
-        mapped_records = []
-
-        for record in state.import_state.records_to_import:
-            mapped_record = {}
-
-            for csv_field, odoo_field in state.import_state.field_mapping.items():
-                if csv_field in record and odoo_field in odoo_fields:
-                    # Convert value to appropriate type for Odoo
-                    value = record[csv_field]
-                    odoo_field_type = odoo_fields[odoo_field]['type']
-
-                    converted_value = convert_value_for_odoo(value, odoo_field_type)
-                    mapped_record[odoo_field] = converted_value
-
-            mapped_records.append(mapped_record)
-
-        # Process records
-        created_count = 0
-        updated_count = 0
-        failed_count = 0
-        validation_errors = []
-
-        for record in mapped_records:
-            try:
-                # Check if record exists (if it has an ID or a unique field)
-                record_id = None
-
-                if 'id' in record and record['id']:
-                    # Check if record with this ID exists
-                    record_exists = models.execute_kw(
-                        state.odoo_db, uid, state.odoo_password,
-                        state.import_state.model_name, 'search',
-                        [[('id', '=', record['id'])]]
-                    )
-
-                    if record_exists:
-                        record_id = record['id']
-                        # Remove ID from record to avoid error
-                        record_data = {k: v for k, v in record.items() if k != 'id'}
-                    else:
-                        record_id = None
-                        record_data = record
-                else:
-                    # Try to find record by other unique fields
-                    # Common unique fields by model
-                    unique_fields = {
-                        'res.partner': ['email', 'vat'],
-                        'product.product': ['default_code', 'barcode'],
-                        'product.template': ['default_code', 'barcode'],
-                    }
-
-                    model_unique_fields = unique_fields.get(state.import_state.model_name, [])
-
-                    for field in model_unique_fields:
-                        if field in record and record[field]:
-                            record_exists = models.execute_kw(
-                                state.odoo_db, uid, state.odoo_password,
-                                state.import_state.model_name, 'search',
-                                [[
-                                    (field, '=', record[field]),
-                                    ('active', 'in', [True, False])  # Include archived records
-                                ]]
-                            )
-
-                            if record_exists:
-                                record_id = record_exists[0]
-                                break
-
-                    record_data = record
-
-                # Create or update record
-                if record_id and state.import_state.update_if_exists:
-                    # Update existing record
-                    result = models.execute_kw(
-                        state.odoo_db, uid, state.odoo_password,
-                        state.import_state.model_name, 'write',
-                        [[record_id], record_data]
-                    )
-
-                    if result:
-                        updated_count += 1
-                    else:
-                        failed_count += 1
-                        validation_errors.append({
-                            'record': record,
-                            'error': 'Failed to update record'
-                        })
-
-                elif not record_id and state.import_state.create_if_not_exists:
-                    # Create new record
-                    new_id = models.execute_kw(
-                        state.odoo_db, uid, state.odoo_password,
-                        state.import_state.model_name, 'create',
-                        [record_data]
-                    )
-
-                    if new_id:
-                        created_count += 1
-                    else:
-                        failed_count += 1
-                        validation_errors.append({
-                            'record': record,
-                            'error': 'Failed to create record'
-                        })
+        def mapped_records():
+            """Map and convert records one by one, streaming them from the CSV file unless preloaded."""
+            records = state.import_state.records_to_import or iter_csv_records(state.import_state.import_path)
+            for record in records:
+                mapped_record = {}
 
-                else:
-                    # Skip record
-                    failed_count += 1
-                    validation_errors.append({
-                        'record': record,
-                        'error': 'Record skipped due to import options'
-                    })
-
-            except Exception as e:
-                failed_count += 1
-                validation_errors.append({
-                    'record': record,
-                    'error': str(e)
-                })
+                for csv_field, odoo_field in state.import_state.field_mapping.items():
+                    if csv_field in record and odoo_field in odoo_fields:
+                        # Convert value to appropriate type for Odoo
+                        value = record[csv_field]
+                        odoo_field_type = odoo_fields[odoo_field]['type']
+
+                        converted_value = convert_value_for_odoo(value, odoo_field_type)
+                        mapped_record[odoo_field] = converted_value
+
+                yield mapped_record
+
+        # Look up, create and write the records in batches
+        importer = BulkImporter(
+            models, state.odoo_db, uid, state.odoo_password,
+            state.import_state.model_name, odoo_fields
+        )
+        result = importer.run(
+            mapped_records(),
+            create_if_not_exists=state.import_state.create_if_not_exists,
+            update_if_exists=state.import_state.update_if_exists
+        )
+        created_count = result['created']
+        updated_count = result['updated']
+        failed_count = result['failed']
+        validation_errors = result['validation_errors']
 
         # Update state with results
         state.import_state.imported_records = created_count
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk import backend for the Export/Import agent flow.
+
+Existing records are looked up with one query per key field for a whole batch,
+new records are created with multi-record create calls and records receiving
+the same values are written together. Batches that fail are split in half until
+the failing records are isolated, so one bad row does not fail its whole batch.
+"""
+
+import time
+import logging
+import itertools
+from typing import Dict, List, Any, Tuple, Optional, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Common unique fields by model, used to match records without an id
+UNIQUE_FIELDS = {
+    'res.partner': ['email', 'vat'],
+    'product.product': ['default_code', 'barcode'],
+    'product.template': ['default_code', 'barcode'],
+}
+
+FIELD_ATTRIBUTES = ['string', 'help', 'type', 'required', 'readonly', 'selection', 'size']
+
+# Seconds a model's fields_get metadata is reused, so new custom fields show up in a running server
+FIELDS_CACHE_TTL = 300
+
+_fields_cache: Dict[Tuple[str, str, int, str], Tuple[float, Dict[str, Any]]] = {}
+
+
+def get_model_fields(models: Any, url: str, db: str, uid: int, password: str,
+                     model_name: str) -> Dict[str, Any]:
+    """
+    Get the fields_get metadata of a model, cached per server, database, user and model
+    for FIELDS_CACHE_TTL seconds.
+
+    Args:
+        models: XML-RPC object proxy
+        url: Odoo server URL (part of the cache key)
+        db: Database name
+        uid: User id
+        password: Password
+        model_name: Technical name of the model
+
+    Returns:
+        Dictionary of field information
+    """
+    key = (url, db, uid, model_name)
+    cached = _fields_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    fields = models.execute_kw(
+        db, uid, password,
+        model_name, 'fields_get',
+        [],
+        {'attributes': FIELD_ATTRIBUTES}
+    )
+    _fields_cache[key] = (time.monotonic() + FIELDS_CACHE_TTL, fields)
+    return fields
+
+
+def clear_fields_cache() -> None:
+    """Forget all cached model metadata."""
+    _fields_cache.clear()
+
+
+class BulkImporter:
+    """Batched create/write of mapped records into one Odoo model."""
+
+    def __init__(self, models: Any, db: str, uid: int, password: str, model_name: str,
+                 odoo_fields: Dict[str, Any], batch_size: int = 100):
+        """
+        Initialize the bulk importer.
+
+        Args:
+            models: XML-RPC object proxy
+            db: Database name
+            uid: User id
+            password: Password
+            model_name: Technical name of the model to import into
+            odoo_fields: fields_get metadata of the model
+            batch_size: Number of records per create/write call
+        """
+        self.models = models
+        self.db = db
+        self.uid = uid
+        self.password = password
+        self.model_name = model_name
+        self.odoo_fields = odoo_fields
+        self.batch_size = batch_size
+
+    def _execute(self, method: str, *args, **kwargs) -> Any:
+        return self.models.execute_kw(self.db, self.uid, self.password,
+                                      self.model_name, method, list(args), kwargs)
+
+    def find_existing(self, records: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Find the existing record id for each record.
+
+        Records carrying an id are checked with a single search for the whole
+        batch; the others are matched on the model's unique fields with one
+        search_read per field.
+
+        Args:
+            records: Mapped records
+
+        Returns:
+            List of existing record ids (or None), aligned with records
+        """
+        existing: List[Optional[int]] = [None] * len(records)
+
+        ids = {record['id'] for record in records if record.get('id')}
+        if ids:
+            found = set(self._execute('search', [('id', 'in', sorted(ids))]))
+            for index, record in enumerate(records):
+                if record.get('id') in found:
+                    existing[index] = record['id']
+
+        domain_extra = [('active', 'in', [True, False])] if 'active' in self.odoo_fields else []
+        for field in UNIQUE_FIELDS.get(self.model_name, []):
+            pending = [index for index, record in enumerate(records)
+                       if existing[index] is None and not record.get('id') and record.get(field)]
+            if not pending:
+                continue
+            values = sorted({records[index][field] for index in pending}, key=str)
+            matches = self._execute('search_read', [(field, 'in', values)] + domain_extra,
+                                    fields=[field], order='id')
+            first_match: Dict[Any, int] = {}
+            for match in matches:
+                first_match.setdefault(match[field], match['id'])
+            for index in pending:
+                existing[index] = first_match.get(records[index][field])
+
+        return existing
+
+    def _bisect(self, execute: Callable[[List[Tuple[Dict[str, Any], Any]]], List[Any]],
+                items: List[Tuple[Dict[str, Any], Any]],
+                validation_errors: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Any]]:
+        """Run execute on items, splitting failing batches to isolate the failing records."""
+        try:
+            return list(zip(items, execute(items)))
+        except Exception as e:
+            if len(items) == 1:
+                validation_errors.append({'record': items[0][0], 'error': str(e)})
+                return []
+            middle = len(items) // 2
+            return (self._bisect(execute, items[:middle], validation_errors)
+                    + self._bisect(execute, items[middle:], validation_errors))
+
+    def create(self, items: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+               validation_errors: List[Dict[str, Any]]) -> List[Tuple[Tuple[Dict[str, Any], Dict[str, Any]], int]]:
+        """Create (record, vals) items in batches; returns the (item, record_id) pairs created."""
+        def execute(batch):
+            return self._execute('create', [vals for _, vals in batch])
+
+        created = []
+        for start in range(0, len(items), self.batch_size):
+            created.extend(self._bisect(execute, items[start:start + self.batch_size], validation_errors))
+        return created
+
+    def write(self, items: List[Tuple[Dict[str, Any], Tuple[int, Dict[str, Any]]]],
+              validation_errors: List[Dict[str, Any]]) -> int:
+        """Write (record, (record_id, vals)) items, grouping identical vals; returns the number written."""
+        groups: Dict[str, List[Tuple[Dict[str, Any], Tuple[int, Dict[str, Any]]]]] = {}
+        for item in items:
+            groups.setdefault(repr(sorted(item[1][1].items())), []).append(item)
+
+        written = 0
+        for group in groups.values():
+            vals = group[0][1][1]
+
+            def execute(batch, vals=vals):
+                self._execute('write', [target[0] for _, target in batch], vals)
+                return [True] * len(batch)
+
+            for start in range(0, len(group), self.batch_size):
+                written += len(self._bisect(execute, group[start:start + self.batch_size], validation_errors))
+        return written
+
+    def record_keys(self, record: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Keys under which records of one run describe the same Odoo record, as find_existing matches them."""
+        keys = [('id', record['id'])] if record.get('id') else []
+        for field in UNIQUE_FIELDS.get(self.model_name, []):
+            value = record.get(field)
+            if value and isinstance(value, (str, int, float)):
+                keys.append((field, value))
+        return keys
+
+    def run(self, records: Iterable[Dict[str, Any]], create_if_not_exists: bool = True,
+            update_if_exists: bool = True) -> Dict[str, Any]:
+        """
+        Import mapped records.
+
+        Records are consumed batch by batch, so they can be streamed from a
+        generator. A record sharing an id or unique field value with a record
+        created earlier in the run updates it instead of creating a duplicate.
+
+        Args:
+            records: Records with Odoo field names and converted values
+            create_if_not_exists: Whether to create new records if they don't exist
+            update_if_exists: Whether to update existing records
+
+        Returns:
+            Dictionary with created, updated and failed counts and validation errors
+        """
+        validation_errors: List[Dict[str, Any]] = []
+        created = updated = failed = 0
+        to_create: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        to_write = []
+        # key -> ('queued', index in to_create) or ('created', record_id)
+        run_keys: Dict[Tuple[str, Any], Tuple[str, int]] = {}
+        queued_keys: List[List[Tuple[str, Any]]] = []
+        folded: Dict[int, List[Dict[str, Any]]] = {}
+
+        def skip(record):
+            nonlocal failed
+            failed += 1
+            validation_errors.append({
+                'record': record,
+                'error': 'Record skipped due to import options'
+            })
+
+        def flush_creates():
+            nonlocal created, updated, failed
+            created_ids = {id(item): record_id for item, record_id in self.create(to_create, validation_errors)}
+            for index, item in enumerate(to_create):
+                record_id = created_ids.get(id(item))
+                for key in queued_keys[index]:
+                    if run_keys.get(key) == ('queued', index):
+                        if record_id:
+                            run_keys[key] = ('created', record_id)
+                        else:
+                            del run_keys[key]
+                # Records folded into a create count as updates of the created record
+                for record in folded.pop(index, []):
+                    if record_id:
+                        updated += 1
+                    else:
+                        failed += 1
+                        validation_errors.append({'record': record, 'error': 'The record it updates was not created'})
+            created += len(created_ids)
+            failed += len(to_create) - len(created_ids)
+            to_create.clear()
+            queued_keys.clear()
+
+        def flush_writes():
+            nonlocal updated, failed
+            written = self.write(to_write, validation_errors)
+            updated += written
+            failed += len(to_write) - written
+            to_write.clear()
+
+        iterator = iter(records)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                break
+            try:
+                existing = self.find_existing(batch)
+            except Exception as e:
+                logger.error(f"Error looking up existing {self.model_name} records: {str(e)}")
+                failed += len(batch)
+                validation_errors.extend({'record': record, 'error': str(e)} for record in batch)
+                continue
+
+            for record, record_id in zip(batch, existing):
+                record_data = {k: v for k, v in record.items() if k != 'id'}
+                keys = self.record_keys(record)
+                queued = None
+                if not record_id:
+                    hit = next((run_keys[key] for key in keys if key in run_keys), None)
+                    if hit and hit[0] == 'queued':
+                        queued = hit[1]
+                    elif hit:
+                        record_id = hit[1]
+
+                if queued is not None and update_if_exists:
+                    to_create[queued][1].update(record_data)
+                    folded.setdefault(queued, []).append(record)
+                elif queued is not None:
+                    skip(record)
+                elif record_id and update_if_exists:
+                    to_write.append((record, (record_id, record_data)))
+                elif not record_id and create_if_not_exists:
+                    to_create.append((record, record_data))
+                    queued_keys.append(keys)
+                    for key in keys:
+                        run_keys.setdefault(key, ('queued', len(to_create) - 1))
+                else:
+                    skip(record)
+
+            if len(to_create) >= self.batch_size:
+                flush_creates()
+            if len(to_write) >= self.batch_size:
+                flush_writes()
+
+        flush_creates()
+        flush_writes()
+
+        logger.info(f"Bulk import into {self.model_name}: {created} created, {updated} updated, {failed} failed")
+        return {
+            'created': created,
+            'updated': updated,
+            'failed': failed,
+            'validation_errors': validation_errors,
+        }
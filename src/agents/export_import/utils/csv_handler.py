@@ -8,7 +8,8 @@ CSV handling utilities for Export/Import agent flow.
 import os
 import csv
 import logging
-from typing import Dict, List, Any, Optional
+import itertools
+from typing import Dict, List, Any, Iterator, Optional
 
 import pandas as pd
 
@@ -57,26 +58,43 @@ def export_to_csv(records: List[Dict[str, Any]],
         raise
 
 
-def import_from_csv(import_path: str) -> List[Dict[str, Any]]:
+def iter_csv_records(import_path: str, chunksize: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a CSV file.
+
+    The file is parsed by pandas in chunks of chunksize rows, so only one chunk
+    is held in memory at a time regardless of the file size.
+
+    Args:
+        import_path: Path to the CSV file
+        chunksize: Number of rows parsed per chunk
+
+    Yields:
+        One record (dictionary) per CSV row
+    """
+    # Check if file exists
+    if not os.path.exists(import_path):
+        raise FileNotFoundError(f"CSV file not found: {import_path}")
+
+    for chunk in pd.read_csv(import_path, chunksize=chunksize):
+        yield from chunk.to_dict(orient='records')
+
+
+def import_from_csv(import_path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Import records from a CSV file.
     
     Args:
         import_path: Path to the CSV file
+        limit: Maximum number of records to read (if None, all records are read)
         
     Returns:
         List of records imported from the CSV file
     """
     try:
-        # Check if file exists
-        if not os.path.exists(import_path):
-            raise FileNotFoundError(f"CSV file not found: {import_path}")
-        
-        # Import from CSV
-        df = pd.read_csv(import_path)
-        
-        # Convert to list of dictionaries
-        records = df.to_dict(orient='records')
+        # Stream the CSV so that a limited read stops after the first chunk
+        chunksize = min(limit, 1000) if limit else 1000
+        records = list(itertools.islice(iter_csv_records(import_path, chunksize), limit))
         
         logger.info(f"Imported {len(records)} records from {import_path}")
         return records
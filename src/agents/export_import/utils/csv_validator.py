@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Whole-file CSV validation for Export/Import agent flow.
+
+The CSV is read in chunks of rows restricted to the mapped columns, and every
+column is checked with vectorized pandas operations: type conversion,
+required values, selection membership and string length. The result is a
+compact per-column summary with the offending row numbers, so a bad file is
+rejected before any record is sent to Odoo.
+"""
+
+import logging
+from typing import Dict, List, Any, Sequence
+
+import pandas as pd
+
+from scripts.dynamic_data_tool import DATE_FORMATS, BOOLEAN_TRUE_VALUES, BOOLEAN_FALSE_VALUES
+
+logger = logging.getLogger(__name__)
+
+# Accepted boolean values, as the importer converts them
+BOOLEAN_VALUES = list(BOOLEAN_TRUE_VALUES + BOOLEAN_FALSE_VALUES)
+NUMERIC_TYPES = ['integer', 'float', 'monetary']
+
+
+def _column_errors(values: pd.Series, field_info: Dict[str, Any], check_required: bool,
+                   date_formats: Sequence[str], datetime_format: str) -> Dict[str, pd.Series]:
+    """
+    Compute the error masks of one column chunk.
+
+    Returns:
+        Dictionary mapping check names to boolean masks of failing rows
+    """
+    field_type = field_info.get('type', 'char')
+    stripped = values.str.strip()
+    empty = stripped == ''
+    errors = {}
+
+    if check_required and field_info.get('required') and not field_info.get('readonly'):
+        errors['required'] = empty
+
+    if field_type in NUMERIC_TYPES:
+        numbers = pd.to_numeric(stripped.where(~empty), errors='coerce')
+        invalid = ~empty & numbers.isna()
+        if field_type == 'integer':
+            invalid |= ~empty & numbers.notna() & (numbers % 1 != 0)
+        errors['type'] = invalid
+    elif field_type == 'boolean':
+        errors['type'] = ~empty & ~stripped.str.lower().isin(BOOLEAN_VALUES)
+    elif field_type in ('date', 'datetime'):
+        # A value is valid when one of the formats parses it
+        invalid = ~empty
+        for fmt in (date_formats if field_type == 'date' else [datetime_format]):
+            invalid &= pd.to_datetime(stripped.where(invalid), format=fmt, errors='coerce').isna()
+        errors['type'] = invalid
+    elif field_type == 'selection' and isinstance(field_info.get('selection'), list):
+        keys = [str(option[0]) for option in field_info['selection']]
+        errors['selection'] = ~empty & ~stripped.isin(keys)
+
+    size = field_info.get('size')
+    if field_type in ('char', 'text') and size:
+        errors['length'] = values.str.len() > size
+
+    return errors
+
+
+def validate_csv_file(import_path: str,
+                      odoo_fields: Dict[str, Any],
+                      field_mapping: Dict[str, str],
+                      chunksize: int = 50000,
+                      max_rows: int = 20,
+                      check_required: bool = True,
+                      date_formats: Sequence[str] = DATE_FORMATS,
+                      datetime_format: str = '%Y-%m-%d %H:%M:%S') -> Dict[str, Any]:
+    """
+    Validate every row of a CSV file against Odoo field definitions.
+
+    Args:
+        import_path: Path to the CSV file
+        odoo_fields: Dictionary of Odoo field information (fields_get format)
+        field_mapping: Dictionary mapping CSV field names to Odoo field names
+        chunksize: Number of rows read per chunk
+        max_rows: Maximum number of row numbers kept per column and check
+        check_required: Whether empty values in required fields are errors
+        date_formats: Accepted formats of date values
+        datetime_format: Expected format of datetime values
+
+    Returns:
+        Dictionary with 'valid', 'total_rows', 'error_count' and 'columns', where
+        'columns' maps each failing CSV column to its checks, each with a 'count'
+        and the first 'rows' (file line numbers, the header being line 1). A
+        mapped column missing from the file fails the 'missing' check on line 1.
+    """
+    mapping = {csv_field: odoo_field for csv_field, odoo_field in field_mapping.items()
+               if odoo_field in odoo_fields}
+    columns: Dict[str, Dict[str, Any]] = {}
+    total_rows = 0
+
+    header = set(pd.read_csv(import_path, dtype=str, nrows=0).columns)
+    for csv_field in [csv_field for csv_field in mapping if csv_field not in header]:
+        odoo_field = mapping.pop(csv_field)
+        columns[csv_field] = {
+            'odoo_field': odoo_field,
+            'odoo_type': odoo_fields[odoo_field].get('type'),
+            'errors': {'missing': {'count': 1, 'rows': [1]}}
+        }
+
+    if mapping:
+        reader = pd.read_csv(import_path, usecols=list(mapping), dtype=str,
+                             keep_default_na=False, chunksize=chunksize)
+        for chunk in reader:
+            # File line numbers of the chunk rows (header is line 1)
+            line_numbers = chunk.index.to_numpy() + 2
+            total_rows += len(chunk)
+            for csv_field, odoo_field in mapping.items():
+                errors = _column_errors(chunk[csv_field], odoo_fields[odoo_field], check_required,
+                                        date_formats, datetime_format)
+                for check, mask in errors.items():
+                    mask = mask.to_numpy()
+                    count = int(mask.sum())
+                    if not count:
+                        continue
+                    column = columns.setdefault(csv_field, {
+                        'odoo_field': odoo_field,
+                        'odoo_type': odoo_fields[odoo_field].get('type'),
+                        'errors': {}
+                    })
+                    entry = column['errors'].setdefault(check, {'count': 0, 'rows': []})
+                    entry['count'] += count
+                    if len(entry['rows']) < max_rows:
+                        entry['rows'].extend(line_numbers[mask][:max_rows - len(entry['rows'])].tolist())
+
+    error_count = sum(entry['count'] for column in columns.values() for entry in column['errors'].values())
+    logger.info(f"Validated {total_rows} rows of {import_path}: {error_count} errors in {len(columns)} columns")
+    return {
+        'valid': error_count == 0,
+        'total_rows': total_rows,
+        'error_count': error_count,
+        'columns': columns,
+    }
+
+
+def format_validation_summary(result: Dict[str, Any]) -> List[str]:
+    """
+    Format a validation result as one line per column and check.
+
+    Args:
+        result: Result of validate_csv_file
+
+    Returns:
+        List of lines such as "price -> list_price (type): 3 rows [2, 5, 9]"
+    """
+    lines = []
+    for csv_field, column in result['columns'].items():
+        for check, entry in column['errors'].items():
+            more = ', ...' if entry['count'] > len(entry['rows']) else ''
+            rows = ', '.join(str(row) for row in entry['rows'])
+            lines.append(f"{csv_field} -> {column['odoo_field']} ({check}): "
+                         f"{entry['count']} rows [{rows}{more}]")
+    return lines
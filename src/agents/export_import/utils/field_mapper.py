@@ -11,14 +11,30 @@ from typing import Dict, List, Any, Tuple, Optional
 logger = logging.getLogger(__name__)
 
 
+def _get_schema_index():
+    """Return the shared schema index, or None if it is disabled or unavailable."""
+    try:
+        from schema_index import get_schema_index
+        return get_schema_index()
+    except ImportError:
+        return None
+
+
 def suggest_field_mapping(csv_fields: List[str], 
-                          odoo_fields: Dict[str, Any]) -> Dict[str, str]:
+                          odoo_fields: Dict[str, Any],
+                          model_name: Optional[str] = None,
+                          schema_index=None) -> Dict[str, str]:
     """
     Suggest field mapping between CSV fields and Odoo fields.
     
+    CSV fields that match no Odoo field name or label are looked up by meaning
+    in the schema index, when one is enabled.
+    
     Args:
         csv_fields: List of field names from the CSV file
         odoo_fields: Dictionary of Odoo field information
+        model_name: Odoo model name, used as the schema index key
+        schema_index: SchemaIndex to use (the shared one if None)
         
     Returns:
         Dictionary mapping CSV field names to Odoo field names
@@ -36,6 +52,9 @@ def suggest_field_mapping(csv_fields: List[str],
             normalized_label = field_info['string'].lower().replace(' ', '').replace('_', '')
             normalized_odoo_fields[normalized_label] = field_name
     
+    if schema_index is None and model_name:
+        schema_index = _get_schema_index()
+    
     # Try to match CSV fields to Odoo fields
     for csv_field in csv_fields:
         # Try exact match first
@@ -54,6 +73,14 @@ def suggest_field_mapping(csv_fields: List[str],
             if normalized_csv_field in norm_odoo_field or norm_odoo_field in normalized_csv_field:
                 mapping[csv_field] = odoo_field
                 break
+        if csv_field in mapping:
+            continue
+        
+        # Try the closest field in meaning
+        if schema_index and model_name:
+            matches = schema_index.search(model_name, csv_field, odoo_fields, k=1)
+            if matches:
+                mapping[csv_field] = matches[0][0]
     
     logger.info(f"Suggested field mapping: {mapping}")
     return mapping
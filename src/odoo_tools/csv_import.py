@@ -10,8 +10,11 @@ for both create and update operations.
 
 import os
 import csv
+import queue
 import logging
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple, Union
 import xmlrpc.client
 
@@ -75,12 +78,20 @@ class OdooCSVImporter:
             logger.info(f"Successfully authenticated as user ID: {self.uid}")
             
             # Connect to models service
-            self.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object", allow_none=True)
+            self.models = self._new_models_proxy()
             
         except Exception as e:
             logger.error(f"Failed to connect to Odoo server: {e}")
             raise
     
+    def _new_models_proxy(self) -> xmlrpc.client.ServerProxy:
+        """
+        Create a new proxy to the models service.
+        
+        ServerProxy objects are not thread-safe, so every concurrent worker gets its own.
+        """
+        return xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object", allow_none=True)
+    
     def import_csv(
         self,
         model_name: str,
@@ -91,7 +102,8 @@ class OdooCSVImporter:
         batch_size: int = 100,
         skip_rows: int = 0,
         delimiter: str = ",",
-        encoding: str = "utf-8-sig"
+        encoding: str = "utf-8-sig",
+        concurrency: int = 1
     ) -> Dict[str, Any]:
         """
         Import data from a CSV file into an Odoo model.
@@ -106,6 +118,8 @@ class OdooCSVImporter:
             skip_rows: Number of rows to skip at the beginning of the file
             delimiter: CSV delimiter character
             encoding: File encoding
+            concurrency: Number of batches processed at the same time, each over
+                its own pooled connection (1 processes batches sequentially)
         
         Returns:
             Dict containing results of the import operation
@@ -120,73 +134,115 @@ class OdooCSVImporter:
         
         try:
             # Initialize counters
-            result = {
-                "total": 0,
-                "created": 0,
-                "updated": 0,
-                "skipped": 0,
-                "failed": 0,
-                "errors": []
-            }
+            result = self._new_result()
             
-            # Read the CSV file
-            logger.info(f"Reading CSV file: {csv_file_path}")
-            with open(csv_file_path, 'r', encoding=encoding) as f:
-                reader = csv.reader(f, delimiter=delimiter)
-                
-                # Skip header rows if needed
-                for _ in range(skip_rows):
-                    next(reader)
-                
-                # Get headers
-                headers = next(reader)
-                logger.info(f"CSV headers: {headers}")
-                
-                # Check if id_field is in headers
-                if id_field not in headers:
-                    logger.error(f"ID field '{id_field}' not found in CSV headers")
-                    raise ValueError(f"ID field '{id_field}' not found in CSV headers")
-                
-                # Process records in batches
-                records_batch = []
-                id_field_index = headers.index(id_field)
-                
-                for row_num, row in enumerate(reader, start=skip_rows+2):  # +2 for header and 0-indexing
-                    try:
-                        # Skip empty rows
-                        if not row:
-                            logger.debug(f"Skipping empty row {row_num}")
-                            continue
-                        
-                        # Create record dict from row
-                        record = {headers[i]: value for i, value in enumerate(row) if i < len(headers) and value}
-                        
-                        # Add record to batch
-                        records_batch.append(record)
-                        result["total"] += 1
-                        
-                        # Process batch when it reaches batch_size
-                        if len(records_batch) >= batch_size:
-                            self._process_batch(
-                                model_name, records_batch, id_field, 
-                                create_if_not_exists, update_if_exists, result
-                            )
-                            records_batch = []
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing row {row_num}: {e}")
-                        result["failed"] += 1
-                        result["errors"].append({
-                            "row": row_num,
-                            "error": str(e)
-                        })
-                
-                # Process remaining records
-                if records_batch:
+            # Batches run in a thread pool when concurrency > 1; results are merged
+            # in submission order by this thread, so counts and errors stay stable
+            executor = None
+            in_flight = deque()
+            # Key -> future of the in-flight batch holding it, so a later batch with
+            # the same key waits until that batch has created the record
+            in_flight_keys = {}
+            if concurrency > 1:
+                executor = ThreadPoolExecutor(max_workers=concurrency)
+                pool = queue.Queue()
+                for _ in range(concurrency):
+                    pool.put(self._new_models_proxy())
+            
+            def run_batch(batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+                batch_result = self._new_result()
+                models = pool.get()
+                try:
                     self._process_batch(
-                        model_name, records_batch, id_field,
+                        model_name, batch, id_field,
+                        create_if_not_exists, update_if_exists, batch_result, models
+                    )
+                finally:
+                    pool.put(models)
+                return batch_result
+            
+            def merge_next() -> None:
+                future, keys = in_flight.popleft()
+                for key in keys:
+                    if in_flight_keys.get(key) is future:
+                        del in_flight_keys[key]
+                self._merge_result(result, future.result())
+            
+            def submit(batch: List[Dict[str, Any]]) -> None:
+                if executor is None:
+                    self._process_batch(
+                        model_name, batch, id_field,
                         create_if_not_exists, update_if_exists, result
                     )
+                    return
+                keys = {record[id_field] for record in batch if record.get(id_field)}
+                for future in {in_flight_keys[key] for key in keys if key in in_flight_keys}:
+                    future.result()
+                future = executor.submit(run_batch, batch)
+                in_flight.append((future, keys))
+                in_flight_keys.update(dict.fromkeys(keys, future))
+                # Bound the number of batches held in memory
+                while len(in_flight) >= concurrency * 2:
+                    merge_next()
+            
+            try:
+                # Read the CSV file
+                logger.info(f"Reading CSV file: {csv_file_path}")
+                with open(csv_file_path, 'r', encoding=encoding) as f:
+                    reader = csv.reader(f, delimiter=delimiter)
+                    
+                    # Skip header rows if needed
+                    for _ in range(skip_rows):
+                        next(reader)
+                    
+                    # Get headers
+                    headers = next(reader)
+                    logger.info(f"CSV headers: {headers}")
+                    
+                    # Check if id_field is in headers
+                    if id_field not in headers:
+                        logger.error(f"ID field '{id_field}' not found in CSV headers")
+                        raise ValueError(f"ID field '{id_field}' not found in CSV headers")
+                    
+                    # Process records in batches
+                    records_batch = []
+                    
+                    for row_num, row in enumerate(reader, start=skip_rows+2):  # +2 for header and 0-indexing
+                        try:
+                            # Skip empty rows
+                            if not row:
+                                logger.debug(f"Skipping empty row {row_num}")
+                                continue
+                            
+                            # Create record dict from row
+                            record = {headers[i]: value for i, value in enumerate(row) if i < len(headers) and value}
+                            
+                            # Add record to batch
+                            records_batch.append(record)
+                            result["total"] += 1
+                            
+                            # Process batch when it reaches batch_size
+                            if len(records_batch) >= batch_size:
+                                submit(records_batch)
+                                records_batch = []
+                        
+                        except Exception as e:
+                            logger.error(f"Error processing row {row_num}: {e}")
+                            result["failed"] += 1
+                            result["errors"].append({
+                                "row": row_num,
+                                "error": str(e)
+                            })
+                    
+                    # Process remaining records
+                    if records_batch:
+                        submit(records_batch)
+                
+                while in_flight:
+                    merge_next()
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=True)
             
             # Log results
             logger.info(f"Import completed: {result['total']} total, "
@@ -199,6 +255,25 @@ class OdooCSVImporter:
             logger.error(f"Error during CSV import: {e}")
             raise
     
+    @staticmethod
+    def _new_result() -> Dict[str, Any]:
+        """Create an empty import result."""
+        return {
+            "total": 0,
+            "created": 0,
+            "updated": 0,
+            "skipped": 0,
+            "failed": 0,
+            "errors": []
+        }
+    
+    @staticmethod
+    def _merge_result(result: Dict[str, Any], batch_result: Dict[str, Any]) -> None:
+        """Add the counts and errors of a batch to the overall result."""
+        for key in ("created", "updated", "skipped", "failed"):
+            result[key] += batch_result[key]
+        result["errors"].extend(batch_result["errors"])
+    
     def _process_batch(
         self,
         model_name: str,
@@ -206,11 +281,17 @@ class OdooCSVImporter:
         id_field: str,
         create_if_not_exists: bool,
         update_if_exists: bool,
-        result: Dict[str, Any]
+        result: Dict[str, Any],
+        models: Optional[xmlrpc.client.ServerProxy] = None
     ) -> None:
         """
         Process a batch of records for import.
         
+        Existing records are found with one search_read, new records are created
+        with one multi-record create and existing records receiving the same values
+        are updated with one write. When a create or write fails, the records are
+        split in half until the failing ones are isolated.
+        
         Args:
             model_name: The name of the Odoo model
             records: List of record dictionaries
@@ -218,10 +299,12 @@ class OdooCSVImporter:
             create_if_not_exists: Whether to create records that don't exist
             update_if_exists: Whether to update records that already exist
             result: Dict to update with operation results
+            models: Models proxy to use (defaults to the importer's connection)
         """
         if not records:
             logger.debug("Skipping empty batch")
             return
+        models = models or self.models
         
         # Get unique values for the id_field
         id_values = [record[id_field] for record in records if id_field in record]
@@ -236,67 +319,11 @@ class OdooCSVImporter:
         # Find existing records
         domain = [(id_field, 'in', id_values)]
         try:
-            existing_records = self.models.execute_kw(
+            existing_records = models.execute_kw(
                 self.db, self.uid, self.password,
                 model_name, 'search_read',
                 [domain, [id_field]]
             )
-            
-            # Create dictionary of existing records by id_field
-            existing_ids = {record[id_field]: record['id'] for record in existing_records}
-            
-            # Process each record
-            for record in records:
-                try:
-                    record_id = record.get(id_field)
-                    
-                    # Skip if no ID field
-                    if not record_id:
-                        logger.warning(f"Record missing {id_field}, skipping")
-                        result["skipped"] += 1
-                        continue
-                    
-                    # Check if record exists
-                    if record_id in existing_ids:
-                        # Update existing record
-                        if update_if_exists:
-                            odoo_id = existing_ids[record_id]
-                            success = self._update_record(model_name, odoo_id, record)
-                            if success:
-                                result["updated"] += 1
-                            else:
-                                result["failed"] += 1
-                                result["errors"].append({
-                                    "record": record_id,
-                                    "error": "Failed to update record"
-                                })
-                        else:
-                            logger.info(f"Record with {id_field}={record_id} exists but update_if_exists=False, skipping")
-                            result["skipped"] += 1
-                    else:
-                        # Create new record
-                        if create_if_not_exists:
-                            success = self._create_record(model_name, record)
-                            if success:
-                                result["created"] += 1
-                            else:
-                                result["failed"] += 1
-                                result["errors"].append({
-                                    "record": record_id,
-                                    "error": "Failed to create record"
-                                })
-                        else:
-                            logger.info(f"Record with {id_field}={record_id} doesn't exist but create_if_not_exists=False, skipping")
-                            result["skipped"] += 1
-                
-                except Exception as e:
-                    logger.error(f"Error processing record {record.get(id_field, 'unknown')}: {e}")
-                    result["failed"] += 1
-                    result["errors"].append({
-                        "record": record.get(id_field, "unknown"),
-                        "error": str(e)
-                    })
-                    
         except Exception as e:
             logger.error(f"Error searching for existing records: {e}")
             # Skip the entire batch on search error
@@ -306,79 +333,131 @@ class OdooCSVImporter:
                     "record": record.get(id_field, "unknown"),
                     "error": f"Failed to search for existing records: {str(e)}"
                 })
-    
-    def _create_record(self, model_name: str, record: Dict[str, Any]) -> bool:
-        """
-        Create a new record in Odoo.
+            return
         
-        Args:
-            model_name: The name of the Odoo model
-            record: Record data dictionary
+        # Create dictionary of existing records by id_field
+        existing_ids = {record[id_field]: record['id'] for record in existing_records}
+        
+        to_create = []
+        to_update = []
+        # Later records of the batch with the key of a queued create update it
+        queued = {}
+        folded = {}
+        for record in records:
+            record_id = record.get(id_field)
             
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            # Remove the id_field from the record if it's an Odoo reserved field
-            if 'id' in record and not record['id'].isdigit():
-                record = record.copy()  # Create a copy to avoid modifying the original
-                logger.debug(f"Removing 'id' field with value '{record['id']}' for create operation")
-                del record['id']
+            # Skip if no ID field
+            if not record_id:
+                logger.warning(f"Record missing {id_field}, skipping")
+                result["skipped"] += 1
+                continue
             
-            # Create the record
-            new_id = self.models.execute_kw(
-                self.db, self.uid, self.password,
-                model_name, 'create',
-                [record]
-            )
+            # Check if record exists
+            if record_id in existing_ids:
+                if not update_if_exists:
+                    logger.info(f"Record with {id_field}={record_id} exists but update_if_exists=False, skipping")
+                    result["skipped"] += 1
+                    continue
+                update_data = self._update_values(record)
+                if update_data:
+                    to_update.append((record_id, existing_ids[record_id], update_data))
+                else:
+                    logger.warning("No fields to update, skipping")
+                    result["updated"] += 1
+            elif record_id in queued:
+                if not update_if_exists:
+                    logger.info(f"Record with {id_field}={record_id} is already created by this batch, skipping")
+                    result["skipped"] += 1
+                    continue
+                queued[record_id].update(self._update_values(record))
+                folded[record_id] = folded.get(record_id, 0) + 1
+            else:
+                if not create_if_not_exists:
+                    logger.info(f"Record with {id_field}={record_id} doesn't exist but create_if_not_exists=False, skipping")
+                    result["skipped"] += 1
+                    continue
+                queued[record_id] = dict(self._create_values(record))
+                to_create.append((record_id, queued[record_id]))
+        
+        if to_create:
+            def create(items):
+                new_ids = models.execute_kw(
+                    self.db, self.uid, self.password,
+                    model_name, 'create',
+                    [[vals for _, vals in items]]
+                )
+                logger.info(f"Created {len(new_ids)} new records in {model_name}")
             
-            logger.info(f"Created new record in {model_name} with ID: {new_id}")
-            return bool(new_id)
+            created, errors = self._execute_bisect(create, to_create)
+            result["created"] += created
+            self._record_failures(result, errors, "Failed to create record")
+            # Folded records count as updates of the created record, or fail with it
+            failed_keys = {record_id for record_id, _ in errors}
+            for record_id, count in folded.items():
+                result["failed" if record_id in failed_keys else "updated"] += count
         
-        except Exception as e:
-            logger.error(f"Error creating record: {e}")
-            return False
+        # Records receiving identical values are written together
+        groups = {}
+        for item in to_update:
+            groups.setdefault(repr(sorted(item[2].items())), []).append(item)
+        for group in groups.values():
+            update_data = group[0][2]
+            
+            def write(items, update_data=update_data):
+                models.execute_kw(
+                    self.db, self.uid, self.password,
+                    model_name, 'write',
+                    [[odoo_id for _, odoo_id, _ in items], update_data]
+                )
+                logger.info(f"Updated {len(items)} records in {model_name}")
+            
+            updated, errors = self._execute_bisect(write, group)
+            result["updated"] += updated
+            self._record_failures(result, errors, "Failed to update record")
     
-    def _update_record(self, model_name: str, record_id: int, record: Dict[str, Any]) -> bool:
+    @staticmethod
+    def _execute_bisect(execute, items: List[Tuple]) -> Tuple[int, List[Tuple[Any, str]]]:
         """
-        Update an existing record in Odoo.
+        Run execute on a list of items, bisecting on failure.
         
-        Args:
-            model_name: The name of the Odoo model
-            record_id: The Odoo ID of the record to update
-            record: Record data dictionary
-            
         Returns:
-            True if successful, False otherwise
+            A tuple (succeeded_count, errors) where errors holds (record key, error message) pairs
         """
         try:
-            # Create a copy to avoid modifying the original
-            update_data = record.copy()
-            
-            # Remove fields that shouldn't be updated
-            for field in ['id', 'create_date', 'create_uid']:
-                if field in update_data:
-                    logger.debug(f"Removing '{field}' field for update operation")
-                    del update_data[field]
-            
-            # Skip update if no fields to update
-            if not update_data:
-                logger.warning("No fields to update, skipping")
-                return True
-            
-            # Update the record
-            result = self.models.execute_kw(
-                self.db, self.uid, self.password,
-                model_name, 'write',
-                [[record_id], update_data]
-            )
-            
-            logger.info(f"Updated record in {model_name} with ID: {record_id}")
-            return bool(result)
-        
+            execute(items)
+            return len(items), []
         except Exception as e:
-            logger.error(f"Error updating record: {e}")
-            return False
+            if len(items) == 1:
+                logger.error(f"Error importing record {items[0][0]}: {e}")
+                return 0, [(items[0][0], str(e))]
+            middle = len(items) // 2
+            left_count, left_errors = OdooCSVImporter._execute_bisect(execute, items[:middle])
+            right_count, right_errors = OdooCSVImporter._execute_bisect(execute, items[middle:])
+            return left_count + right_count, left_errors + right_errors
+    
+    @staticmethod
+    def _record_failures(result: Dict[str, Any], errors: List[Tuple[Any, str]], message: str) -> None:
+        for record_id, error in errors:
+            result["failed"] += 1
+            result["errors"].append({
+                "record": record_id,
+                "error": f"{message}: {error}"
+            })
+    
+    @staticmethod
+    def _create_values(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Values to create a record with: a non-numeric 'id' is an identifier, not an Odoo id."""
+        if 'id' in record and not record['id'].isdigit():
+            record = record.copy()  # Create a copy to avoid modifying the original
+            logger.debug(f"Removing 'id' field with value '{record['id']}' for create operation")
+            del record['id']
+        return record
+    
+    @staticmethod
+    def _update_values(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Values to update a record with, without the fields that shouldn't be updated."""
+        return {field: value for field, value in record.items()
+                if field not in ('id', 'create_date', 'create_uid')}
 
 
 # Example usage
@@ -391,7 +470,8 @@ def import_csv_file(
     csv_file_path: str,
     id_field: str = "id",
     create_if_not_exists: bool = True,
-    update_if_exists: bool = True
+    update_if_exists: bool = True,
+    concurrency: int = 1
 ) -> Dict[str, Any]:
     """
     Helper function to import a CSV file into an Odoo model.
@@ -406,6 +486,7 @@ def import_csv_file(
         id_field: The field to use as the unique identifier
         create_if_not_exists: Whether to create records that don't exist
         update_if_exists: Whether to update records that already exist
+        concurrency: Number of batches processed at the same time
         
     Returns:
         Dict containing results of the import operation
@@ -416,7 +497,8 @@ def import_csv_file(
         csv_file_path=csv_file_path,
         id_field=id_field,
         create_if_not_exists=create_if_not_exists,
-        update_if_exists=update_if_exists
+        update_if_exists=update_if_exists,
+        concurrency=concurrency
     )
 
 
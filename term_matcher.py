@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Term Matcher Module
+
+This module provides an Aho-Corasick automaton for finding all occurrences of
+a large set of terms (model and field names) in a query with a single pass.
+"""
+
+import logging
+from collections import deque
+from typing import Dict, List, Any, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+class TermMatcher:
+    """Aho-Corasick automaton mapping terms to values."""
+
+    def __init__(self, terms: Dict[str, Any]):
+        """Build the automaton.
+
+        Args:
+            terms: Dictionary mapping lowercase terms to their values
+        """
+        self.terms = [term for term in terms if term]
+        self.values = [terms[term] for term in self.terms]
+        self._values = dict(zip(self.terms, self.values))
+
+        # State 0 is the root; each state has its transitions, failure link and matched terms
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, term in enumerate(self.terms):
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(index)
+
+        # Breadth-first computation of the failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+        logger.debug(f"Built term matcher with {len(self.terms)} terms and {len(self._goto)} states")
+
+    def find_all(self, text: str) -> Iterable[Tuple[int, int, str, Any]]:
+        """Find all term occurrences in a text, overlapping ones included.
+
+        Args:
+            text: Lowercase text to search
+
+        Yields:
+            (start, end, term, value) tuples in order of end position
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._out[state]:
+                term = self.terms[index]
+                yield position + 1 - len(term), position + 1, term, self.values[index]
+
+    def ranked_matches(self, text: str, min_length: int = 0) -> List[Tuple[str, Any]]:
+        """Find the distinct terms occurring in a text, best match first.
+
+        Matches starting a word rank before matches inside a word ("move" in
+        "remove"), then longer terms before shorter ones ("sales order" before
+        "sales"), then earlier occurrences before later ones.
+
+        Args:
+            text: Lowercase text to search
+            min_length: Minimum length of the terms to consider
+
+        Returns:
+            List of (term, value) tuples
+        """
+        best: Dict[str, Tuple[bool, int, int]] = {}
+        for start, _, term, _ in self.find_all(text):
+            if len(term) < min_length:
+                continue
+            word_start = start == 0 or not text[start - 1].isalnum()
+            rank = (not word_start, -len(term), start)
+            if term not in best or rank < best[term]:
+                best[term] = rank
+        return [(term, self._values[term]) for term in sorted(best, key=lambda term: best[term])]
+
+    def best_match(self, text: str, min_length: int = 0) -> Tuple[str, Any]:
+        """Return the best (term, value) match in a text, or (None, None)."""
+        matches = self.ranked_matches(text, min_length)
+        return matches[0] if matches else (None, None)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the two-phase execution of AdvancedSearch.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import advanced_search
+from advanced_search import AdvancedSearch, RpcTrace
+from query_parser import QueryParser
+from relationship_handler import RelationshipHandler
+
+
+class FakeParser:
+    """Query parser returning fixed customer and order searches."""
+
+    def parse_aggregate_query(self, query):
+        return None
+
+    def parse_complex_query(self, query):
+        return [("res.partner", [["name", "ilike", "azure"]], ["id", "name"]),
+                ("sale.order", [], ["id", "name", "partner_id"])]
+
+
+class FakeDiscovery:
+    """Model discovery whose proxy serves partners and orders from memory."""
+
+    db, uid, password, client = "db", 1, "pwd", None
+
+    def __init__(self):
+        self.models_proxy = self
+        self.calls = []
+        self.orders = [{"id": i, "name": f"S{i:05d}", "partner_id": [i % 3, f"Partner {i % 3}"]}
+                       for i in range(1, 31)]
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        if method == "fields_get":
+            return {}
+        domain = args[0]
+        self.calls.append((model, domain, kwargs.get("limit")))
+        if model == "ir.model.fields":
+            return []
+        if model == "res.partner":
+            return [{"id": 1, "name": "Azure Interior"}]
+        records = self.orders
+        for field, operator, value in domain:
+            assert operator == "in"
+            records = [r for r in records if r[field][0] in value]
+        return records[:kwargs["limit"]]
+
+
+def make_search(discovery):
+    search = AdvancedSearch.__new__(AdvancedSearch)
+    search.model_discovery = discovery
+    search.query_parser = FakeParser()
+    search.relationship_handler = RelationshipHandler(discovery, execute=search._execute)
+    search.max_workers = 1
+    search._local = threading.local()
+    search.record_cache = None
+    return search
+
+
+def test_secondary_search_is_restricted_to_primary_ids():
+    """Orders are fetched with a partner_id filter and all of them are joined."""
+    discovery = FakeDiscovery()
+
+    results = make_search(discovery).search("sales orders for customer azure", limit=5)
+
+    assert discovery.calls[1][:2] == ("sale.order", [["partner_id", "in", [1]]])
+    assert len(discovery.calls) == 2
+    assert len(results["joined_records"][0]["related_records"]) == 10
+
+
+def test_related_search_reaching_the_limit_is_marked_truncated(monkeypatch):
+    """A related search cut off by RELATED_RECORDS_LIMIT is reported as incomplete."""
+    monkeypatch.setattr(advanced_search, "RELATED_RECORDS_LIMIT", 5)
+    search = make_search(FakeDiscovery())
+
+    results = search.search("sales orders for customer azure", limit=5)
+
+    assert results["truncated"] == ["sale.order"]
+    assert "only the first 5 related records of sale.order" in search.format_results(results)
+
+
+def test_related_filter_from_many2one_and_many2many_values():
+    """Relation values are collected from [id, name] pairs and id lists."""
+    many2one = {"from_field": "partner_id", "to_field": "id", "relation_type": "many2one"}
+    many2many = {"from_field": "tag_ids", "to_field": "id", "relation_type": "many2many"}
+    records = [{"partner_id": [3, "Deco"], "tag_ids": [2, 4]}, {"partner_id": False, "tag_ids": [4]}]
+
+    assert AdvancedSearch._related_filter(many2one, records) == ["id", "in", [3]]
+    assert AdvancedSearch._related_filter(many2many, records) == ["id", "in", [2, 4]]
+    assert AdvancedSearch._related_filter({**many2one, "special": "text_match"}, records) is None
+
+
+class SlowDiscovery:
+    """Model discovery whose searches each take the same time, tracking overlap."""
+
+    db, uid, password, client, url = "db", 1, "pwd", None, "http://odoo"
+
+    def __init__(self):
+        self.models_proxy = self
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return [{"id": 1, "name": model}]
+
+
+def test_independent_searches_run_concurrently():
+    """Sub-queries without a relationship to the primary model run at the same time."""
+    discovery = SlowDiscovery()
+    search = make_search(discovery)
+    search.max_workers = 4
+    search._new_models_proxy = lambda: discovery
+    search.relationship_handler.get_relationship = lambda from_model, to_model: None
+    parsed = [("res.partner", [], ["id", "name"]), ("product.product", [], ["id", "name"]),
+              ("project.project", [], ["id", "name"])]
+
+    results = search._execute_searches("partners, products and projects", parsed, 10)
+
+    assert [model for model, _, _ in results] == ["res.partner", "product.product", "project.project"]
+    assert [records[0]["name"] for _, records, _ in results] == ["res.partner", "product.product", "project.project"]
+    assert discovery.max_active == 3
+
+
+class GroupDiscovery:
+    """Model discovery answering read_group calls with fixed groups."""
+
+    db, uid, password, client = "db", 1, "pwd", None
+
+    def __init__(self):
+        self.models_proxy = self
+        self.calls = []
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        self.calls.append((model, method, args, kwargs))
+        return [
+            {"partner_id": [1, "Azure Interior"], "__count": 2, "amount_residual_sum": 150.0},
+            {"partner_id": [2, "Deco Addict"], "__count": 3, "amount_residual_sum": 900.5},
+        ]
+
+
+def test_aggregate_uses_read_group_and_formats_groups():
+    """Aggregations issue one read_group call and render one row per group."""
+    discovery = GroupDiscovery()
+    search = make_search(discovery)
+
+    results = search.aggregate("account.move", [["payment_state", "!=", "paid"]], ["partner_id"],
+                               [("amount_residual", "sum")], limit=10)
+    results["query"] = "total unpaid bills per vendor"
+    output = search.format_results(results)
+
+    assert discovery.calls == [("account.move", "read_group",
+                                [[["payment_state", "!=", "paid"]],
+                                 ["amount_residual_sum:sum(amount_residual)"], ["partner_id"]],
+                                {"lazy": False, "limit": 10, "orderby": "amount_residual_sum desc"})]
+    assert [row["group"]["partner_id"][1] for row in results["groups"]] == ["Deco Addict", "Azure Interior"]
+    assert "| Deco Addict | 3 | 900.50 |" in output
+    assert "| **Total** | **5** | **1,050.50** |" in output
+
+
+class InvoiceDiscovery:
+    """Model discovery describing account.move for the query parser."""
+
+    db, uid, password, client = "db", 1, "pwd", None
+
+    def __init__(self):
+        self.models_proxy = self
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        if model == "ir.model":
+            return [{"model": "account.move", "name": "Invoice"}]
+        return [{"name": name, "field_description": name, "ttype": ttype, "relation": False}
+                for name, ttype in (("name", "char"), ("amount_total", "monetary"), ("partner_id", "many2one"))]
+
+
+def test_search_with_an_aggregate_word_returns_records():
+    """A search mentioning a total is answered with records, not read_group groups."""
+    discovery = FakeDiscovery()
+    search = make_search(discovery)
+    search.query_parser.parse_aggregate_query = QueryParser(InvoiceDiscovery()).parse_aggregate_query
+
+    results = search.search("show invoices with total over 1000", limit=5)
+
+    assert "groups" not in results and results["joined_records"]
+    assert all(model in ("res.partner", "sale.order") for model, _, _ in discovery.calls)
+
+
+def test_explain_reports_steps_and_rpcs():
+    """Explain mode lists the executed steps and every RPC, and restores the proxy."""
+    discovery = FakeDiscovery()
+    search = make_search(discovery)
+
+    results = search.search("sales orders for customer azure", limit=5, explain=True)
+    output = search.format_results(results)
+
+    explain = results["explain"]
+    assert [step["step"] for step in explain["steps"]] == ["parse", "search", "search", "execute", "join"]
+    assert explain["steps"][2]["strategy"] == "filtered by partner_id in 1 primary ids"
+    assert explain["steps"][2]["rows"] == 10
+    assert [(call["model"], call["rows"]) for call in explain["rpcs"]] == [("res.partner", 1), ("sale.order", 10)]
+    assert all(call["response_bytes"] > 0 for call in explain["rpcs"])
+    assert "## Query Plan" in output and "| sale.order | search_read |" in output
+    assert discovery.models_proxy is discovery
+
+
+def test_explain_does_not_trace_searches_of_other_threads():
+    """A search running on another thread while one is explained is not recorded in its trace."""
+    discovery = FakeDiscovery()
+    search = make_search(discovery)
+    other = threading.Thread(target=search.search, args=("sales orders for customer azure", 5))
+    execute_kw = discovery.execute_kw
+
+    def execute_kw_and_search_elsewhere(*args, **kwargs):
+        if not other.is_alive() and other.ident is None:
+            other.start()
+            other.join()
+        return execute_kw(*args, **kwargs)
+
+    discovery.execute_kw = execute_kw_and_search_elsewhere
+    results = search.search("sales orders for customer azure", limit=5, explain=True)
+
+    assert len(discovery.calls) == 4
+    assert [call["model"] for call in results["explain"]["rpcs"]] == ["res.partner", "sale.order"]
+
+
+def test_explain_traces_relationship_handler_rpcs():
+    """RPCs of the relationship handler go through the search's executor and are traced."""
+    discovery = FakeDiscovery()
+    search = make_search(discovery)
+    search._local.trace = trace = RpcTrace()
+
+    assert search.relationship_handler.get_relationship("res.partner", "crm.lead") is None
+
+    assert [(call["model"], call["method"]) for call in trace.calls] == [
+        ("ir.model.fields", "search_read"), ("ir.model.fields", "search_read"),
+        ("res.partner", "fields_get"), ("crm.lead", "fields_get")]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the bulk import backend of the Export/Import agent.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.agents.export_import.utils.bulk_importer import BulkImporter
+
+
+class FakePartnerModels:
+    """Minimal stand-in for the XML-RPC object proxy backed by an in-memory res.partner table."""
+
+    def __init__(self):
+        self.partners = {1: {"id": 1, "email": "azure@example.com", "name": "Azure Interior"}}
+        self.calls = []
+        self.next_id = 10
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        self.calls.append(method)
+        if method == "search":
+            ids = args[0][0][2]
+            return [pid for pid in ids if pid in self.partners]
+        if method == "search_read":
+            field, _, values = args[0][0]
+            return [{"id": p["id"], field: p[field]} for p in self.partners.values() if p.get(field) in values]
+        if method == "create":
+            if any(vals.get("name") == "invalid" for vals in args[0]):
+                raise ValueError("invalid name")
+            ids = []
+            for vals in args[0]:
+                self.partners[self.next_id] = dict(vals, id=self.next_id)
+                ids.append(self.next_id)
+                self.next_id += 1
+            return ids
+        if method == "write":
+            for pid in args[0]:
+                self.partners[pid].update(args[1])
+            return True
+        raise AssertionError(f"unexpected call {method}")
+
+
+def test_bulk_importer_batches_lookups_and_writes():
+    """Lookups, creates and writes are issued per batch and failing rows are isolated."""
+    models = FakePartnerModels()
+    importer = BulkImporter(models, "db", 1, "pwd", "res.partner", {"email": {}, "name": {}}, batch_size=50)
+    records = [
+        {"email": "azure@example.com", "name": "Azure"},
+        {"id": 1, "email": "azure@example.com", "name": "Azure"},
+        {"email": "deco@example.com", "name": "Deco Addict"},
+        {"name": "invalid"},
+        {"name": "Gemini Furniture"},
+    ]
+
+    result = importer.run(records)
+
+    assert result["created"] == 2
+    assert result["updated"] == 2
+    assert result["failed"] == 1
+    assert result["validation_errors"] == [{"record": {"name": "invalid"}, "error": "invalid name"}]
+    assert models.calls.count("search") == 1
+    assert models.calls.count("search_read") == 1
+    assert models.calls.count("write") == 1
+    assert models.partners[1]["name"] == "Azure"
+
+
+def test_bulk_importer_respects_import_options():
+    """Records are skipped when creating or updating is disabled."""
+    models = FakePartnerModels()
+    importer = BulkImporter(models, "db", 1, "pwd", "res.partner", {})
+
+    result = importer.run([{"id": 1, "name": "Azure"}, {"name": "New"}],
+                          create_if_not_exists=False, update_if_exists=False)
+
+    assert result["created"] == 0 and result["updated"] == 0
+    assert result["failed"] == 2
+    assert "create" not in models.calls and "write" not in models.calls
+
+
+def test_bulk_importer_folds_records_of_the_same_new_record():
+    """A later record with the unique key of a queued or created record updates it instead of duplicating it."""
+    models = FakePartnerModels()
+    importer = BulkImporter(models, "db", 1, "pwd", "res.partner", {"email": {}, "name": {}}, batch_size=2)
+    records = [
+        {"email": "deco@example.com", "name": "Deco"},
+        {"email": "deco@example.com", "name": "Deco Addict"},
+        {"email": "gemini@example.com", "name": "Gemini"},
+        {"email": "deco@example.com", "name": "Deco Addict Ltd"},
+    ]
+
+    # Records are consumed from an iterator batch by batch
+    result = importer.run(iter(records))
+
+    assert (result["created"], result["updated"], result["failed"]) == (2, 2, 0)
+    names = sorted(p["name"] for p in models.partners.values())
+    assert names == ["Azure Interior", "Deco Addict Ltd", "Gemini"]
+
+
+def test_get_model_fields_cache_expires(monkeypatch):
+    """Model metadata is cached per user and read again once FIELDS_CACHE_TTL has passed."""
+    from src.agents.export_import.utils import bulk_importer
+
+    calls = []
+
+    class FieldsModels:
+        def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+            calls.append(uid)
+            return {"name": {"type": "char"}}
+
+    bulk_importer.clear_fields_cache()
+    now = [1000.0]
+    monkeypatch.setattr(bulk_importer.time, "monotonic", lambda: now[0])
+    for uid in (1, 1, 2):
+        bulk_importer.get_model_fields(FieldsModels(), "http://odoo", "db", uid, "pwd", "res.partner")
+    assert calls == [1, 2]
+    now[0] += bulk_importer.FIELDS_CACHE_TTL + 1
+    bulk_importer.get_model_fields(FieldsModels(), "http://odoo", "db", 1, "pwd", "res.partner")
+    assert calls == [1, 2, 1]
+    bulk_importer.clear_fields_cache()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the batched OdooCSVImporter.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.odoo_tools.csv_import import OdooCSVImporter
+
+
+class FakeOdoo:
+    """In-memory res.partner table shared by all fake models proxies."""
+
+    def __init__(self):
+        self.partners = {1: {"id": 1, "ref": "P001", "name": "Azure Interior"}}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def proxy(self):
+        return FakeModelsProxy(self)
+
+
+class FakeModelsProxy:
+    """Stand-in for one XML-RPC models proxy."""
+
+    def __init__(self, odoo):
+        self.odoo = odoo
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        odoo = self.odoo
+        with odoo.lock:
+            odoo.calls.append(method)
+            if method == "search_read":
+                field, _, values = args[0][0]
+                return [{"id": p["id"], field: p[field]} for p in odoo.partners.values() if p.get(field) in values]
+            if method == "create":
+                if any(vals.get("name") == "invalid" for vals in args[0]):
+                    raise ValueError("invalid name")
+                ids = []
+                for vals in args[0]:
+                    new_id = max(odoo.partners) + 1
+                    odoo.partners[new_id] = dict(vals, id=new_id)
+                    ids.append(new_id)
+                return ids
+            if method == "write":
+                for pid in args[0]:
+                    odoo.partners[pid].update(args[1])
+                return True
+        raise AssertionError(f"unexpected call {method}")
+
+
+def make_importer(odoo):
+    importer = OdooCSVImporter.__new__(OdooCSVImporter)
+    importer.db, importer.uid, importer.password = "db", 1, "pwd"
+    importer.models = odoo.proxy()
+    importer._new_models_proxy = odoo.proxy
+    return importer
+
+
+def write_csv(tmp_path, rows):
+    path = tmp_path / "partners.csv"
+    path.write_text("ref,name,city\n" + "".join(f"{ref},{name},Fremont\n" for ref, name in rows))
+    return str(path)
+
+
+def test_process_batch_creates_and_writes_in_bulk(tmp_path):
+    """A batch issues one search_read, one create and one write per group of identical values."""
+    odoo = FakeOdoo()
+    path = write_csv(tmp_path, [("P001", "Azure"), ("P002", "Deco Addict"), ("P003", "invalid"), ("P004", "Gemini")])
+
+    result = make_importer(odoo).import_csv("res.partner", path, id_field="ref")
+
+    assert (result["total"], result["created"], result["updated"], result["failed"]) == (4, 2, 1, 1)
+    assert result["errors"] == [{"record": "P003", "error": "Failed to create record: invalid name"}]
+    assert odoo.calls.count("search_read") == 1
+    assert odoo.calls.count("write") == 1
+    assert odoo.partners[1]["name"] == "Azure"
+
+
+def test_concurrent_batches_count_like_sequential(tmp_path):
+    """Running batches concurrently gives the same counts and error order as running them in sequence."""
+    rows = [(f"P{i:03d}", "invalid" if i % 7 == 0 else f"Partner {i}") for i in range(1, 60)]
+    path = write_csv(tmp_path, rows)
+
+    sequential = make_importer(FakeOdoo()).import_csv("res.partner", path, id_field="ref", batch_size=5)
+    concurrent = make_importer(FakeOdoo()).import_csv("res.partner", path, id_field="ref", batch_size=5,
+                                                      concurrency=4)
+
+    assert concurrent == sequential
+    assert (sequential["created"], sequential["updated"], sequential["failed"]) == (50, 1, 8)
+
+
+def test_rows_with_the_same_key_update_the_record_they_create(tmp_path):
+    """Later rows with the key of a new record update it, within a batch and across concurrent batches."""
+    rows = [(f"P{i:03d}", f"Partner {i}") for i in range(2, 12)]
+    path = write_csv(tmp_path, rows + [("P002", "Partner 2 Ltd"), ("P011", "Partner 11 Ltd"), ("P005", "Partner 5 Ltd")])
+
+    for batch_size, concurrency in ((20, 1), (3, 4)):
+        odoo = FakeOdoo()
+        result = make_importer(odoo).import_csv("res.partner", path, id_field="ref", batch_size=batch_size,
+                                                concurrency=concurrency)
+        assert (result["created"], result["updated"], result["failed"]) == (10, 3, 0)
+        names = {p["ref"]: p["name"] for p in odoo.partners.values()}
+        assert len(odoo.partners) == 11
+        assert (names["P002"], names["P005"], names["P011"]) == ("Partner 2 Ltd", "Partner 5 Ltd", "Partner 11 Ltd")
+
+
+def test_executor_is_shut_down_when_a_batch_fails(tmp_path, monkeypatch):
+    """A batch raising while its result is collected still shuts the thread pool down."""
+    from src.odoo_tools import csv_import
+
+    shutdowns = []
+
+    class RecordingExecutor(csv_import.ThreadPoolExecutor):
+        def shutdown(self, *args, **kwargs):
+            shutdowns.append(True)
+            return super().shutdown(*args, **kwargs)
+
+    monkeypatch.setattr(csv_import, "ThreadPoolExecutor", RecordingExecutor)
+    importer = make_importer(FakeOdoo())
+    monkeypatch.setattr(importer, "_process_batch", lambda *args: (_ for _ in ()).throw(RuntimeError("boom")))
+    path = write_csv(tmp_path, [(f"P{i:03d}", "Partner") for i in range(2, 8)])
+
+    with pytest.raises(RuntimeError):
+        importer.import_csv("res.partner", path, id_field="ref", batch_size=2, concurrency=2)
+    assert shutdowns == [True]
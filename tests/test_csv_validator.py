@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the whole-file CSV validation engine.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.agents.export_import.utils.csv_validator import validate_csv_file, format_validation_summary
+
+ODOO_FIELDS = {
+    "name": {"type": "char", "required": True},
+    "ref": {"type": "char", "size": 4},
+    "qty": {"type": "integer"},
+    "price": {"type": "float"},
+    "active": {"type": "boolean"},
+    "date": {"type": "date"},
+    "state": {"type": "selection", "selection": [["draft", "Draft"], ["done", "Done"]]},
+}
+
+
+def test_validate_csv_file_reports_rows_per_column(tmp_path):
+    """Every row is checked and errors are summarized per column with file line numbers."""
+    path = tmp_path / "lines.csv"
+    path.write_text(
+        "name,ref,qty,price,active,date,state,note\n"
+        "Desk,D1,1,1.5,yes,2024-01-31,draft,x\n"
+        ",TOOLONG,2.5,abc,maybe,2024/01/31,bogus,y\n"
+        "Chair,,,3,n,31/01/2024,done,z\n"
+        "Lamp,L1,x,2,1,2024-02-30,,\n"
+    )
+    mapping = {column: column for column in ODOO_FIELDS}
+    mapping["note"] = "missing_field"
+
+    result = validate_csv_file(str(path), ODOO_FIELDS, mapping, chunksize=2)
+
+    assert not result["valid"]
+    assert result["total_rows"] == 4
+    assert result["error_count"] == 9
+    assert result["columns"]["qty"]["errors"] == {"type": {"count": 2, "rows": [3, 5]}}
+    assert result["columns"]["date"]["errors"] == {"type": {"count": 2, "rows": [3, 5]}}
+    assert "note" not in result["columns"]
+    assert "name -> name (required): 1 rows [3]" in format_validation_summary(result)
+
+
+def test_validate_csv_file_accepts_valid_file(tmp_path):
+    """A valid file passes, and required checks can be disabled for update-only imports."""
+    path = tmp_path / "partners.csv"
+    path.write_text("name,qty\nAzure,1\n,2\n")
+
+    assert validate_csv_file(str(path), ODOO_FIELDS, {"name": "name", "qty": "qty"}, check_required=False)["valid"]
+    assert not validate_csv_file(str(path), ODOO_FIELDS, {"name": "name", "qty": "qty"})["valid"]
+
+
+def test_validate_csv_file_reports_missing_columns(tmp_path):
+    """A mapped column missing from the file is reported instead of failing the read."""
+    path = tmp_path / "partners.csv"
+    path.write_text("name,qty\nAzure,1\n")
+
+    result = validate_csv_file(str(path), ODOO_FIELDS, {"name": "name", "qty": "qty", "Price": "price"})
+
+    assert not result["valid"]
+    assert result["total_rows"] == 1
+    assert result["columns"] == {"Price": {"odoo_field": "price", "odoo_type": "float",
+                                           "errors": {"missing": {"count": 1, "rows": [1]}}}}
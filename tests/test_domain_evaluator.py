@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the client-side domain evaluator and its use by the record cache.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from domain_evaluator import UnsupportedDomain, parse_domain, evaluate, covers
+from record_cache import RecordCache
+
+PARTNERS = {
+    1: {"id": 1, "name": "Azure Interior", "parent_id": False, "customer_rank": 3,
+        "category_id": [5], "active": True},
+    2: {"id": 2, "name": "Brandon Freeman", "parent_id": [1, "Azure Interior"], "customer_rank": 0,
+        "category_id": [], "active": True},
+    3: {"id": 3, "name": "Wood Corner", "parent_id": False, "customer_rank": 1,
+        "category_id": [5, 6], "active": True},
+    4: {"id": 4, "name": "Willie Burke", "parent_id": [3, "Wood Corner"], "customer_rank": 0,
+        "category_id": [6], "active": True},
+}
+
+
+def matching(domain, parent_of=None):
+    tree = parse_domain(domain)
+    return [record_id for record_id, record in PARTNERS.items() if evaluate(tree, record, parent_of)]
+
+
+def test_evaluate_supports_odoo_operators_and_prefix_notation():
+    assert matching([("name", "ilike", "wood")]) == [3]
+    assert matching([("name", "ilike", "w%corner")]) == [3]
+    assert matching([("name", "not ilike", "w")]) == [1, 2]
+    assert matching([("parent_id", "=", False)]) == [1, 3]
+    assert matching([("parent_id", "=", 1)]) == [2]
+    assert matching([("parent_id", "!=", 1)]) == [1, 3, 4]
+    assert matching([("category_id", "in", [6])]) == [3, 4]
+    assert matching([("id", "not in", [1, 2])]) == [3, 4]
+    assert matching([("customer_rank", ">", 0), ("customer_rank", "<", 3)]) == [3]
+    assert matching(["|", ("id", "=", 1), "&", ("name", "ilike", "w"), "!", ("id", "=", 3)]) == [1, 4]
+    assert matching([]) == [1, 2, 3, 4]
+
+    parents = {record_id: record["parent_id"][0] if record["parent_id"] else False
+               for record_id, record in PARTNERS.items()}
+    assert matching([("id", "child_of", 3)], lambda field, record_id: parents[record_id]) == [3, 4]
+    assert matching([("parent_id", "child_of", [1])], lambda field, record_id: parents[record_id]) == [2]
+
+    for domain in ([("id", "child_of", 3)], [("parent_id", "=", "Azure Interior")],
+                   [("parent_id.name", "ilike", "a")], [("parent_id", "ilike", "azure")],
+                   [("name", "=like", "A%")], ["&", ("id", "=", 1)]):
+        with pytest.raises(UnsupportedDomain):
+            matching(domain)
+
+
+def test_covers_recognizes_narrower_domains():
+    wide = parse_domain([("name", "ilike", "wood"), ("customer_rank", ">", 0)])
+    assert covers(wide, parse_domain([("customer_rank", ">", 0), ("name", "ilike", "Wood Corner")]))
+    assert covers(wide, parse_domain([("name", "ilike", "wood"), ("customer_rank", ">=", 2), ("id", "=", 3)]))
+    assert not covers(wide, parse_domain([("name", "ilike", "wood")]))
+    assert not covers(wide, parse_domain([("name", "ilike", "wo"), ("customer_rank", ">", 0)]))
+    assert covers(parse_domain([("id", "in", [1, 2, 3])]), parse_domain([("id", "in", [2, 3])]))
+    assert covers(parse_domain([]), parse_domain(["|", ("id", "=", 1), ("id", "=", 2)]))
+    # Naming the active field makes Odoo search archived records, which the wide search skipped
+    assert not covers(parse_domain([]), parse_domain([("active", "=", False)]))
+    assert not covers(parse_domain([("name", "ilike", "w")]), parse_domain(["|", ("active", "=", True),
+                                                                            ("active", "=", False)]))
+    assert covers(parse_domain([("active", "in", [True, False])]),
+                  parse_domain([("active", "in", [True, False]), ("id", "=", 1)]))
+
+
+def test_record_cache_answers_narrower_searches_locally():
+    calls = []
+
+    def execute(method, args, kwargs):
+        calls.append(method)
+        tree = parse_domain(args[0])
+        records = [dict(record) for record in PARTNERS.values() if evaluate(tree, record)]
+        return records[:kwargs["limit"]] if kwargs.get("limit") else records
+
+    cache = RecordCache(ttl=60)
+    fields = ["name", "parent_id", "customer_rank", "category_id"]
+    cache.search_read(execute, "res.partner", [("name", "ilike", "w")], {"fields": fields, "limit": 10})
+
+    narrower = cache.search_read(execute, "res.partner", [("name", "ilike", "wi"), ("parent_id", "!=", False)],
+                                 {"fields": ["name"], "limit": 10})
+    assert narrower == [{"id": 4, "name": "Willie Burke"}]
+    assert cache.search_read(execute, "res.partner", [("name", "ilike", "w")],
+                             {"fields": ["name"], "limit": 1}) == [{"id": 3, "name": "Wood Corner"}]
+    assert calls == ["search_read"]
+    assert cache.local_hits == 2
+
+    # Fields the cached search did not read, another order or a wider domain go to the server
+    cache.search_read(execute, "res.partner", [("name", "ilike", "wi")], {"fields": ["email"], "limit": 10})
+    cache.search_read(execute, "res.partner", [("name", "ilike", "wi")],
+                      {"fields": ["name"], "limit": 10, "order": "name desc"})
+    cache.search_read(execute, "res.partner", [], {"fields": ["name"], "limit": 10})
+    assert calls == ["search_read"] * 4
+
+    # A limited search that was cut off only answers when enough of its records match
+    cache.search_read(execute, "res.partner", [("customer_rank", ">=", 0)], {"fields": fields, "limit": 2})
+    assert cache.search_read(execute, "res.partner", [("customer_rank", ">=", 0), ("id", "=", 2)],
+                             {"fields": fields, "limit": 1})[0]["id"] == 2
+    assert len(calls) == 5
+    cache.search_read(execute, "res.partner", [("customer_rank", ">=", 0), ("id", "=", 4)],
+                      {"fields": fields, "limit": 1})
+    assert len(calls) == 6
+
+    # Archived records are only returned by searches naming the active field
+    cache.search_read(execute, "res.partner", [], {"fields": fields + ["active"], "limit": 10})
+    cache.search_read(execute, "res.partner", [("active", "=", False)], {"fields": ["name", "active"], "limit": 10})
+    assert len(calls) == 8
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the import helpers in scripts/dynamic_data_tool.py.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from scripts.dynamic_data_tool import (
+    AdaptiveBatchSizer,
+    DraftResetter,
+    ImportJournal,
+    RelationResolver,
+    build_line_commands,
+    read_existing_lines,
+    compile_parse_plans,
+    convert_chunk,
+    drop_unchanged,
+    execute_bisect,
+    find_duplicate_rows,
+    infer_date_format,
+    normalize_read_value,
+    plan_import_levels,
+)
+
+
+def test_normalize_read_value():
+    """Many2one pairs collapse to their id and False becomes None."""
+    assert normalize_read_value([7, "Azure Interior"]) == 7
+    assert normalize_read_value(False) is None
+    assert normalize_read_value("draft") == "draft"
+
+
+def test_build_line_commands_matches_on_unique_fields():
+    """Lines carrying a unique field update the matching line and create the rest."""
+    existing = [{"id": 10, "name": "Desk"}, {"id": 11, "name": "Chair"}]
+    commands = build_line_commands(
+        [{"name": "Chair", "quantity": 2}, {"name": "Lamp", "quantity": 1}],
+        existing,
+        ["name"],
+    )
+    assert commands == [
+        (1, 11, {"name": "Chair", "quantity": 2}),
+        (0, 0, {"name": "Lamp", "quantity": 1}),
+    ]
+
+
+def test_build_line_commands_positional_fallback():
+    """Without unique fields, lines are matched to existing lines by position."""
+    existing = [{"id": 10}, {"id": 11}]
+    commands = build_line_commands(
+        [{"quantity": 1}, {"quantity": 2}, {"quantity": 3}], existing, ["name"]
+    )
+    assert commands == [
+        (1, 10, {"quantity": 1}),
+        (1, 11, {"quantity": 2}),
+        (0, 0, {"quantity": 3}),
+    ]
+
+
+def test_read_existing_lines_only_reads_lines_an_import_can_update():
+    """Move lines computed by Odoo are never candidates, and no unique field reads only ids."""
+    calls = []
+
+    class Models:
+        def execute_kw(self, db, uid, pwd, model, method, args, kwargs):
+            calls.append((model, args[0], kwargs["fields"]))
+            return []
+
+    read_existing_lines(Models(), "db", 1, "pwd", "account.move.line", "move_id", 7, [])
+    read_existing_lines(Models(), "db", 1, "pwd", "sale.order.line", "order_id", 8, ["name"])
+
+    assert calls == [
+        ("account.move.line", [("move_id", "=", 7), ("display_type", "=", "product")], ["id"]),
+        ("sale.order.line", [("order_id", "=", 8)], ["name"]),
+    ]
+
+
+def test_execute_bisect_isolates_failing_rows():
+    """A failing row is isolated by bisection while the rest of the batch succeeds."""
+    calls = []
+
+    def execute(batch):
+        calls.append(len(batch))
+        if any(vals.get("bad") for _, vals in batch):
+            raise ValueError("invalid row")
+        return [ref * 10 for ref, _ in batch]
+
+    items = [(ref, {"bad": ref == 5}) for ref in range(1, 9)]
+    errors = []
+    succeeded, failed = execute_bisect(execute, items, errors, "res.partner")
+
+    assert failed == 1
+    assert [result for _, result in succeeded] == [10, 20, 30, 40, 60, 70, 80]
+    assert errors == [{"model": "res.partner", "row": 5, "error": "invalid row", "record": {"bad": True}}]
+    assert calls[0] == 8
+
+
+def test_adaptive_batch_sizer():
+    """Batches shrink on failures or slow calls and grow when healthy."""
+    sizer = AdaptiveBatchSizer(size=100, max_size=200, target_latency=2.0)
+    assert sizer.record(100, 0.5) == 150
+    assert sizer.record(150, 0.5) == 200
+    assert sizer.record(200, 0.5) == 200
+    assert sizer.record(200, 0.5, failures=1) == 100
+    assert sizer.record(100, 3.0) == 50
+
+
+def test_infer_date_format():
+    """The date format is inferred from a sample instead of tried per value."""
+    assert infer_date_format(["31/01/2024", "", "15/02/2024"]) == "%d/%m/%Y"
+    assert infer_date_format(["2024-01-31"]) == "%Y-%m-%d"
+    assert infer_date_format(["not a date"]) is None
+
+
+def test_compiled_plans_convert_chunk():
+    """Compiled column plans convert a chunk of rows column by column."""
+    meta = {
+        "qty": {"name": "qty", "ttype": "integer"},
+        "price": {"name": "price", "ttype": "float"},
+        "date": {"name": "date", "ttype": "date"},
+        "state": {"name": "state", "ttype": "selection"},
+        "active": {"name": "active", "ttype": "boolean"},
+    }
+    mapping = {"Qty": "qty", "Price": "price", "Date": "date", "State": "state", "Active": "active", "Note": "note"}
+    rows = [
+        {"Qty": "3", "Price": "1.5", "Date": "31/01/2024", "State": "draft", "Active": "yes", "Note": "x"},
+        {"Qty": "", "Price": "abc", "Date": "15/02/2024", "State": "bogus", "Active": "0", "Note": "False"},
+    ]
+    plans = compile_parse_plans(mapping, meta, {"state": ["draft", "done"]}, rows)
+
+    assert plans["Date"].date_format == "%d/%m/%Y"
+    assert plans["State"].selection == frozenset({"draft", "done"})
+    assert convert_chunk(plans, rows) == [
+        {"qty": 3, "price": 1.5, "date": "2024-01-31", "state": "draft", "active": True, "note": "x"},
+        {"date": "2024-02-15", "active": False},
+    ]
+
+
+
+def test_integer_columns_convert_like_int():
+    """Integer cells convert exactly and non-integral values are rejected, as per-cell int() does."""
+    plan = compile_parse_plans({"Qty": "qty"}, {"qty": {"name": "qty", "ttype": "integer"}}, {})["Qty"]
+    values = ["-4", "2.5", "1.0", "9007199254740993", "", "+7"]
+
+    assert plan.convert_many(values) == [-4, None, None, 9007199254740993, None, 7]
+    assert plan.convert_many(values) == [plan.convert(value) for value in values]
+
+
+class FakePartnerModels:
+    """Minimal stand-in for the XML-RPC object proxy serving res.partner lookups."""
+
+    partners = {1: "Azure Interior", 2: "Deco Addict", 3: "Gemini Furniture"}
+
+    def __init__(self):
+        self.calls = []
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        self.calls.append(method)
+        if method == "fields_get":
+            return {"name": {"type": "char"}}
+        if method == "search_read":
+            names = args[0][0][2]
+            return [{"id": pid, "name": name} for pid, name in self.partners.items() if name in names]
+        if method == "name_search":
+            term = args[0][0].lower()
+            return [(pid, name) for pid, name in self.partners.items() if term in name.lower()][:1]
+        raise AssertionError(f"unexpected call {method}")
+
+
+def test_relation_resolver_bulk_and_memoized():
+    """Distinct names are resolved in one search_read, misses use name_search, and all results are memoized."""
+    models = FakePartnerModels()
+    plans = compile_parse_plans(
+        {"Customer": "partner_id", "Tags": "category_ids"},
+        {
+            "partner_id": {"name": "partner_id", "ttype": "many2one", "relation": "res.partner"},
+            "category_ids": {"name": "category_ids", "ttype": "many2many", "relation": "res.partner"},
+        },
+        {},
+        resolver=RelationResolver(models, "db", 1, "pwd"),
+    )
+    rows = [
+        {"Customer": "Azure Interior", "Tags": "Deco Addict, 3"},
+        {"Customer": "Azure Interior", "Tags": "gemini"},
+        {"Customer": "Unknown", "Tags": ""},
+    ]
+
+    assert convert_chunk(plans, rows) == [
+        {"partner_id": 1, "category_ids": [(6, 0, [2, 3])]},
+        {"partner_id": 1, "category_ids": [(6, 0, [3])]},
+        {},
+    ]
+    assert models.calls.count("search_read") == 2
+    assert models.calls.count("name_search") == 2
+
+    convert_chunk(plans, rows)
+    assert models.calls.count("search_read") == 2
+    assert models.calls.count("name_search") == 2
+
+
+class FakeReadModels:
+    """Stand-in for the object proxy answering read calls from fixed records."""
+
+    records = {
+        1: {"id": 1, "name": "Azure Interior", "parent_id": [5, "Azure"], "category_id": [2, 3], "credit_limit": 10.0},
+        2: {"id": 2, "name": "Deco Addict", "parent_id": False, "category_id": [], "credit_limit": 0.0},
+    }
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        assert method == "read"
+        return [dict(self.records[rid]) for rid in args[0] if rid in self.records]
+
+
+def test_drop_unchanged_diffs_against_current_values():
+    """Unchanged fields are dropped and rows without changes are reported separately."""
+    items = [
+        (2, 1, {"name": "Azure Interior", "parent_id": 5, "category_id": [(6, 0, [3, 2])], "credit_limit": 10}),
+        (3, 2, {"name": "Deco Addict", "parent_id": None, "credit_limit": 25.0}),
+        (4, 9, {"name": "Unknown"}),
+    ]
+    changed, unchanged = drop_unchanged(FakeReadModels(), "db", 1, "pwd", "res.partner", items)
+
+    assert changed == [(3, 2, {"credit_limit": 25.0}), (4, 9, {"name": "Unknown"})]
+    assert [item[:2] for item in unchanged] == [(2, 1)]
+
+
+def test_find_duplicate_rows(tmp_path):
+    """Rows matching the same record collapse to the first or last occurrence, case-sensitively by default."""
+    path = tmp_path / "partners.csv"
+    path.write_text(
+        "name,email,city\n"
+        "Azure Interior,azure@example.com,Fremont\n"
+        "Deco Addict,,Pleasant Hill\n"
+        "Azure  interior,AZURE@example.com ,Fremont\n"
+        "Deco Addict,,Walnut Creek\n"
+        "Gemini Furniture,,Fairfield\n"
+    )
+    mapping = {"name": "name", "email": "email", "city": "city"}
+
+    # Emails are matched with =, so a differently cased email is only reported
+    assert find_duplicate_rows(str(path), mapping, ["email", "name"], policy="last") == ({3}, 1, [(4, 2, "email")])
+    assert find_duplicate_rows(str(path), mapping, ["email", "name"], policy="first") == ({5}, 1, [(4, 2, "email")])
+    assert find_duplicate_rows(str(path), mapping, ["email", "name"], policy="first",
+                               fold_case=True) == ({4, 5}, 1, [])
+    assert find_duplicate_rows(str(path), mapping, [], policy="first") == (set(), 0, [])
+
+
+def test_plan_import_levels_orders_by_dependencies():
+    """Files referencing a model are planned after the files importing that model."""
+    specs = [
+        {"file": "orders.csv", "model": "sale.order"},
+        {"file": "partners.csv", "model": "res.partner"},
+        {"file": "countries.csv", "model": "res.country"},
+        {"file": "tags.csv", "model": "res.partner.category"},
+    ]
+    dependencies = [{"res.partner"}, {"res.country", "res.partner.category"}, set(), set()]
+
+    levels = plan_import_levels(specs, dependencies)
+
+    assert [[spec["file"] for spec in level] for level in levels] == [
+        ["countries.csv", "tags.csv"], ["partners.csv"], ["orders.csv"]]
+
+
+class FakeMoveModels:
+    """Stand-in for the object proxy serving account.move state changes."""
+
+    def __init__(self):
+        self.states = {1: "posted", 2: "draft", 3: "posted"}
+        self.calls = []
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        self.calls.append((method, list(args[0])))
+        if method == "read":
+            return [{"id": i, "state": self.states[i]} for i in args[0]]
+        for i in args[0]:
+            self.states[i] = "draft" if method == "button_draft" else "posted"
+        return True
+
+
+def test_draft_resetter_batches_reset_and_repost():
+    """Posted moves of a batch are reset with one call and posted again with one call."""
+    models = FakeMoveModels()
+    resetter = DraftResetter(models, "db", 1, "pwd")
+
+    assert resetter.prepare([1, 2, 3, 1]) == set()
+    assert resetter.prepare([3]) == set()
+    assert models.states == {1: "draft", 2: "draft", 3: "draft"}
+    assert resetter.repost() == 2
+    assert models.calls == [("read", [1, 2, 3]), ("button_draft", [1, 3]), ("action_post", [1, 3])]
+
+    models.states[2] = "posted"
+    assert DraftResetter(models, "db", 1, "pwd", reset_to_draft=False).prepare([2]) == {2}
+
+
+class FakeXmlidModels:
+    """Stand-in for the object proxy storing ir.model.data records in memory."""
+
+    def __init__(self):
+        self.xmlids = []
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        assert model == "ir.model.data"
+        if method == "create":
+            self.xmlids.extend(args[0])
+            return list(range(1, len(args[0]) + 1))
+        if method == "search_read":
+            names = args[0][2][2]
+            return [{"name": x["name"], "res_id": x["res_id"]} for x in self.xmlids if x["name"] in names]
+        raise AssertionError(f"unexpected call {method}")
+
+
+def test_import_journal_skips_completed_rows(tmp_path):
+    """Journaled rows are found again by a later run, from the file or from their external ids."""
+    rows = [{"name": "Azure Interior"}, {"name": "Deco Addict"}]
+    hashes = [ImportJournal.row_hash(row) for row in rows]
+    assert hashes[0] == ImportJournal.row_hash({"name": "Azure Interior"})
+
+    models = FakeXmlidModels()
+    journal = ImportJournal(str(tmp_path / "journal.db"), "res.partner", models, "db", 1, "pwd", xmlid_module="csv_import")
+    assert journal.completed(hashes) == {}
+    journal.record([(hashes[0], 7)], created=True)
+    journal.close()
+    assert models.xmlids[0]["module"] == "csv_import"
+
+    journal = ImportJournal(str(tmp_path / "journal.db"), "res.partner", models, "db", 1, "pwd", xmlid_module="csv_import")
+    assert journal.batch == 1
+    assert journal.completed(hashes) == {hashes[0]: 7}
+    journal.close()
+
+    # A lost journal file is rebuilt from the external ids
+    journal = ImportJournal(str(tmp_path / "other.db"), "res.partner", models, "db", 1, "pwd", xmlid_module="csv_import")
+    assert journal.completed(hashes) == {hashes[0]: 7}
+    assert journal.completed([hashes[0]]) == {hashes[0]: 7}
+    journal.close()
+
+    # A failing external id lookup leaves the rows found in the journal file
+    class FailingModels:
+        def execute_kw(self, *args):
+            raise ConnectionError("server unreachable")
+
+    journal = ImportJournal(str(tmp_path / "journal.db"), "res.partner", FailingModels(), "db", 1, "pwd",
+                            xmlid_module="csv_import")
+    assert journal.completed(hashes) == {hashes[0]: 7}
+    journal.close()
+
+
+class FakePartnerServer:
+    """In-memory res.partner table answering the calls of import_model."""
+
+    def __init__(self):
+        self.partners = {1: {"id": 1, "name": "Azure Interior", "email": "azure@example.com"}}
+        self.calls = []
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        self.calls.append((model, method))
+        if model == "ir.model.fields":
+            return [{"name": "name", "ttype": "char", "relation": False, "required": True, "readonly": False},
+                    {"name": "email", "ttype": "char", "relation": False, "required": False, "readonly": False}]
+        if method == "fields_get":
+            return {"name": {"type": "char"}}
+        if model != "res.partner":
+            return []
+        if method == "search_read":
+            field, _, values = args[0][0]
+            return [{"id": p["id"], field: p[field]} for p in self.partners.values() if p.get(field) in values]
+        if method == "create":
+            ids = []
+            for vals in args[0]:
+                record_id = max(self.partners) + 1
+                self.partners[record_id] = dict(vals, id=record_id)
+                ids.append(record_id)
+            return ids
+        if method == "read":
+            return [dict(self.partners[record_id]) for record_id in args[0]]
+        if method == "write":
+            for record_id in args[0]:
+                self.partners[record_id].update(args[1])
+            return True
+        raise AssertionError(f"unexpected call {method}")
+
+
+@pytest.mark.parametrize("batch_size", [2, 100])
+def test_import_model_folds_rows_of_the_same_new_record(tmp_path, monkeypatch, batch_size):
+    """A later row with the unique key of a queued or created record updates it instead of creating a duplicate."""
+    import argparse
+    import scripts.dynamic_data_tool as tool
+
+    server = FakePartnerServer()
+    monkeypatch.setattr(tool, "connect", lambda: (server, "db", 1, "pwd"))
+    path = tmp_path / "partners.csv"
+    path.write_text("name,email\n"
+                    "Azure,azure@example.com\n"
+                    "Deco,deco@example.com\n"
+                    "Gemini,gemini@example.com\n"
+                    "Deco Addict,deco@example.com\n"
+                    "Gemini Furniture,gemini@example.com\n")
+    args = argparse.Namespace(model="res.partner", input=str(path), field_mapping={"name": "name", "email": "email"},
+                              update=True, force=False, match_field="id", batch_size=batch_size)
+
+    result = tool.import_model(args)
+
+    assert (result["created_count"], result["updated_count"], result["error_count"]) == (2, 3, 0)
+    assert sorted(p["name"] for p in server.partners.values()) == ["Azure", "Deco Addict", "Gemini Furniture"]
+    # One existence lookup per chunk and unique field with values (email, name), not one per row
+    assert server.calls.count(("res.partner", "search_read")) == 2
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the local entity name index.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from entity_index import EntityIndex, TrigramIndex
+
+
+class FakePartnerDiscovery:
+    """Model discovery serving res.partner display names with write dates."""
+
+    db, uid, password, client = "db", 1, "pwd", None
+
+    def __init__(self):
+        self.models_proxy = self
+        self.partners = {
+            1: {"display_name": "Azure Interior", "write_date": "2025-01-01 10:00:00", "active": True},
+            2: {"display_name": "Wood Corner", "write_date": "2025-01-02 10:00:00", "active": True},
+            3: {"display_name": "Wood Corner, Willie Burke", "write_date": "2025-01-03 10:00:00", "active": True},
+        }
+        self.domains = []
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        if method == "fields_get":
+            return {"display_name": {}, "active": {}}
+        domain = args[0]
+        self.domains.append(domain)
+        since = domain[0][2] if domain else ""
+        records = [dict(values, id=pid) for pid, values in self.partners.items() if values["write_date"] >= since]
+        records.sort(key=lambda r: (r["write_date"], r["id"]))
+        return records[kwargs["offset"]:kwargs["offset"] + kwargs["limit"]]
+
+
+def test_trigram_search_tolerates_misspellings():
+    """Exact names rank first and misspelled names still resolve."""
+    index = TrigramIndex("res.partner")
+    index.add(1, "Azure Interior")
+    index.add(2, "Wood Corner")
+    index.add(3, "Wood Corner, Willie Burke")
+
+    assert [pid for pid, _ in index.search("wood corner")] == [2, 3]
+    assert [pid for pid, _ in index.search("azure interor")] == [1]
+    assert index.search("deco addict") == []
+
+
+def test_entity_index_refreshes_incrementally():
+    """Refreshes read the records written since the last one and drop archived ones."""
+    discovery = FakePartnerDiscovery()
+    entity_index = EntityIndex(discovery, ["res.partner"], refresh_interval=0)
+
+    assert entity_index.resolve("res.partner", "Azure Interior") == [1]
+
+    discovery.partners[1].update(display_name="Azure Interior Designs", write_date="2025-02-01 10:00:00")
+    discovery.partners[2].update(active=False, write_date="2025-02-01 11:00:00")
+
+    assert entity_index.resolve("res.partner", "azure designs") == [1]
+    assert entity_index.resolve("res.partner", "wood corner") == [3]
+    assert discovery.domains[:2] == [[], [("write_date", ">=", "2025-01-03 10:00:00")]]
+    assert entity_index.resolve("product.product", "desk") == []
+
+
+def test_entity_index_rebuilds_in_the_background(monkeypatch):
+    """A due full rebuild runs on a proxy of its own while the current index keeps answering."""
+    import entity_index as entity_index_module
+
+    discovery = FakePartnerDiscovery()
+    discovery.url = "http://odoo"
+    release = threading.Event()
+    rebuilt = threading.Event()
+
+    class RebuildProxy:
+        def execute_kw(self, *args):
+            release.wait(5)
+            try:
+                return discovery.execute_kw(*args)
+            finally:
+                rebuilt.set()
+
+    monkeypatch.setattr(entity_index_module.xmlrpc.client, "ServerProxy", lambda *args, **kwargs: RebuildProxy())
+    entity_index = EntityIndex(discovery, ["res.partner"], full_refresh_interval=0)
+    assert entity_index.resolve("res.partner", "Azure Interior") == [1]
+
+    del discovery.partners[1]
+    assert entity_index.resolve("res.partner", "Azure Interior") == [1]
+    release.set()
+    assert rebuilt.wait(5)
+    for _ in range(100):
+        if not entity_index._rebuilding:
+            break
+        time.sleep(0.01)
+    assert entity_index.indexes["res.partner"].search("Azure Interior") == []
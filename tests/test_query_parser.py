@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the aggregation path of QueryParser.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from query_parser import QueryParser
+
+MODELS = [
+    {"model": "account.move", "name": "Journal Entry"},
+    {"model": "res.partner", "name": "Contact"},
+    {"model": "sale.order", "name": "Sales Order"},
+]
+
+FIELDS = {
+    "account.move": [
+        ("name", "Number", "char", False),
+        ("partner_id", "Partner", "many2one", "res.partner"),
+        ("invoice_date", "Invoice/Bill Date", "date", False),
+        ("move_type", "Type", "selection", False),
+        ("state", "Status", "selection", False),
+        ("payment_state", "Payment Status", "selection", False),
+        ("amount_total", "Total", "monetary", False),
+        ("amount_residual", "Amount Due", "monetary", False),
+    ],
+    "res.partner": [
+        ("name", "Name", "char", False),
+        ("email", "Email", "char", False),
+        ("customer_rank", "Customer Rank", "integer", False),
+    ],
+}
+
+
+class FakeDiscovery:
+    """Model discovery serving ir.model and ir.model.fields from memory."""
+
+    db, uid, password, client = "db", 1, "pwd", None
+
+    def __init__(self):
+        self.models_proxy = self
+
+    def execute_kw(self, db, uid, pwd, model, method, args, kwargs=None):
+        if model == "ir.model":
+            return MODELS
+        model_name = args[0][0][2]
+        return [{"name": name, "field_description": string, "ttype": ttype, "relation": relation}
+                for name, string, ttype, relation in FIELDS.get(model_name, [])]
+
+
+def test_parse_aggregate_query_sums_unpaid_bills_per_vendor():
+    """Sum intents use the amount due of unpaid bills and group on the partner."""
+    parser = QueryParser(FakeDiscovery())
+
+    spec = parser.parse_aggregate_query("Total unpaid bills per vendor")
+
+    assert spec["model"] == "account.move"
+    assert spec["groupby"] == ["partner_id"]
+    assert spec["measures"] == [("amount_residual", "sum")]
+    assert ["move_type", "in", ["in_invoice", "in_refund"]] in spec["domain"]
+    assert ["payment_state", "!=", "paid"] in spec["domain"]
+    assert ["state", "=", "paid"] not in spec["domain"]
+
+
+def test_parse_aggregate_query_counts_by_date_granularity():
+    """Count intents have no measure and date terms group on a date field."""
+    parser = QueryParser(FakeDiscovery())
+
+    spec = parser.parse_aggregate_query("number of invoices by month and status")
+
+    assert spec["model"] == "account.move"
+    assert spec["groupby"] == ["invoice_date:month", "state"]
+    assert spec["measures"] == []
+    assert parser.parse_aggregate_query("list all customer invoices") is None
+    # An aggregate word that does not lead the query is part of a search, even with a group-by clause
+    assert parser.parse_aggregate_query("invoices with total over 1000") is None
+    assert parser.parse_aggregate_query("show invoices with total over 1000") is None
+    assert parser.parse_aggregate_query("invoices by vendor with total over 1000") is None
+    assert parser.parse_aggregate_query("number of invoices with total over 1000")["measures"] == []
+    assert parser.parse_aggregate_query("what is the total of unpaid bills")["measures"] == [("amount_residual", "sum")]
+
+
+def test_state_filters_match_whole_words():
+    """State terms match whole words, and payment terms never filter the document state."""
+    parser = QueryParser(FakeDiscovery())
+    fields = parser._get_model_fields_dynamic("account.move")
+
+    assert parser._handle_state_filters("unpaid bills", "account.move", fields) == [["payment_state", "!=", "paid"]]
+    assert parser._handle_state_filters("paid invoices", "account.move", fields) == []
+    assert parser._handle_state_filters("posted invoices", "account.move", fields) == [["state", "=", "posted"]]
+    assert parser._handle_state_filters("drafted invoices", "account.move", fields) == []
+
+
+def test_plan_cache_reuses_plans_of_same_shaped_queries():
+    """A query differing only by its entity value is answered from the plan cache."""
+    parser = QueryParser(FakeDiscovery())
+
+    first = parser.parse_complex_query("List all sales orders for customer azure interior")
+    second = parser.parse_complex_query("List all sales orders for customer Deco Addict")
+
+    assert parser.plan_cache.hits == 1
+    assert first[0][1] == [["name", "ilike", "azure interior"], ["customer_rank", ">", 0]]
+    assert second[0][1] == [["name", "ilike", "deco addict"], ["customer_rank", ">", 0]]
+    assert [model for model, _, _ in second] == ["res.partner", "sale.order"]
+
+    # Returned plans are independent copies
+    second[1][2].append("note")
+    assert "note" not in parser.parse_complex_query("List all sales orders for customer gemini")[1][2]
+
+    # Values with special handling are parsed again
+    special = parser.parse_complex_query("List all sales orders for customer gemini furniture")
+    assert special[0][1][0] == ["name", "ilike", "Gemini Furniture"]
+
+
+def test_identify_model_prefers_longest_term():
+    """The longest matching term decides the model, not the mapping order."""
+    parser = QueryParser(FakeDiscovery())
+
+    assert parser._identify_model("list all sales orders") == "sale.order"
+    assert parser._identify_model("show journal entries of customer invoices") == "account.move"
+    assert parser._identify_model("contacts to remove") == "res.partner"
+
+
+class FakeEntityIndex:
+    """Entity index resolving names to fixed ids."""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    def resolve(self, model_name, text, limit=20):
+        return self.matches.get(text, [])[:limit]
+
+
+def test_resolve_entities_keeps_ilike_of_names_matching_too_many_records():
+    """Names are replaced by their ids only when the index returns all of their matches."""
+    parser = QueryParser(FakeDiscovery(), entity_index=FakeEntityIndex({"azure": [7], "wood": list(range(1, 41))}))
+
+    resolved = parser._resolve_entities(
+        ("account.move", [["partner_id", "ilike", "azure"], ["partner_id", "ilike", "wood"]], ["name"]))
+
+    assert resolved[1] == [["partner_id", "in", [7]], ["partner_id", "ilike", "wood"]]
+
+
+def test_parser_rpcs_go_through_the_given_executor():
+    """With an executor, the parser's ir.model and ir.model.fields lookups are sent through it."""
+    discovery = FakeDiscovery()
+    calls = []
+
+    def execute(model, method, args, kwargs):
+        calls.append((model, method))
+        return discovery.execute_kw("db", 1, "pwd", model, method, args, kwargs)
+
+    parser = QueryParser(discovery, execute=execute)
+    parser._get_model_fields_dynamic("account.move")
+
+    assert calls == [("ir.model", "search_read"), ("ir.model.fields", "search_read")]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the in-process record cache.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from record_cache import RecordCache
+
+
+class FakePartners:
+    """Executor serving res.partner records and recording the calls."""
+
+    def __init__(self):
+        self.records = {
+            1: {"id": 1, "name": "Azure Interior", "email": "azure@example.com"},
+            2: {"id": 2, "name": "Wood Corner", "email": "wood@example.com"},
+            3: {"id": 3, "name": "Deco Addict", "email": "deco@example.com"},
+        }
+        self.calls = []
+
+    def __call__(self, method, args, kwargs):
+        self.calls.append((method, args))
+        fields = kwargs.get("fields") or ["name", "email"]
+        if method == "search_read":
+            ids = [record_id for record_id, record in self.records.items()
+                   if not args[0] or args[0][0][2].lower() in record["name"].lower()]
+        else:
+            ids = [record_id for record_id in args[0] if record_id in self.records]
+        return [dict({"id": record_id}, **{field: self.records[record_id][field] for field in fields})
+                for record_id in ids]
+
+
+def test_record_cache_serves_repeated_searches_and_invalidates_writes():
+    cache = RecordCache(ttl=60)
+    execute = FakePartners()
+    params = {"fields": ["name"], "limit": 10}
+
+    first = cache.search_read(execute, "res.partner", [("name", "ilike", "r")], params)
+    first[0]["name"] = "Changed by the caller"
+    second = cache.search_read(execute, "res.partner", [("name", "ilike", "r")], params)
+    assert [record["name"] for record in second] == ["Azure Interior", "Wood Corner"]
+    assert len(execute.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Records are shared with reads by id for the same field set only
+    assert cache.read(execute, "res.partner", [2, 1], {"fields": ["name"]})[0]["name"] == "Wood Corner"
+    assert len(execute.calls) == 1
+    cache.read(execute, "res.partner", [2], {"fields": ["email"]})
+    assert len(execute.calls) == 2
+
+    # A write drops the record and the searches of its model
+    execute.records[2]["name"] = "Wood Corner Ltd"
+    cache.invalidate_for_method("res.partner", "write", [[2], {"name": "Wood Corner Ltd"}])
+    third = cache.search_read(execute, "res.partner", [("name", "ilike", "r")], params)
+    assert third[1]["name"] == "Wood Corner Ltd"
+    assert execute.calls[-1][0] == "search_read"
+
+    # Reads never invalidate, workflow methods clear everything
+    cache.invalidate_for_method("res.partner", "read", [[1]])
+    assert cache.stats()["entries"] > 0
+    cache.invalidate_for_method("sale.order", "action_confirm", [[7]])
+    assert cache.stats()["entries"] == 0
+
+
+def test_record_cache_respects_size_bound_and_rereads_evicted_records():
+    execute = FakePartners()
+    params = {"fields": ["name", "email"]}
+    probe = RecordCache(ttl=60)
+    probe.search_read(execute, "res.partner", [], params)
+    search_size = probe.stats()["bytes"]
+
+    # Room for the search entry and one record fewer than it returned
+    cache = RecordCache(ttl=60, max_bytes=search_size - 40)
+    cache.search_read(execute, "res.partner", [], params)
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.evictions > 0
+
+    execute.calls.clear()
+    records = cache.search_read(execute, "res.partner", [], params)
+    assert [record["id"] for record in records] == [1, 2, 3]
+    assert [method for method, _ in execute.calls] in (["read"], ["search_read"])
+
+    disabled = RecordCache(ttl=0)
+    disabled.search_read(execute, "res.partner", [], params)
+    disabled.search_read(execute, "res.partner", [], params)
+    assert disabled.stats()["entries"] == 0
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for RelationshipHandler.join_results.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from relationship_handler import RelationshipHandler
+
+
+def test_join_one2many_matches_pairs_ids_and_text_tokens():
+    """Targets are matched by [id, name] pairs, bare ids and invoice origin tokens."""
+    handler = RelationshipHandler(model_discovery=None)
+    partners = [{"id": 1, "name": "Azure"}, {"id": 2, "name": "Deco"}, {"id": None, "name": "Draft"}]
+    orders = [
+        {"id": 10, "partner_id": [1, "Azure"]},
+        {"id": 11, "partner_id": 2},
+        {"id": 12, "partner_id": False},
+        {"id": 13, "partner_id": [1, "Azure"]},
+    ]
+
+    joined = handler.join_results(partners, orders, handler.get_relationship("res.partner", "sale.order"))
+
+    assert [[o["id"] for o in record["related_records"]] for record in joined] == [[10, 13], [11]]
+
+    moves = [{"id": 20, "invoice_origin": "S00012, S00015"}, {"id": 21, "invoice_origin": "S000121"}]
+    relationship = {"from_field": "name", "to_field": "invoice_origin", "relation_type": "one2many",
+                    "special": "text_match"}
+    joined = handler.join_results([{"name": "S00012"}, {"name": "S00015"}], moves, relationship)
+
+    assert [[m["id"] for m in record["related_records"]] for record in joined] == [[20], [20]]
+
+
+def test_join_many2one_and_many2many():
+    """many2one keeps the first matching source; many2many keeps target order."""
+    handler = RelationshipHandler(model_discovery=None)
+    lines = [{"id": 1, "order_id": [5, "S5"]}, {"id": 2, "order_id": [5, "S5"]}, {"id": 3, "order_id": [6, "S6"]}]
+    orders = [{"id": 5}, {"id": 7}]
+    relationship = {"from_field": "order_id", "to_field": "id", "relation_type": "many2one"}
+
+    joined = handler.join_results(lines, orders, relationship)
+
+    assert [(r["id"], r["related_record"] and r["related_record"]["id"]) for r in joined] == [(5, 1), (7, None)]
+
+    tags = [{"id": 3}, {"id": 1}, {"id": 2}]
+    relationship = {"from_field": "category_id", "to_field": "id", "relation_type": "many2many"}
+    joined = handler.join_results([{"id": 9, "category_id": [2, 3, 3]}], tags, relationship)
+
+    assert [t["id"] for t in joined[0]["related_records"]] == [3, 2]
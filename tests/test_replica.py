@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the local SQLite replica of Odoo models.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import replica as replica_module
+from domain_evaluator import parse_domain, evaluate
+from replica import OdooReplica, parse_replica_models
+
+FIELDS = {
+    "name": {"type": "char", "store": True},
+    "partner_id": {"type": "many2one", "store": True},
+    "amount_total": {"type": "monetary", "store": True},
+    "state": {"type": "selection", "store": True},
+    "order_line": {"type": "one2many", "store": True},
+    "display_name": {"type": "char", "store": False},
+    "write_date": {"type": "datetime", "store": True},
+}
+
+
+class FakeOrders:
+    """Models proxy serving sale.order records and recording the calls."""
+
+    def __init__(self):
+        self.records = {
+            1: {"id": 1, "name": "S00001", "partner_id": [7, "Azure Interior"], "amount_total": 100.0,
+                "state": "sale", "order_line": [11], "write_date": "2024-01-01 10:00:00.250000"},
+            2: {"id": 2, "name": "S00002", "partner_id": [8, "Wood Corner"], "amount_total": 250.0,
+                "state": "draft", "order_line": [], "write_date": "2024-01-01 10:00:00.250000"},
+            3: {"id": 3, "name": "S00003", "partner_id": False, "amount_total": 75.5,
+                "state": "sale", "order_line": [], "write_date": "2024-01-02 09:00:00.500000"},
+        }
+        self.calls = []
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs):
+        self.calls.append((method, args))
+        if method == "fields_get":
+            return FIELDS
+        tree = parse_domain(args[0])
+        records = [record for record in self.records.values() if evaluate(tree, record)]
+        if method == "search_count":
+            return len(records)
+        if method == "search":
+            return [record["id"] for record in records]
+        if kwargs["order"] == "write_date desc":
+            records.sort(key=lambda record: (record["write_date"], record["id"]), reverse=True)
+        else:
+            records.sort(key=lambda record: record["id"])
+        # Odoo stores write_date with microseconds but returns whole seconds
+        return [dict({"id": record["id"]}, **{field: record[field][:19] if field == "write_date" else record[field]
+                                               for field in kwargs["fields"]})
+                for record in records[:kwargs["limit"]]]
+
+
+class FakeDiscovery:
+    def __init__(self, proxy):
+        self.client = None
+        self.url = None
+        self.db, self.uid, self.password = "odoo", 2, "admin"
+        self.models_proxy = proxy
+
+
+@pytest.fixture
+def orders(tmp_path, monkeypatch):
+    monkeypatch.setattr(replica_module, "REPLICA_BATCH_SIZE", 2)
+    proxy = FakeOrders()
+    replica = OdooReplica(FakeDiscovery(proxy), str(tmp_path / "replica.db"), {"sale.order": None})
+    return proxy, replica
+
+
+def test_parse_replica_models():
+    assert parse_replica_models("sale.order: name, amount_total ;res.partner;") == {
+        "sale.order": ["name", "amount_total"], "res.partner": None}
+
+
+def test_replica_exports_then_syncs_changes_and_deletions(orders):
+    proxy, replica = orders
+    assert replica.sync("sale.order") == {"model": "sale.order", "read": 3, "deleted": 0, "records": 3,
+                                          "full": True}
+    columns, rows = replica.query("SELECT id, partner_id, partner_id_name, amount_total FROM sale_order ORDER BY id")
+    assert columns == ["id", "partner_id", "partner_id_name", "amount_total"]
+    assert rows == [(1, 7, "Azure Interior", 100.0), (2, 8, "Wood Corner", 250.0), (3, None, None, 75.5)]
+    # Stored scalar fields only, paged by id within the write_date window
+    assert "order_line" not in replica.status()[0]["columns"]
+    assert [args[0] for method, args in proxy.calls if method == "search_read"][1:] == [
+        [("write_date", "<", "2024-01-02 09:00:01"), ("id", ">", 0)],
+        [("write_date", "<", "2024-01-02 09:00:01"), ("id", ">", 2)],
+    ]
+
+    # Only records written since the last sync are read again
+    proxy.records[2].update(state="sale", write_date="2024-01-03 08:00:00.750000")
+    del proxy.records[1]
+    proxy.calls.clear()
+    result = replica.sync("sale.order")
+    assert (result["read"], result["deleted"], result["records"]) == (2, 1, 2)
+    assert proxy.calls[2] == ("search_read", [[("write_date", ">=", "2024-01-02 09:00:00"),
+                                               ("write_date", "<", "2024-01-03 08:00:01"), ("id", ">", 0)]])
+    assert replica.query("SELECT state, COUNT(*), SUM(amount_total) FROM sale_order GROUP BY state")[1] == [
+        ("sale", 2, 325.5)]
+
+    status = replica.status()[0]
+    assert status["records"] == 2
+    assert status["last_write_date"] == "2024-01-03 08:00:00"
+    assert 0 <= status["lag"] < 60
+
+
+def test_replica_sync_terminates_when_batches_share_a_write_date(orders):
+    proxy, replica = orders
+    for record_id in range(4, 10):
+        proxy.records[record_id] = dict(proxy.records[1], id=record_id, name=f"S{record_id:05d}",
+                                        write_date=f"2024-01-05 12:00:00.{record_id:06d}")
+    assert replica.sync("sale.order")["records"] == 9
+    # The last second is read again, in three batches of the six records written in it
+    proxy.records[9].update(state="cancel", write_date="2024-01-05 12:00:00.900000")
+    assert replica.sync("sale.order")["read"] == 6
+    assert replica.query("SELECT state FROM sale_order WHERE id = 9")[1] == [("cancel",)]
+
+
+def test_replica_queries_are_read_only(orders):
+    proxy, replica = orders
+    replica.sync("sale.order")
+    for statement in ("DELETE FROM sale_order", "SELECT 1; DROP TABLE sale_order",
+                      "ATTACH DATABASE 'other.db' AS other"):
+        with pytest.raises(ValueError):
+            replica.query(statement)
+    assert replica.query("WITH totals AS (SELECT SUM(amount_total) AS total FROM sale_order) "
+                         "SELECT total FROM totals")[1] == [(425.5,)]
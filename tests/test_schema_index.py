@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the schema embedding index used as a field mapping fallback.
+
+These tests use a word-concept embedding instead of sentence-transformers,
+so they do not need the embedding model, faiss or a running Odoo server.
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from schema_index import SchemaIndex
+from src.agents.export_import.utils.field_mapper import suggest_field_mapping
+
+CONCEPTS = {
+    "revenue": 0, "turnover": 0, "income": 0,
+    "customer": 1, "client": 1, "partner": 1,
+    "date": 2, "ordered": 2,
+    "reference": 3, "ref": 3, "number": 3,
+    "unrelated": 4,
+}
+
+SALE_FIELDS = {
+    "amount_total": {"string": "Total", "type": "monetary", "help": "Total revenue of the order"},
+    "partner_id": {"string": "Customer", "type": "many2one"},
+    "date_order": {"string": "Order Date", "type": "datetime", "help": "Date the order was placed"},
+    "client_order_ref": {"string": "Customer Reference", "type": "char"},
+    "create_uid": {"string": "Created by", "type": "many2one"},
+}
+
+
+class FakeModel:
+    """Embeds a text as the normalized count of the concepts of its words."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, show_progress_bar=False):
+        self.encoded += len(texts)
+        vectors = np.zeros((len(texts), len(set(CONCEPTS.values()))), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r'[a-z]+', text.lower()):
+                if word in CONCEPTS:
+                    vectors[row, CONCEPTS[word]] += 1
+            vectors[row] /= np.linalg.norm(vectors[row]) or 1.0
+        return vectors
+
+
+class FakeIndex:
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.ntotal = len(vectors)
+
+    def reconstruct_n(self, start, count):
+        return self.vectors[start:start + count]
+
+
+class FakeEngine:
+    """The parts of EmbeddingEngine the schema index uses, persisting in memory."""
+
+    def __init__(self, documents=None, index=None):
+        self.model = FakeModel()
+        self.documents = documents or []
+        self.document_ids = [doc["id"] for doc in self.documents]
+        self.index = index
+        self.index_path = "schema_index.bin"
+        self.db = None
+        self.saved = 0
+
+    def create_embeddings(self, texts):
+        return self.model.encode(texts)
+
+    def create_index(self, embeddings):
+        self.index = FakeIndex(embeddings)
+        return True
+
+    def save_index_and_documents(self):
+        self.saved += 1
+        return True
+
+
+def test_schema_index_matches_by_meaning_and_caches_phrases():
+    engine = FakeEngine()
+    index = SchemaIndex(engine)
+
+    assert index.search("sale.order", "turnover", SALE_FIELDS)[0][0] == "amount_total"
+    assert index.search("sale.order", "Client", SALE_FIELDS, k=1) == [("partner_id", 1.0)]
+    assert "create_uid" not in [doc["field"] for doc in engine.documents]
+    assert engine.saved == 1
+
+    encoded = engine.model.encoded
+    assert index.search("sale.order", "turnover", SALE_FIELDS)[0][0] == "amount_total"
+    assert engine.model.encoded == encoded
+    assert (index.hits, index.misses) == (1, 2)
+
+    # Unchanged fields are not embedded again; changed fields are
+    assert index.search("sale.order", "income", SALE_FIELDS)[0][0] == "amount_total"
+    assert engine.saved == 1
+    fields = dict(SALE_FIELDS, margin={"string": "Margin", "type": "monetary", "help": "Income minus costs"})
+    index.search("sale.order", "income", fields)
+    assert engine.saved == 2
+    assert len(engine.documents) == 5
+
+    # A reloaded engine reuses the stored vectors
+    reloaded = SchemaIndex(FakeEngine(engine.documents, engine.index))
+    assert reloaded.search("sale.order", "order ref", fields, k=1)[0][0] == "client_order_ref"
+    assert reloaded.engine.saved == 0
+
+
+def test_suggest_field_mapping_falls_back_to_schema_index():
+    index = SchemaIndex(FakeEngine())
+    csv_fields = ["partner_id", "Order Date", "Turnover", "Unrelated"]
+
+    mapping = suggest_field_mapping(csv_fields, SALE_FIELDS, "sale.order", schema_index=index)
+
+    assert mapping == {"partner_id": "partner_id", "Order Date": "date_order", "Turnover": "amount_total"}
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the Aho-Corasick TermMatcher.
+
+These tests do not need a running Odoo server.
+"""
+
+import os
+import random
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from term_matcher import TermMatcher
+
+
+def test_find_all_matches_naive_search():
+    """All (overlapping) occurrences are found, like a naive substring scan."""
+    rng = random.Random(7)
+    for _ in range(200):
+        terms = {"".join(rng.choice("ab ") for _ in range(rng.randint(1, 4))): i for i in range(12)}
+        text = "".join(rng.choice("ab ") for _ in range(25))
+
+        found = sorted((start, end, term) for start, end, term, _ in TermMatcher(terms).find_all(text))
+        expected = sorted((i, i + len(term), term) for term in terms
+                          for i in range(len(text)) if text.startswith(term, i))
+
+        assert found == expected
+
+
+def test_ranked_matches_prefer_word_starts_and_longest_terms():
+    """Longer terms win, and terms inside a word rank last."""
+    matcher = TermMatcher({"sales": "sale.order", "sales order": "sale.order", "move": "account.move",
+                           "order": "sale.order", "customer": "res.partner"})
+
+    assert matcher.best_match("remove all sales orders") == ("sales order", "sale.order")
+    assert [term for term, _ in matcher.ranked_matches("remove all sales orders")] == [
+        "sales order", "sales", "order", "move"]
+    assert matcher.best_match("remove them", min_length=5) == (None, None)